@@ -0,0 +1,96 @@
+"""
+Benchmark de charge de /simulate-interview/ : N entretiens concurrents sur une
+seule boucle d'événements, chemin synchrone (graph.invoke) contre chemin
+asynchrone (graph.ainvoke).
+
+L'appel OpenAI est remplacé par une latence simulée pour isoler le
+comportement de la boucle. Une tâche « heartbeat » mesure le retard de la
+boucle : avec le chemin synchrone il croît avec N, avec le chemin asynchrone
+il reste proche de zéro.
+
+Usage (depuis interview_agents_api/) :
+    python benchmarks/bench_async_interviews.py --concurrency 1 8 32 --latency 0.5
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from services.graph_service import GraphInterviewProcessor
+
+PAYLOAD = {
+    "user_id": "bench-user",
+    "job_offer_id": "bench-offer",
+    "job_offer": {"entreprise": "ACME", "poste": "Data Engineer", "mission": "Pipelines de données"},
+    "cv_document": {"candidat": {"informations_personnelles": {"nom": "Jane Doe"}, "analyse_competences": []}},
+}
+MESSAGES = [{"role": "user", "content": "Bonjour, je suis prêt."}]
+
+
+def make_processor(latency: float) -> GraphInterviewProcessor:
+    def fake_llm(_inputs):
+        time.sleep(latency)
+        return AIMessage(content="Pouvez-vous vous présenter ?")
+
+    async def afake_llm(_inputs):
+        await asyncio.sleep(latency)
+        return AIMessage(content="Pouvez-vous vous présenter ?")
+
+    processor = GraphInterviewProcessor(PAYLOAD)
+    processor.interview_graph.agent_runnable = RunnableLambda(fake_llm, afunc=afake_llm)
+    return processor
+
+
+async def heartbeat(stop: asyncio.Event, interval: float, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run_mode(mode: str, concurrency: int, latency: float):
+    processors = [make_processor(latency) for _ in range(concurrency)]
+
+    async def sync_turn(processor):
+        # Reproduit l'ancien endpoint : appel bloquant dans un `async def`
+        return processor.invoke(MESSAGES)
+
+    async def async_turn(processor):
+        return await processor.ainvoke(MESSAGES)
+
+    turn = async_turn if mode == "async" else sync_turn
+    stop, lags = asyncio.Event(), []
+    monitor = asyncio.create_task(heartbeat(stop, 0.01, lags))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(turn(p) for p in processors))
+    wall = time.perf_counter() - start
+
+    stop.set()
+    await monitor
+    max_lag = max(lags) if lags else wall
+    return wall, max_lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latency", type=float, default=0.5, help="Latence simulée d'un appel LLM (s)")
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'N':>4} {'wall (s)':>10} {'turns/s':>9} {'max loop lag (ms)':>18}")
+    for concurrency in args.concurrency:
+        for mode in ("sync", "async"):
+            wall, max_lag = asyncio.run(run_mode(mode, concurrency, args.latency))
+            print(f"{mode:<6} {concurrency:>4} {wall:>10.2f} {concurrency / wall:>9.1f} {max_lag * 1000:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark du micro-batching des modèles d'analyse : N analyses concurrentes
+(`run_full_analysis`, une par thread comme les workers de la file d'analyse),
+avec et sans regroupement des appels sentiment / embeddings / zero-shot.
+
+Affiche le débit (analyses/s) et la latence p50/p95 par analyse. Les modèles
+Hugging Face sont chargés une seule fois (quelques minutes au premier lancement).
+
+`--synthetic` remplace l'analyse par un modèle factice sérialisé (coût fixe
+par appel + coût par élément, un seul appel à la fois comme des cœurs CPU
+saturés) : il mesure le surcoût propre du scheduler (attente max_wait à faible
+charge) sans télécharger de modèle, pas le gain réel sur les modèles.
+
+Usage (depuis interview_agents_api/) :
+    python benchmarks/bench_inference_scheduler.py --concurrency 1 8 32 --rounds 2
+    python benchmarks/bench_inference_scheduler.py --synthetic
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.inference_scheduler import MicroBatchScheduler
+
+JOB_REQUIREMENTS = "Data Engineer : pipelines de données, Python, SQL, Spark, Airflow, travail en équipe."
+ANSWERS = [
+    "Bonjour, je suis prêt pour l'entretien.",
+    "J'ai travaillé trois ans comme data engineer sur des pipelines Spark et Airflow pour un acteur du e-commerce.",
+    "Ce poste m'intéresse parce que je veux travailler sur des volumes de données plus importants.",
+    "Je ne suis pas sûr de bien comprendre la question, pouvez-vous la reformuler ?",
+    "Sur mon dernier projet, j'ai migré un entrepôt de données vers BigQuery en réduisant les coûts de moitié, "
+    "en réécrivant les jobs d'ingestion et en mettant en place des tests de qualité de données automatisés.",
+    "Quelles sont les prochaines étapes du processus de recrutement ?",
+]
+
+
+def make_conversation(rng: random.Random):
+    conversation = []
+    for answer in rng.sample(ANSWERS, k=5):
+        conversation.append({"role": "assistant", "content": "Pouvez-vous détailler ?"})
+        conversation.append({"role": "user", "content": answer})
+    return conversation
+
+
+class SyntheticAnalyzer:
+    """Trois modèles factices (sentiment, embeddings, intention) partageant un même CPU."""
+    CALL_SECONDS = 0.015
+    ITEM_SECONDS = 0.002
+
+    def __init__(self):
+        self.batching = True
+        self._cpu = threading.Lock()
+        self.schedulers = [MicroBatchScheduler(name, self._forward) for name in ("sentiment", "embedding", "intent")]
+
+    def _forward(self, texts, _key=None):
+        with self._cpu:
+            time.sleep(self.CALL_SECONDS + self.ITEM_SECONDS * len(texts))
+        return [len(text) for text in texts]
+
+    def run_full_analysis(self, conversation, job_requirements):
+        answers = [msg["content"] for msg in conversation if msg["role"] == "user"]
+        for scheduler in self.schedulers:
+            if self.batching:
+                scheduler.submit(answers)
+            else:
+                self._forward(answers)
+
+
+def run(analyzer, concurrency: int, rounds: int, rng: random.Random):
+    conversations = [make_conversation(rng) for _ in range(concurrency * rounds)]
+    latencies = []
+
+    def analyse(conversation):
+        start = time.perf_counter()
+        analyzer.run_full_analysis(conversation, JOB_REQUIREMENTS)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(analyse, conversations))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))]
+    return len(conversations) / elapsed, statistics.median(latencies), p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--rounds", type=int, default=2, help="analyses par thread")
+    parser.add_argument("--synthetic", action="store_true", help="modèle factice, sans téléchargement")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        analyzer = SyntheticAnalyzer()
+    else:
+        from src.core.deep_learning_analyzer import MultiModelInterviewAnalyzer
+        analyzer = MultiModelInterviewAnalyzer()
+    # Préchauffage (allocation des buffers, compilation des noyaux)
+    analyzer.run_full_analysis(make_conversation(random.Random(0)), JOB_REQUIREMENTS)
+
+    print(f"{'mode':<10} {'concurrency':>11} {'analyses/s':>11} {'p50 (s)':>9} {'p95 (s)':>9}")
+    for concurrency in args.concurrency:
+        for mode, batching in (("direct", False), ("batched", True)):
+            analyzer.batching = batching
+            throughput, p50, p95 = run(analyzer, concurrency, args.rounds, random.Random(concurrency))
+            print(f"{mode:<10} {concurrency:>11} {throughput:>11.2f} {p50:>9.3f} {p95:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
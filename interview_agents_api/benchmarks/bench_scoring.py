@@ -0,0 +1,95 @@
+"""
+Benchmark du calcul des niveaux de compétences : implémentation compétence par
+compétence (re-sérialisation du CV à chaque appel) contre le parcours unique par
+automate multi-motifs de `SimpleScoringAgent.calculate_scores`.
+
+Les CV sont générés aléatoirement (graine fixe) ; les deux implémentations
+doivent produire exactement les mêmes niveaux.
+
+Usage (depuis interview_agents_api/) :
+    python benchmarks/bench_scoring.py --skills 50 100 200 --experiences 8 --runs 20
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.scoring_agent import SimpleScoringAgent
+
+VOCABULARY = [
+    "python", "java", "javascript", "typescript", "react", "angular", "vue", "django", "flask", "fastapi",
+    "sql", "postgresql", "mongodb", "redis", "docker", "kubernetes", "terraform", "aws", "azure", "gcp",
+    "pandas", "numpy", "pytorch", "tensorflow", "spark", "kafka", "airflow", "git", "linux", "scrum",
+    "communication", "leadership", "rigueur", "autonomie", "travail en équipe", "c++", "c#", ".net", "go",
+    "rust", "scala", "power bi", "tableau", "excel", "sap", "salesforce", "figma", "node.js", "graphql", "ci/cd",
+]
+
+
+def make_candidat(num_skills: int, num_experiences: int, rng: random.Random):
+    skills = list(VOCABULARY)
+    while len(skills) < num_skills:
+        skills.append(f"{rng.choice(VOCABULARY)} {rng.choice(['avancé', 'cloud', 'data', 'api', 'ml'])} {len(skills)}")
+    skills = skills[:num_skills]
+
+    def sentence():
+        return " ".join(rng.choice(skills) if rng.random() < 0.3 else rng.choice(["mise", "en", "place", "de", "projets"]) for _ in range(12))
+
+    experiences = []
+    for i in range(num_experiences):
+        start = rng.randint(2005, 2022)
+        experiences.append({
+            "Poste": f"Poste {i}",
+            "Entreprise": f"Entreprise {i}",
+            "start_date": str(start),
+            "end_date": str(min(2024, start + rng.randint(0, 5))),
+            "responsabilités": [sentence() for _ in range(4)],
+        })
+    return {
+        "compétences": {"hard_skills": skills[: num_skills * 3 // 4], "soft_skills": skills[num_skills * 3 // 4:]},
+        "expériences": experiences,
+        "projets": {
+            "professional": [{"title": f"Projet {i}", "technologies": rng.sample(skills, 5), "outcomes": [sentence()]} for i in range(4)],
+            "personal": [{"title": f"Perso {i}", "technologies": rng.sample(skills, 3), "outcomes": [sentence()]} for i in range(2)],
+        },
+        "formations": [{"degree": sentence(), "institution": "Université", "start_date": "2010", "end_date": "2013"}],
+    }
+
+
+def per_skill_scores(agent: SimpleScoringAgent, candidat):
+    skills = agent._extract_skills_list(candidat.get("compétences", {}))
+    return {"analyse_competences": [{"skill": s, "level": agent._determine_skill_level(s, candidat)} for s in skills]}
+
+
+def timed(fn, runs: int):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skills", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--experiences", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    agent = SimpleScoringAgent()
+    rng = random.Random(42)
+    print(f"{'skills':>7} {'per-skill (ms)':>15} {'single-pass (ms)':>17} {'speedup':>8}")
+    for num_skills in args.skills:
+        candidat = make_candidat(num_skills, args.experiences, rng)
+        baseline, expected = timed(lambda: per_skill_scores(agent, candidat), args.runs)
+        optimized, actual = timed(lambda: agent.calculate_scores(candidat), args.runs)
+        assert actual == expected, "les niveaux calculés diffèrent"
+        print(f"{num_skills:>7} {baseline * 1000:>15.2f} {optimized * 1000:>17.2f} {baseline / optimized:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
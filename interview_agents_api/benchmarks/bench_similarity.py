@@ -0,0 +1,76 @@
+"""
+Benchmark de la similarité réponses / poste selon la longueur de l'entretien :
+moteur "joined" (toutes les réponses concaténées, tronquées par MiniLM à 256
+sous-mots) contre "chunked" (réponses découpées, encodées en un lot).
+
+Affiche la latence médiane, le score global et la part des réponses
+réellement vue par le modèle en mode "joined". Le cache d'embeddings est
+désactivé pour mesurer l'inférence seule.
+
+Usage (depuis interview_agents_api/) :
+    python benchmarks/bench_similarity.py --answers 5 10 20 40 --repeats 5
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.embedding_service import EmbeddingService, load_sentence_encoder
+from src.core.deep_learning_analyzer import MultiModelInterviewAnalyzer
+
+JOB_REQUIREMENTS = "Data Engineer : pipelines de données, Python, SQL, Spark, Airflow, travail en équipe."
+ANSWERS = [
+    "J'ai travaillé trois ans comme data engineer sur des pipelines Spark et Airflow pour un acteur du e-commerce.",
+    "Ce poste m'intéresse parce que je veux travailler sur des volumes de données plus importants.",
+    "Sur mon dernier projet, j'ai migré un entrepôt de données vers BigQuery en réduisant les coûts de moitié, "
+    "en réécrivant les jobs d'ingestion et en mettant en place des tests de qualité de données automatisés.",
+    "Je privilégie la communication écrite pour documenter les choix d'architecture avec l'équipe.",
+    "J'ai aussi encadré un stagiaire sur l'optimisation de requêtes SQL et la supervision des traitements.",
+]
+
+
+def make_conversation(length: int, rng: random.Random):
+    conversation = []
+    for _ in range(length):
+        conversation.append({"role": "assistant", "content": "Pouvez-vous détailler ?"})
+        conversation.append({"role": "user", "content": rng.choice(ANSWERS) + f" (réponse {rng.random():.6f})"})
+    return conversation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, nargs="+", default=[5, 10, 20, 40])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    embedding_service = EmbeddingService(load_sentence_encoder(), cache_size=0)
+    tokenizer = embedding_service.model.tokenizer
+    max_tokens = embedding_service.model.max_seq_length
+    analyzers = {
+        engine: MultiModelInterviewAnalyzer(
+            batching=False, intent_engine="embedding", embedding_service=embedding_service, similarity_engine=engine
+        )
+        for engine in ("joined", "chunked")
+    }
+
+    print(f"{'réponses':>8} {'moteur':<8} {'p50 (ms)':>9} {'score':>7} {'vu par joined':>14}")
+    for length in args.answers:
+        conversation = make_conversation(length, random.Random(length))
+        joined = " ".join(msg["content"] for msg in conversation if msg["role"] == "user")
+        coverage = min(1.0, max_tokens / len(tokenizer(joined)["input_ids"]))
+        for engine, analyzer in analyzers.items():
+            analyzer.compute_semantic_similarity(conversation, JOB_REQUIREMENTS)
+            latencies = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                score = analyzer.compute_semantic_similarity(conversation, JOB_REQUIREMENTS)
+                latencies.append(time.perf_counter() - start)
+            print(f"{length:>8} {engine:<8} {1000 * statistics.median(latencies):>9.1f} {score:>7.3f} {coverage:>14.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Rapport de dérive entre les backends de l'analyseur : PyTorch pleine précision
+contre ONNX Runtime quantifié int8 (artefacts de scripts/build_onnx_models.py).
+
+Chaque backend est chargé dans un processus séparé pour mesurer sa mémoire
+résidente propre (pic de RSS) et sa latence par `run_full_analysis`. Les
+sorties sont ensuite comparées : structure identique, accord sur l'émotion et
+l'intention principales, écarts absolus maximaux des scores et de la
+similarité.
+
+Usage (depuis interview_agents_api/) :
+    python benchmarks/compare_analyzer_backends.py [--repeats 5]
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+import statistics
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+JOB_REQUIREMENTS = "Data Engineer : pipelines de données, Python, SQL, Spark, Airflow, travail en équipe."
+ANSWERS = [
+    "Bonjour, je suis prêt pour l'entretien.",
+    "J'ai travaillé trois ans comme data engineer sur des pipelines Spark et Airflow pour un acteur du e-commerce.",
+    "Ce poste m'intéresse parce que je veux travailler sur des volumes de données plus importants.",
+    "Je ne suis pas sûr de bien comprendre la question, pouvez-vous la reformuler ?",
+    "Sur mon dernier projet, j'ai migré un entrepôt de données vers BigQuery en réduisant les coûts de moitié.",
+    "Quelles sont les prochaines étapes du processus de recrutement ?",
+    "Franchement j'ai été déçu par mon ancien manager, ça m'a beaucoup frustré.",
+    "Je suis ravi d'avoir pu échanger avec vous aujourd'hui, merci beaucoup !",
+]
+
+
+def make_conversations():
+    conversations = []
+    for offset in range(0, len(ANSWERS), 2):
+        conversation = []
+        for answer in ANSWERS[offset:offset + 4]:
+            conversation.append({"role": "assistant", "content": "Pouvez-vous détailler ?"})
+            conversation.append({"role": "user", "content": answer})
+        conversations.append(conversation)
+    return conversations
+
+
+def run_backend(backend, conversations, repeats):
+    from src.core.deep_learning_analyzer import MultiModelInterviewAnalyzer
+
+    analyzer = MultiModelInterviewAnalyzer(batching=False, intent_engine="nli", backend=backend)
+    analyzer.run_full_analysis(conversations[0], JOB_REQUIREMENTS)
+
+    latencies, outputs = [], []
+    for _ in range(repeats):
+        for conversation in conversations:
+            start = time.perf_counter()
+            analyzer.run_full_analysis(conversation, JOB_REQUIREMENTS)
+            latencies.append(time.perf_counter() - start)
+    for conversation in conversations:
+        output = analyzer.run_full_analysis(conversation, JOB_REQUIREMENTS)
+        # Similarité non arrondie pour mesurer la dérive
+        output["raw_similarity"] = analyzer.compute_semantic_similarity(conversation, JOB_REQUIREMENTS)
+        outputs.append(output)
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"outputs": outputs, "latencies": latencies, "peak_rss_mb": peak_rss_mb}
+
+
+def shape(value):
+    """Structure d'une sortie (clés et types), sans les valeurs."""
+    if isinstance(value, dict):
+        return {key: shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [shape(item) for item in value[:1]]
+    return type(value).__name__
+
+
+def compare(reference, candidate):
+    stats = {"emotion_agreement": [], "emotion_max_diff": 0.0, "intent_agreement": [], "intent_max_diff": 0.0, "similarity_max_diff": 0.0}
+    for ref, cand in zip(reference, candidate):
+        stats["similarity_max_diff"] = max(stats["similarity_max_diff"], abs(ref["raw_similarity"] - cand["raw_similarity"]))
+        for ref_scores, cand_scores in zip(ref["sentiment_analysis"], cand["sentiment_analysis"]):
+            ref_by_label = {s["label"]: s["score"] for s in ref_scores}
+            cand_by_label = {s["label"]: s["score"] for s in cand_scores}
+            stats["emotion_agreement"].append(max(ref_by_label, key=ref_by_label.get) == max(cand_by_label, key=cand_by_label.get))
+            diff = max(abs(score - cand_by_label.get(label, 0.0)) for label, score in ref_by_label.items())
+            stats["emotion_max_diff"] = max(stats["emotion_max_diff"], diff)
+        for ref_intent, cand_intent in zip(ref["intent_analysis"], cand["intent_analysis"]):
+            stats["intent_agreement"].append(ref_intent["labels"][0] == cand_intent["labels"][0])
+            cand_by_label = dict(zip(cand_intent["labels"], cand_intent["scores"]))
+            diff = max(abs(score - cand_by_label.get(label, 0.0)) for label, score in zip(ref_intent["labels"], ref_intent["scores"]))
+            stats["intent_max_diff"] = max(stats["intent_max_diff"], diff)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    conversations = make_conversations()
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for backend in ("torch", "onnx"):
+        with context.Pool(1) as pool:
+            results[backend] = pool.apply(run_backend, (backend, conversations, args.repeats))
+
+    print(f"{'backend':<8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'pic RSS (Mo)':>13}")
+    for backend, result in results.items():
+        latencies = sorted(result["latencies"])
+        p95 = latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))]
+        print(f"{backend:<8} {1000 * statistics.median(latencies):>9.1f} {1000 * p95:>9.1f} {result['peak_rss_mb']:>13.0f}")
+
+    reference, candidate = results["torch"]["outputs"], results["onnx"]["outputs"]
+    same_shape = all(shape(ref) == shape(cand) for ref, cand in zip(reference, candidate))
+    stats = compare(reference, candidate)
+    print(f"\nstructure de sortie identique : {'oui' if same_shape else 'NON'}")
+    print(f"émotion principale identique  : {sum(stats['emotion_agreement']) / len(stats['emotion_agreement']):.1%}"
+          f"   écart max des scores {stats['emotion_max_diff']:.4f}")
+    print(f"intention principale identique: {sum(stats['intent_agreement']) / len(stats['intent_agreement']):.1%}"
+          f"   écart max des scores {stats['intent_max_diff']:.4f}")
+    print(f"écart max de similarité       : {stats['similarity_max_diff']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
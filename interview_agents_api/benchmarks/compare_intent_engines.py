@@ -0,0 +1,120 @@
+"""
+Comparaison hors ligne des moteurs de classification d'intention : zero-shot
+NLI (xlm-roberta-large-xnli) contre prototypes d'embeddings MiniLM.
+
+Mesure la précision de chaque moteur sur un jeu de réponses annotées, leur
+taux d'accord et le temps de classification par message. Le jeu intégré est
+distinct des prototypes ; un jeu plus large peut être fourni en JSONL
+({"text": ..., "label": ...} par ligne, labels de INTENT_LABELS).
+
+À lancer avant de retenir INTENT_ENGINE=embedding ; `--output` écrit le
+rapport en JSON pour le conserver avec la décision.
+
+Usage (depuis interview_agents_api/) :
+    python benchmarks/compare_intent_engines.py [--dataset reponses.jsonl] [--output rapport.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.intent_classifier import EmbeddingIntentClassifier, INTENT_LABELS
+from src.core.deep_learning_analyzer import MultiModelInterviewAnalyzer
+
+TECH, MOTIVATION, QUESTION, STRESS = INTENT_LABELS
+DATASET = [
+    ("J'ai passé deux ans à maintenir une API REST en Node.js avec une base MongoDB.", TECH),
+    ("Nous avons migré notre monolithe vers des microservices déployés sur Kubernetes.", TECH),
+    ("J'ai écrit les tests unitaires et mis en place l'intégration continue sous GitLab CI.", TECH),
+    ("Mon stage portait sur un modèle de prévision des ventes avec scikit-learn.", TECH),
+    ("J'ai optimisé des requêtes SQL qui prenaient plusieurs minutes.", TECH),
+    ("En alternance, je développais des tableaux de bord Power BI pour la direction financière.", TECH),
+    ("J'ai encadré deux développeurs juniors sur la refonte du front en React.", TECH),
+    ("Je gérais le réseau et les sauvegardes des serveurs Linux de l'agence.", TECH),
+    ("Votre mission de rendre la santé accessible me parle énormément.", MOTIVATION),
+    ("Je cherche un environnement où je pourrai progresser rapidement.", MOTIVATION),
+    ("Travailler sur un produit utilisé par des millions de personnes est ce qui m'attire.", MOTIVATION),
+    ("Je suis passionné par la data et c'est exactement ce que je veux faire.", MOTIVATION),
+    ("Rejoindre une startup en pleine croissance est un vrai objectif pour moi.", MOTIVATION),
+    ("J'aimerais m'investir sur le long terme dans votre équipe.", MOTIVATION),
+    ("L'aspect international du poste me motive particulièrement.", MOTIVATION),
+    ("Je veux mettre mes compétences au service d'un projet qui a du sens.", MOTIVATION),
+    ("Quelle est la taille de l'équipe technique ?", QUESTION),
+    ("Quels outils utilisez-vous pour la gestion de projet ?", QUESTION),
+    ("Y a-t-il des possibilités de formation en interne ?", QUESTION),
+    ("Quand pensez-vous donner une réponse ?", QUESTION),
+    ("Comment est organisée l'astreinte ?", QUESTION),
+    ("Est-ce que je travaillerais directement avec le client ?", QUESTION),
+    ("Quelle est la fourchette de salaire prévue pour ce poste ?", QUESTION),
+    ("Combien de jours de télétravail sont possibles par semaine ?", QUESTION),
+    ("Pardon, je perds un peu mes moyens.", STRESS),
+    ("Je ne me souviens plus exactement, désolé.", STRESS),
+    ("Honnêtement je ne sais pas comment répondre à ça.", STRESS),
+    ("C'est mon premier entretien, je suis assez nerveux.", STRESS),
+    ("Je crois que oui mais je ne suis vraiment pas certain.", STRESS),
+    ("Hum, attendez, je réfléchis, ce n'est pas évident.", STRESS),
+    ("J'ai peur de ne pas avoir le niveau demandé.", STRESS),
+    ("Je m'embrouille un peu, je peux recommencer ?", STRESS),
+]
+
+
+def load_dataset(path):
+    if not path:
+        return DATASET
+    with open(path, "r", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(row["text"], row["label"]) for row in rows]
+
+
+def evaluate(name, classify, texts, gold):
+    start = time.perf_counter()
+    results = classify(texts)
+    elapsed = time.perf_counter() - start
+    predictions = [result["labels"][0] for result in results]
+    accuracy = sum(p == g for p, g in zip(predictions, gold)) / len(gold)
+    print(f"{name:<10} précision {accuracy:6.1%}   {1000 * elapsed / len(texts):8.1f} ms/message")
+    errors = Counter((g, p) for p, g in zip(predictions, gold) if p != g)
+    for (expected, predicted), count in errors.most_common():
+        print(f"    {count} x attendu « {expected} » -> prédit « {predicted} »")
+    return predictions, {"accuracy": accuracy, "ms_per_message": 1000 * elapsed / len(texts)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    dataset = load_dataset(args.dataset)
+    texts = [text for text, _ in dataset]
+    gold = [label for _, label in dataset]
+
+    analyzer = MultiModelInterviewAnalyzer(batching=False, intent_engine="nli")
+    embedding_classifier = EmbeddingIntentClassifier(analyzer.encode_texts)
+
+    def nli(batch):
+        results = analyzer.intent_classifier(batch, INTENT_LABELS, multi_label=False)
+        return [results] if isinstance(results, dict) else results
+
+    # Préchauffage des deux moteurs
+    nli(texts[:2])
+    embedding_classifier(texts[:2])
+
+    print(f"{len(dataset)} réponses annotées")
+    nli_predictions, nli_stats = evaluate("nli", nli, texts, gold)
+    embedding_predictions, embedding_stats = evaluate("embedding", embedding_classifier, texts, gold)
+    agreement = sum(a == b for a, b in zip(nli_predictions, embedding_predictions)) / len(texts)
+    print(f"accord entre moteurs : {agreement:.1%}")
+
+    if args.output:
+        report = {"dataset_size": len(dataset), "nli": nli_stats, "embedding": embedding_stats, "agreement": agreement}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
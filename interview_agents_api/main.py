@@ -2,21 +2,27 @@ import logging
 import sys
 import os
 import json
-import tempfile
 from datetime import datetime
 
 from fastapi import FastAPI, Request, HTTPException, UploadFile, File, BackgroundTasks, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from bson import ObjectId
 
-from src.models import load_all_models
-from src.services.cv_service import CVParsingService
+from src.models import load_all_models, get_model_registry, get_matching_service, get_turn_analysis_service
+from src.core.metrics import get_metrics
+from src.core.pdf_extractor import PDF_MAX_BYTES, PDFExtractionError, PDFLimitExceededError, PDFExtractionTimeoutError
+from src.services.cv_service import CVParsingService, CV_EXTRACTION_ENGINES
+from src.services.ranking_service import CandidateRankingService
+from src.services.cv_batch_service import CVBatchIngestionService, CVBatchError, CV_BATCH_MAX_ZIP_BYTES
 from src.services.analysis_service import AnalysisService
+from src.services.turn_analysis_service import session_key
 from services.graph_service import GraphInterviewProcessor
+from services.analysis_job_service import get_analysis_job_queue
+from services.session_service import get_session_manager, SessionNotFoundError, SessionFinishedError
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -42,7 +48,14 @@ app.add_middleware(
 # --- Initialisation des services ---
 logger.info("Chargement des modèles et initialisation des services...")
 models = load_all_models()
+# Chargé ici plutôt qu'au premier tour d'entretien : le chemin des requêtes ne déclenche aucun chargement
+get_turn_analysis_service()
 cv_service = CVParsingService(models)
+cv_batch_service = CVBatchIngestionService(cv_service)
+ranking_service = CandidateRankingService(cv_service.candidate_collection)
+analysis_queue = get_analysis_job_queue()
+analysis_queue.start()
+session_manager = get_session_manager()
 logger.info("Services initialisés.")
 
 
@@ -51,14 +64,32 @@ class Feedback(BaseModel):
     status: str
     feedback_data: Optional[Dict[str, Any]] = None
 
+class RankCandidatesRequest(BaseModel):
+    competences: Union[str, List[str]] = Field(..., description="Compétences de l'offre (liste ou texte séparé par des virgules)")
+    top_k: int = Field(20, ge=1, le=500)
+    weights: Optional[List[float]] = Field(None, description="Poids des compétences, dans l'ordre de l'offre")
+
 class HealthCheck(BaseModel):
     status: str = "ok"
 
+class SessionMessage(BaseModel):
+    message: str = Field(..., description="Nouveau message du candidat")
+
 # --- Endpoint de santé ---
 @app.get("/", response_model=HealthCheck, tags=["Status"])
 async def health_check():
     return HealthCheck()
 
+@app.get("/models/status", tags=["Status"])
+async def models_status():
+    """Temps de chargement et mémoire résidente de chaque modèle partagé."""
+    return get_model_registry().report()
+
+@app.get("/metrics", tags=["Status"])
+async def metrics():
+    """Compteurs et mesures du processus (taille des prompts, caches...)."""
+    return get_metrics().snapshot()
+
 # --- Endpoint principal pour la simulation d'entretien ---
 @app.post("/simulate-interview/")
 async def simulate_interview(request: Request):
@@ -76,8 +107,9 @@ async def simulate_interview(request: Request):
             
         logger.info(f"Début de la simulation pour l'utilisateur : {payload['user_id']}")
         
-        processor = GraphInterviewProcessor(payload)
-        result = processor.invoke(payload.get("messages", []))
+        processor = await run_in_threadpool(GraphInterviewProcessor, payload)
+        _submit_turn_analysis(payload, processor)
+        result = await processor.ainvoke(payload.get("messages", []))
         
         return JSONResponse(content=result)
 
@@ -91,35 +123,265 @@ async def simulate_interview(request: Request):
             status_code=500
         )
 
+@app.post("/simulate-interview/stream")
+async def simulate_interview_stream(request: Request):
+    """
+    Variante Server-Sent Events de /simulate-interview/ : la réponse du recruteur
+    est envoyée jeton par jeton (`event: token`), puis un `event: end` porte
+    la réponse complète et le status (interviewing/finished).
+    """
+    payload = await request.json()
+    if not all(k in payload for k in ["user_id", "job_offer_id", "cv_document", "job_offer"]):
+        raise HTTPException(status_code=400, detail="Données manquantes dans le payload (user_id, job_offer_id, cv_document, job_offer).")
+    try:
+        processor = await run_in_threadpool(GraphInterviewProcessor, payload)
+    except ValueError as ve:
+        logger.error(f"Erreur de validation des données : {ve}", exc_info=True)
+        return JSONResponse(content={"error": str(ve)}, status_code=400)
+
+    logger.info(f"Début de la simulation (streaming) pour l'utilisateur : {payload['user_id']}")
+    _submit_turn_analysis(payload, processor)
+
+    return _sse_response(processor.astream(payload.get("messages", [])))
+
+def _submit_turn_analysis(payload: Dict[str, Any], processor: GraphInterviewProcessor):
+    """Analyse en arrière-plan des nouvelles réponses, pendant que le recruteur répond."""
+    # Appelé depuis la boucle d'événements : jamais de chargement de modèle ici
+    turn_analysis = get_model_registry().get_if_loaded("turn_analysis_service")
+    if turn_analysis is None:
+        return
+    key = session_key(str(payload["user_id"]), str(payload["job_offer_id"]))
+    turn_analysis.submit(key, payload.get("messages", []), processor.job_description, str(payload["job_offer_id"]))
+
+def _sse_response(events) -> StreamingResponse:
+    async def event_stream():
+        try:
+            async for event in events:
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
+        except Exception as e:
+            logger.error(f"Erreur interne pendant le streaming de l'entretien: {e}", exc_info=True)
+            error = {"error": "Une erreur interne est survenue sur le serveur de l'assistant."}
+            yield f"event: error\ndata: {json.dumps(error, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# --- Sessions d'entretien côté serveur ---
+@app.post("/interview-sessions/", tags=["Interview Sessions"])
+async def start_interview_session(request: Request):
+    """
+    Crée une session d'entretien à partir du CV et de l'offre, et renvoie le
+    premier message du recruteur avec l'`interview_id` à réutiliser ensuite.
+    """
+    payload = await request.json()
+    if not all(k in payload for k in ["user_id", "job_offer_id", "cv_document", "job_offer"]):
+        raise HTTPException(status_code=400, detail="Données manquantes dans le payload (user_id, job_offer_id, cv_document, job_offer).")
+    try:
+        result = await session_manager.start(payload)
+    except ValueError as ve:
+        logger.error(f"Erreur de validation des données : {ve}", exc_info=True)
+        return JSONResponse(content={"error": str(ve)}, status_code=400)
+    return JSONResponse(content=result)
+
+async def _check_session(interview_id: str):
+    try:
+        await session_manager.check_session(interview_id)
+    except SessionNotFoundError:
+        raise HTTPException(status_code=404, detail="Session d'entretien introuvable ou expirée.")
+    except SessionFinishedError:
+        raise HTTPException(status_code=409, detail="Cet entretien est terminé.")
+
+@app.post("/interview-sessions/{interview_id}/messages", tags=["Interview Sessions"])
+async def send_session_message(interview_id: str, body: SessionMessage):
+    """Envoie uniquement le nouveau message du candidat ; l'historique est côté serveur."""
+    try:
+        result = await session_manager.send_message(interview_id, body.message)
+    except SessionNotFoundError:
+        raise HTTPException(status_code=404, detail="Session d'entretien introuvable ou expirée.")
+    except SessionFinishedError:
+        raise HTTPException(status_code=409, detail="Cet entretien est terminé.")
+    return JSONResponse(content=result)
+
+@app.post("/interview-sessions/{interview_id}/messages/stream", tags=["Interview Sessions"])
+async def stream_session_message(interview_id: str, body: SessionMessage):
+    """Variante Server-Sent Events de l'envoi d'un message de session."""
+    await _check_session(interview_id)
+    return _sse_response(session_manager.stream_message(interview_id, body.message))
+
+# --- Endpoints de suivi des analyses d'entretien ---
+@app.get("/analysis-jobs/{job_id}", tags=["Analysis"])
+async def get_analysis_job(job_id: str):
+    """
+    Renvoie l'état d'un job d'analyse (queued, running, completed, failed)
+    et l'étape en cours.
+    """
+    job = await run_in_threadpool(analysis_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job d'analyse introuvable.")
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "error": job.get("error"),
+    }
+
+@app.get("/analysis-jobs/{job_id}/feedback", response_model=Feedback, tags=["Analysis"])
+async def get_analysis_feedback(job_id: str):
+    """
+    Renvoie le feedback de l'entretien ; `feedback_data` reste vide tant que
+    le job n'est pas terminé.
+    """
+    job = await run_in_threadpool(analysis_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job d'analyse introuvable.")
+    return Feedback(status=job["status"], feedback_data=job.get("feedback_data"))
+
 # --- Endpoint pour l'analyse de CV ---
 @app.post("/parse-cv/", tags=["CV Parsing"])
 async def parse_cv(
     file: UploadFile = File(...), 
-    user_id: str = Query(None, description="ID de l'utilisateur pour lier le CV")
+    user_id: str = Query(None, description="ID de l'utilisateur pour lier le CV"),
+    engine: Optional[str] = Query(None, description="Moteur d'extraction : 'crew' ou 'structured' (défaut : CV_EXTRACTION_ENGINE)")
 ):
     """
     Analyse un fichier CV (PDF) et le stocke automatiquement dans MongoDB.
     """
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Fichier PDF requis")
+    if engine is not None and engine not in CV_EXTRACTION_ENGINES:
+        raise HTTPException(status_code=400, detail=f"Moteur d'extraction inconnu : {engine}")
     
-    contents = await file.read()
-    
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(contents)
-        tmp_path = tmp.name
+    contents = await file.read(PDF_MAX_BYTES + 1)
+    if len(contents) > PDF_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"PDF trop volumineux (maximum {PDF_MAX_BYTES} octets)")
     
     try:
-        result = await run_in_threadpool(cv_service.parse_cv, tmp_path, user_id)
-    finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+        result = await run_in_threadpool(cv_service.parse_cv, contents, user_id, engine)
+    except PDFLimitExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except PDFExtractionTimeoutError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except PDFExtractionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
             
     if not result:
         raise HTTPException(status_code=500, detail="Échec de l'extraction des données du CV.")
         
     return result
 
+@app.post("/parse-cv/batch", tags=["CV Parsing"])
+async def parse_cv_batch(
+    files: List[UploadFile] = File(..., description="CV au format PDF et/ou archives zip de PDF"),
+    engine: Optional[str] = Query(None, description="Moteur d'extraction : 'crew' ou 'structured' (défaut : CV_EXTRACTION_ENGINE)")
+):
+    """
+    Importe un lot de CV et renvoie en NDJSON une ligne par fichier dès que son
+    analyse est terminée, puis une ligne de bilan. Les profils sont stockés dans
+    MongoDB par paquets.
+    """
+    if engine is not None and engine not in CV_EXTRACTION_ENGINES:
+        raise HTTPException(status_code=400, detail=f"Moteur d'extraction inconnu : {engine}")
+
+    uploads = []
+    for upload in files:
+        is_zip = (upload.filename or "").lower().endswith(".zip") or upload.content_type in ("application/zip", "application/x-zip-compressed")
+        if upload.content_type != "application/pdf" and not is_zip:
+            raise HTTPException(status_code=400, detail=f"Fichier PDF ou zip requis : {upload.filename}")
+        max_bytes = CV_BATCH_MAX_ZIP_BYTES if is_zip else PDF_MAX_BYTES
+        contents = await upload.read(max_bytes + 1)
+        if len(contents) > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Fichier trop volumineux : {upload.filename}")
+        uploads.append((upload.filename, contents))
+
+    try:
+        items = cv_batch_service.collect_items(uploads)
+    except CVBatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def ndjson_stream():
+        async for result in cv_batch_service.run(items, engine):
+            yield json.dumps(result, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
+
+@app.post("/rank-candidates", tags=["CV Parsing"])
+async def rank_candidates(body: RankCandidatesRequest):
+    """
+    Classe tous les profils stockés selon leur niveau sur les compétences d'une
+    offre et renvoie les `top_k` meilleurs (score pondéré et couverture).
+    """
+    if cv_service.candidate_collection is None:
+        raise HTTPException(status_code=503, detail="Base des profils indisponible")
+    try:
+        return await run_in_threadpool(ranking_service.rank, body.competences, body.top_k, body.weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# --- Rapprochement profils / offres ---
+def _require_matching_service():
+    matching_service = get_matching_service()
+    if matching_service is None:
+        raise HTTPException(status_code=503, detail="Index de rapprochement indisponible")
+    return matching_service
+
+@app.put("/matching/offers/{job_offer_id}", tags=["Matching"])
+async def index_job_offer(job_offer_id: str, job_offer: Dict[str, Any]):
+    """
+    Ajoute ou met à jour une offre dans l'index de rapprochement
+    (poste, mission, profil_recherche, competences, pole).
+    """
+    matching_service = _require_matching_service()
+    if not await run_in_threadpool(matching_service.index_offer, job_offer_id, job_offer):
+        raise HTTPException(status_code=400, detail="Offre sans contenu exploitable")
+    analyzer = get_model_registry().get_if_loaded("deep_learning_analyzer")
+    if analyzer is not None:
+        # Même texte que la description de poste des entretiens (GraphInterviewProcessor)
+        await run_in_threadpool(analyzer.offer_embedding, json.dumps(job_offer, ensure_ascii=False), job_offer_id)
+    return {"job_offer_id": job_offer_id, "status": "indexed"}
+
+@app.delete("/matching/offers/{job_offer_id}", tags=["Matching"])
+async def remove_job_offer(job_offer_id: str):
+    matching_service = _require_matching_service()
+    offer_embeddings = get_model_registry().get_if_loaded("offer_embedding_store")
+    if offer_embeddings is not None:
+        await run_in_threadpool(offer_embeddings.remove, job_offer_id)
+    if not await run_in_threadpool(matching_service.remove_offer, job_offer_id):
+        raise HTTPException(status_code=404, detail="Offre non indexée")
+    return {"job_offer_id": job_offer_id, "status": "removed"}
+
+@app.get("/matching/candidates/{candidate_id}/offers", tags=["Matching"])
+async def best_offers_for_candidate(candidate_id: str, k: int = Query(10, ge=1, le=100)):
+    """Offres les plus proches d'un profil (identifié par user_id ou, à défaut, empreinte du CV)."""
+    matching_service = _require_matching_service()
+    results = await run_in_threadpool(matching_service.best_offers_for_candidate, candidate_id, k)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Profil non indexé")
+    return {"candidate_id": candidate_id, "offers": results}
+
+@app.get("/matching/offers/{job_offer_id}/candidates", tags=["Matching"])
+async def best_candidates_for_offer(job_offer_id: str, k: int = Query(10, ge=1, le=100)):
+    """Profils les plus proches d'une offre indexée."""
+    matching_service = _require_matching_service()
+    results = await run_in_threadpool(matching_service.best_candidates_for_offer, job_offer_id, k)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Offre non indexée")
+    return {"job_offer_id": job_offer_id, "candidates": results}
+
+@app.on_event("shutdown")
+def save_matching_index():
+    registry = get_model_registry()
+    matching_service = registry.get_if_loaded("matching_service")
+    if matching_service is not None:
+        matching_service.save()
+    offer_embeddings = registry.get_if_loaded("offer_embedding_store")
+    if offer_embeddings is not None:
+        offer_embeddings.save()
+
 # --- Démarrage de l'application (pour un test local) ---
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,56 @@
+"""
+Construit les artefacts ONNX quantifiés (int8 dynamique) des modèles de
+l'analyseur pour ANALYZER_BACKEND=onnx : sentiment (CamemBERT), embeddings
+(MiniLM) et zero-shot (XLM-R large). Les artefacts sont écrits dans
+ONNX_MODELS_DIR, un dossier par modèle et par architecture ; ceux déjà
+présents sont conservés sauf --force.
+
+À lancer une fois par image / machine, puis vérifier la dérive avec
+benchmarks/compare_analyzer_backends.py.
+
+Usage (depuis interview_agents_api/) :
+    python scripts/build_onnx_models.py [--arch avx2] [--models sentiment embedding intent] [--force]
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import onnx_backend
+from src.core.deep_learning_analyzer import SENTIMENT_MODEL, EMBEDDING_MODEL, INTENT_MODEL
+
+BUILDERS = {
+    "sentiment": (SENTIMENT_MODEL, onnx_backend.build_pipeline_model),
+    "embedding": (EMBEDDING_MODEL, onnx_backend.build_sentence_encoder),
+    "intent": (INTENT_MODEL, onnx_backend.build_pipeline_model),
+}
+
+
+def directory_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--arch", default=onnx_backend.ONNX_QUANTIZATION_ARCH, choices=onnx_backend.QUANTIZATION_ARCHS)
+    parser.add_argument("--models", nargs="+", default=list(BUILDERS), choices=list(BUILDERS))
+    parser.add_argument("--output-dir", default=onnx_backend.ONNX_MODELS_DIR)
+    parser.add_argument("--force", action="store_true", help="reconstruit les artefacts existants")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    for name in args.models:
+        model_id, build = BUILDERS[name]
+        start = time.perf_counter()
+        output_dir = build(model_id, arch=args.arch, models_dir=args.output_dir, force=args.force)
+        print(f"{name:<10} {model_id:<40} {time.perf_counter() - start:7.1f}s  {directory_size_mb(output_dir):8.1f} Mo  {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
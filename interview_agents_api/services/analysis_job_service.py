@@ -0,0 +1,219 @@
+import os
+import json
+import uuid
+import queue
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SPOOL_DIR = os.getenv("ANALYSIS_SPOOL_DIR", "/tmp/feedbacks")
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "1"))
+SPOOL_POLL_SECONDS = float(os.getenv("ANALYSIS_SPOOL_POLL_SECONDS", "5"))
+
+# Identifie ce processus : le PID seul ne suffit pas (PID 1 réutilisé dans un conteneur redémarré)
+_PROCESS_TOKEN = uuid.uuid4().hex
+
+_job_queue_instance = None
+_job_queue_lock = threading.Lock()
+
+
+class AnalysisJobQueue:
+    """
+    File d'attente des analyses de fin d'entretien.
+    Chaque job est un fichier JSON dans un spool local, déplacé de façon atomique
+    entre `queued/`, `running/` et `done/` : un job n'est pris que par un seul
+    worker, même avec plusieurs processus uvicorn, et les jobs interrompus par
+    un redémarrage sont remis en file.
+    """
+    STATES = ("queued", "running", "done")
+
+    def __init__(self, spool_dir: str = SPOOL_DIR, num_workers: int = ANALYSIS_WORKERS):
+        self.spool_dir = spool_dir
+        self.num_workers = max(1, num_workers)
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._start_lock = threading.Lock()
+
+        for state in self.STATES:
+            os.makedirs(os.path.join(self.spool_dir, state), exist_ok=True)
+
+    def start(self):
+        with self._start_lock:
+            if self._workers:
+                return
+            self._recover_orphans()
+            for i in range(self.num_workers):
+                worker = threading.Thread(target=self._worker_loop, name=f"analysis-worker-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+            logger.info(f"✅ File d'analyse démarrée ({self.num_workers} worker(s), spool: {self.spool_dir})")
+
+    def submit(
+        self,
+        user_id: str,
+        job_offer_id: str,
+        job_description: str,
+        conversation_history: List[Dict[str, Any]]
+    ) -> str:
+        job_id = uuid.uuid4().hex
+        now = datetime.utcnow().isoformat()
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "progress": "queued",
+            "created_at": now,
+            "updated_at": now,
+            "user_id": user_id,
+            "job_offer_id": job_offer_id,
+            "job_description": job_description,
+            "conversation_history": conversation_history,
+            "feedback_data": None,
+            "error": None,
+        }
+        self._write("queued", job)
+        self._queue.put(job_id)
+        logger.info(f"Analyse mise en file : job {job_id} (user_id: {user_id})")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        # Un job peut changer de répertoire entre deux lectures : on retente une fois
+        for _ in range(2):
+            for state in reversed(self.STATES):
+                job = self._read(state, job_id)
+                if job is not None:
+                    return job
+        return None
+
+    # --- Spool ---
+
+    def _path(self, state: str, job_id: str) -> str:
+        return os.path.join(self.spool_dir, state, f"{job_id}.json")
+
+    def _read(self, state: str, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(state, job_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write(self, state: str, job: Dict[str, Any]):
+        path = self._path(state, job["job_id"])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+    def _claim(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            os.rename(self._path("queued", job_id), self._path("running", job_id))
+        except FileNotFoundError:
+            # Déjà pris par un autre worker
+            return None
+        job = self._read("running", job_id)
+        if job is not None:
+            job["worker_pid"] = os.getpid()
+            job["worker_token"] = _PROCESS_TOKEN
+            self._set_progress(job, "running", "running")
+        return job
+
+    def _set_progress(self, job: Dict[str, Any], status: str, progress: str):
+        job["status"] = status
+        job["progress"] = progress
+        job["updated_at"] = datetime.utcnow().isoformat()
+        self._write("running", job)
+
+    def _finish(self, job: Dict[str, Any]):
+        job["updated_at"] = datetime.utcnow().isoformat()
+        self._write("running", job)
+        os.replace(self._path("running", job["job_id"]), self._path("done", job["job_id"]))
+
+    def _recover_orphans(self):
+        """Remet en file les jobs en attente et ceux dont le worker a disparu."""
+        running_dir = os.path.join(self.spool_dir, "running")
+        for filename in os.listdir(running_dir):
+            if not filename.endswith(".json"):
+                continue
+            job_id = filename[:-len(".json")]
+            job = self._read("running", job_id)
+            if job is None or _worker_alive(job):
+                continue
+            job["status"] = job["progress"] = "queued"
+            self._write("running", job)
+            try:
+                os.rename(self._path("running", job_id), self._path("queued", job_id))
+                logger.warning(f"Job d'analyse {job_id} interrompu, remis en file.")
+            except FileNotFoundError:
+                pass
+
+        queued_dir = os.path.join(self.spool_dir, "queued")
+        for filename in sorted(os.listdir(queued_dir)):
+            if filename.endswith(".json"):
+                self._queue.put(filename[:-len(".json")])
+
+    # --- Workers ---
+
+    def _worker_loop(self):
+        while True:
+            try:
+                job_id = self._queue.get(timeout=SPOOL_POLL_SECONDS)
+            except queue.Empty:
+                # Jobs déposés par un autre processus ou laissés par un worker mort
+                self._recover_orphans()
+                continue
+            try:
+                self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"Erreur inattendue dans le job d'analyse {job_id}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, job_id: str):
+        job = self._claim(job_id)
+        if job is None:
+            return
+
+        from tools.analysis_tools import run_interview_analysis
+
+        logger.info(f"Début du job d'analyse {job_id}")
+        try:
+            job["feedback_data"] = run_interview_analysis(
+                user_id=job["user_id"],
+                job_offer_id=job["job_offer_id"],
+                job_description=job["job_description"],
+                conversation_history=job["conversation_history"],
+                on_progress=lambda step: self._set_progress(job, "running", step)
+            )
+            job["status"] = job["progress"] = "completed"
+            logger.info(f"Job d'analyse {job_id} terminé.")
+        except Exception as e:
+            logger.error(f"Échec du job d'analyse {job_id}: {e}", exc_info=True)
+            job["status"] = job["progress"] = "failed"
+            job["error"] = str(e)
+        self._finish(job)
+
+
+def _worker_alive(job: Dict[str, Any]) -> bool:
+    if job.get("worker_token") == _PROCESS_TOKEN:
+        return True
+    pid = job.get("worker_pid")
+    if not pid or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def get_analysis_job_queue() -> AnalysisJobQueue:
+    global _job_queue_instance
+    if _job_queue_instance is None:
+        with _job_queue_lock:
+            if _job_queue_instance is None:
+                _job_queue_instance = AnalysisJobQueue()
+    return _job_queue_instance
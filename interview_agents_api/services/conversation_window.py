@@ -0,0 +1,194 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
+
+from src.core.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Budget de jetons de l'historique envoyé au LLM (hors prompt système). 0 = désactivé.
+HISTORY_TOKEN_BUDGET = int(os.getenv("INTERVIEW_HISTORY_TOKEN_BUDGET", "3000"))
+# Après un dépassement, on replie l'historique jusqu'à cette part du budget,
+# pour ne pas relancer un résumé à chaque tour.
+HISTORY_FOLD_TARGET_RATIO = float(os.getenv("INTERVIEW_HISTORY_FOLD_TARGET_RATIO", "0.5"))
+SUMMARY_CACHE_SIZE = int(os.getenv("INTERVIEW_SUMMARY_CACHE_SIZE", "512"))
+
+SUMMARY_PROMPT = (
+    "Tu résumes un entretien d'embauche en cours pour le recruteur qui le mène. "
+    "Mets à jour le résumé existant avec les nouveaux échanges : questions déjà posées, "
+    "réponses du candidat, compétences et exemples cités, points à approfondir. "
+    "Reste factuel et concis (15 lignes maximum)."
+)
+
+
+@lru_cache(maxsize=1)
+def _get_token_encoder():
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model("gpt-4o-mini")
+    except Exception as e:
+        logger.warning(f"tiktoken indisponible, estimation approximative des jetons : {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoder = _get_token_encoder()
+    if encoder is None:
+        return len(text) // 4 + 1
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def _message_tokens(message: BaseMessage) -> int:
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    # ~4 jetons de structure par message dans le format chat d'OpenAI
+    return count_tokens(content) + 4
+
+
+@lru_cache(maxsize=1)
+def _get_summary_llm() -> ChatOpenAI:
+    # Tag "nostream" : le résumé ne doit pas apparaître dans le flux SSE de l'agent
+    return ChatOpenAI(api_key=os.getenv("OPENAI_API_KEY"), model="gpt-4o-mini", temperature=0, tags=["nostream"])
+
+
+class _SummaryCache:
+    """LRU process-wide : hash du préfixe replié de la conversation -> résumé."""
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is not None:
+                self._entries.move_to_end(key)
+            return summary
+
+    def put(self, key: str, summary: str):
+        with self._lock:
+            self._entries[key] = summary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+_summary_cache = _SummaryCache(SUMMARY_CACHE_SIZE)
+
+
+class ConversationWindow:
+    """
+    Fenêtre glissante de l'historique envoyé à l'agent. Tant que l'historique
+    tient dans le budget il est envoyé tel quel ; au dépassement, les tours les
+    plus anciens sont repliés dans un résumé courant, mis à jour de façon
+    incrémentale (ancien résumé + tours nouvellement repliés). Le résumé est
+    conservé dans l'état du graphe (sessions) et dans un cache indexé par le
+    préfixe replié (entretiens sans session, qui renvoient tout l'historique).
+    """
+    def __init__(self, token_budget: int = HISTORY_TOKEN_BUDGET, fold_target_ratio: float = HISTORY_FOLD_TARGET_RATIO):
+        self.token_budget = token_budget
+        self.fold_target = int(token_budget * fold_target_ratio)
+
+    def plan(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Calcule la fenêtre du tour : messages conservés, résumé de base et
+        éventuels messages à replier dans ce résumé.
+        """
+        messages: Sequence[BaseMessage] = state["messages"]
+        prefix_hashes = self._prefix_hashes(messages)
+
+        summary = state.get("summary") or ""
+        boundary = state.get("summarized_count") or 0
+        if not summary or boundary > len(messages):
+            summary, boundary = self._best_cached_summary(prefix_hashes)
+
+        plan = {"summary": summary, "boundary": boundary, "new_boundary": boundary, "prefix_hashes": prefix_hashes}
+        if self.token_budget <= 0:
+            return plan
+
+        tail_tokens = [_message_tokens(m) for m in messages[boundary:]]
+        if sum(tail_tokens) <= self.token_budget:
+            return plan
+
+        # On avance la frontière jusqu'à passer sous la cible, sur un message candidat
+        # (jamais au-delà du dernier message)
+        remaining = sum(tail_tokens)
+        new_boundary = boundary
+        for offset, tokens in enumerate(tail_tokens[:-1]):
+            if remaining <= self.fold_target and isinstance(messages[new_boundary], HumanMessage):
+                break
+            remaining -= tokens
+            new_boundary = boundary + offset + 1
+        while new_boundary > boundary and not isinstance(messages[new_boundary], HumanMessage):
+            new_boundary -= 1
+
+        plan["new_boundary"] = new_boundary
+        return plan
+
+    def _prefix_hashes(self, messages: Sequence[BaseMessage]) -> List[str]:
+        """prefix_hashes[i] identifie les i premiers messages."""
+        hasher = hashlib.sha1()
+        hashes = [hasher.hexdigest()]
+        for message in messages:
+            hasher.update(f"{message.type}\x1f{message.content}\x1e".encode("utf-8"))
+            hashes.append(hasher.hexdigest())
+        return hashes
+
+    def _best_cached_summary(self, prefix_hashes: List[str]) -> Tuple[str, int]:
+        for boundary in range(len(prefix_hashes) - 1, 0, -1):
+            summary = _summary_cache.get(prefix_hashes[boundary])
+            if summary is not None:
+                return summary, boundary
+        return "", 0
+
+    def _summary_messages(self, summary: str, to_fold: Sequence[BaseMessage]) -> List[BaseMessage]:
+        transcript = "\n".join(
+            f"{'Candidat' if isinstance(m, HumanMessage) else 'Recruteur'} : {m.content}"
+            for m in to_fold if isinstance(m, (HumanMessage, AIMessage)) and m.content
+        )
+        return [
+            SystemMessage(content=SUMMARY_PROMPT),
+            HumanMessage(content=f"Résumé existant :\n{summary or '(aucun)'}\n\nNouveaux échanges :\n{transcript}")
+        ]
+
+    def _finalize(self, state: Dict[str, Any], plan: Dict[str, Any], summary: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        new_boundary = plan["new_boundary"]
+        if new_boundary != plan["boundary"]:
+            _summary_cache.put(plan["prefix_hashes"][new_boundary], summary)
+            get_metrics().increment("interview.history_summaries")
+
+        system_prompt = state["system_prompt"]
+        if summary:
+            system_prompt += f"\n\nRÉSUMÉ DES ÉCHANGES PRÉCÉDENTS (anciens messages repliés) :\n{summary}"
+        window = list(state["messages"][new_boundary:])
+
+        prompt_tokens = count_tokens(system_prompt) + sum(_message_tokens(m) for m in window)
+        get_metrics().observe("interview.prompt_tokens", prompt_tokens)
+        logger.info(f"Prompt du tour : {prompt_tokens} jetons ({len(window)} messages, {new_boundary} repliés)")
+
+        agent_input = {"system_prompt_content": system_prompt, "messages": window}
+        state_update = {"summary": summary, "summarized_count": new_boundary}
+        return agent_input, state_update
+
+    def prepare(self, state: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Renvoie l'entrée de l'agent et la mise à jour d'état (résumé, frontière)."""
+        plan = self.plan(state)
+        summary = plan["summary"]
+        if plan["new_boundary"] != plan["boundary"]:
+            to_fold = state["messages"][plan["boundary"]:plan["new_boundary"]]
+            summary = _get_summary_llm().invoke(self._summary_messages(summary, to_fold)).content
+        return self._finalize(state, plan, summary)
+
+    async def aprepare(self, state: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        plan = self.plan(state)
+        summary = plan["summary"]
+        if plan["new_boundary"] != plan["boundary"]:
+            to_fold = state["messages"][plan["boundary"]:plan["new_boundary"]]
+            summary = (await _get_summary_llm().ainvoke(self._summary_messages(summary, to_fold))).content
+        return self._finalize(state, plan, summary)
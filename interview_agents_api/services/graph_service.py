@@ -1,107 +1,120 @@
 import os
+import asyncio
+import hashlib
 import logging
 import json
-from typing import TypedDict, Annotated, Sequence, Dict, Any, List
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TypedDict, Annotated, Sequence, Dict, Any, List, Optional, AsyncIterator, Tuple
 
 from langchain_openai import ChatOpenAI
-from langchain_core.runnables import Runnable
+from langchain_core.runnables import Runnable, RunnableLambda
 from langchain_core.messages import BaseMessage, AIMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
+from langgraph.checkpoint.base import BaseCheckpointSaver
 
 from tools.analysis_tools import trigger_interview_analysis
+from services.analysis_job_service import get_analysis_job_queue
+from services.conversation_window import ConversationWindow
 
-class AgentState(TypedDict):
-    messages: Annotated[Sequence[BaseMessage], lambda x, y: x + y]
-    user_id: str
-    job_offer_id: str
-    job_description: str
+PROMPT_TEMPLATE_PATH = 'prompts/rag_prompt_old.txt'
+PROMPT_CACHE_SIZE = int(os.getenv("PROMPT_CACHE_SIZE", "256"))
 
-class GraphInterviewProcessor:
+_interview_graph_instance = None
+_interview_graph_lock = threading.Lock()
+
+@lru_cache(maxsize=None)
+def _get_agent_runnable() -> Runnable:
     """
-    Cette classe encapsule la logique d'un entretien en utilisant LangGraph.
-    Elle prépare toutes les données nécessaires à l'initialisation.
+    Crée une chaîne (runnable) qui agit comme notre agent. Partagée par tout le
+    processus : un seul client OpenAI et donc un seul pool de connexions HTTP.
     """
-    def __init__(self, payload: Dict[str, Any]):
-        logging.info("Initialisation de GraphInterviewProcessor...")
-        
-        self.user_id = payload["user_id"]
-        self.job_offer_id = payload["job_offer_id"]
-        self.job_offer = payload["job_offer"]
-        self.cv_data = payload.get("cv_document", {}).get('candidat', {})
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "{system_prompt_content}"),
+        MessagesPlaceholder(variable_name="messages"),
+    ])
+    llm = ChatOpenAI(api_key=os.getenv("OPENAI_API_KEY"), model="gpt-4o-mini", temperature=0.7)
+    tools = [trigger_interview_analysis]
+    llm_with_tools = llm.bind_tools(tools)
+    return prompt | llm_with_tools
 
-        if not self.cv_data:
-            raise ValueError("Données du candidat non trouvées dans le payload.")
+@lru_cache(maxsize=8)
+def _read_prompt_template(file_path: str) -> str:
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        logging.error(f"Fichier prompt introuvable: {file_path}")
+        return "Vous êtes un assistant RH."
 
-        self.system_prompt_template = self._load_prompt_template('prompts/rag_prompt_old.txt')
-        self.formatted_cv_str = self._format_cv_for_prompt()
-        self.skills_summary = self._extract_skills_summary()
-        self.reconversion_info = self._extract_reconversion_info()
-        
-        self.agent_runnable = self._create_agent_runnable()
-        self.graph = self._build_graph()
-        logging.info("GraphInterviewProcessor initialisé avec succès.")
+class _PromptArtifactsCache:
+    """LRU des prompts système rendus, indexé par (user_id, job_offer_id, hash du CV, hash de l'offre)."""
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, ...], Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
 
-    def _load_prompt_template(self, file_path: str) -> str:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except FileNotFoundError:
-            logging.error(f"Fichier prompt introuvable: {file_path}")
-            return "Vous êtes un assistant RH."
+    def get(self, key: Tuple[str, ...]) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            artifacts = self._entries.get(key)
+            if artifacts is not None:
+                self._entries.move_to_end(key)
+            return artifacts
 
-    def _format_cv_for_prompt(self) -> str:
-        return json.dumps(self.cv_data, indent=2, ensure_ascii=False)
+    def put(self, key: Tuple[str, ...], artifacts: Tuple[str, str]):
+        with self._lock:
+            self._entries[key] = artifacts
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
 
-    def _extract_skills_summary(self) -> str:
-        competences = self.cv_data.get('analyse_competences', [])
-        if not competences: return "Aucune analyse de compétences disponible."
-        summary = [f"{comp.get('skill', '')}: {comp.get('level', 'débutant')}" for comp in competences]
-        return "Niveaux de compétences du candidat: " + " | ".join(summary)
+_prompt_cache = _PromptArtifactsCache(PROMPT_CACHE_SIZE)
 
-    def _extract_reconversion_info(self) -> str:
-        reconversion = self.cv_data.get('reconversion', {})
-        if reconversion.get('is_reconversion'):
-            return f"CANDIDAT EN RECONVERSION: {reconversion.get('analysis', '')}"
-        return "Le candidat n'est pas identifié comme étant en reconversion."
+def _content_hash(value: Any) -> str:
+    serialized = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha1(serialized.encode('utf-8')).hexdigest()
+
+class AgentState(TypedDict):
+    messages: Annotated[Sequence[BaseMessage], lambda x, y: x + y]
+    user_id: str
+    job_offer_id: str
+    job_description: str
+    system_prompt: str
+    summary: str
+    summarized_count: int
+    analysis_job_id: Optional[str]
+
+class InterviewGraph:
+    """
+    Graphe LangGraph d'un entretien. Les nœuds ne lisent que l'état : le prompt
+    système et les identifiants voyagent dans `AgentState`, le même graphe sert
+    donc tous les entretiens et peut reprendre une session depuis un checkpoint.
+    """
+    def __init__(self, checkpointer: Optional[BaseCheckpointSaver] = None):
+        self.agent_runnable = self._create_agent_runnable()
+        self.conversation_window = ConversationWindow()
+        self.graph = self._build_graph(checkpointer)
 
     def _create_agent_runnable(self) -> Runnable:
-        """Crée une chaîne (runnable) qui agit comme notre agent."""
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "{system_prompt_content}"),
-            MessagesPlaceholder(variable_name="messages"),
-        ])
-        llm = ChatOpenAI(api_key=os.getenv("OPENAI_API_KEY"), model="gpt-4o-mini", temperature=0.7)
-        tools = [trigger_interview_analysis]
-        llm_with_tools = llm.bind_tools(tools)
-        return prompt | llm_with_tools
+        return _get_agent_runnable()
 
     def _agent_node(self, state: AgentState):
-        """Prépare le prompt et appelle le runnable de l'agent."""
-        job_description_str = json.dumps(self.job_offer, ensure_ascii=False)
-        
-        system_prompt_content = self.system_prompt_template.format(
-            user_id=state['user_id'],
-            job_offer_id=state['job_offer_id'],
-            entreprise=self.job_offer.get('entreprise', 'notre entreprise'),
-            poste=self.job_offer.get('poste', 'ce poste'),
-            mission=self.job_offer.get('mission', 'Non spécifiée'),
-            profil_recherche=self.job_offer.get('profil_recherche', 'Non spécifié'),
-            competences=self.job_offer.get('competences', 'Non spécifiées'),
-            pole=self.job_offer.get('pole', 'Non spécifié'),
-            cv=self.formatted_cv_str,
-            skills_analysis=self.skills_summary,
-            reconversion_analysis=self.reconversion_info,
-            job_description=job_description_str
-        )
-        
-        response = self.agent_runnable.invoke({
-            "system_prompt_content": system_prompt_content,
-            "messages": state["messages"]
-        })
+        """
+        Prépare le prompt (fenêtre d'historique bornée + résumé des anciens tours)
+        et appelle le runnable de l'agent.
+        """
+        agent_input, window_update = self.conversation_window.prepare(state)
+        response = self.agent_runnable.invoke(agent_input)
+        return {"messages": [response], **window_update}
 
-        return {"messages": [response]}
+    async def _aagent_node(self, state: AgentState):
+        """Variante asynchrone : l'appel LLM ne bloque pas la boucle d'événements."""
+        agent_input, window_update = await self.conversation_window.aprepare(state)
+        response = await self.agent_runnable.ainvoke(agent_input)
+        return {"messages": [response], **window_update}
 
     def _router(self, state: AgentState) -> str:
         """Route le flux du graphe en fonction de la dernière réponse de l'agent."""
@@ -114,7 +127,7 @@ class GraphInterviewProcessor:
 
     def _final_analysis_node(self, state: AgentState):
         """
-        Appelle l'outil d'analyse finale. Construit les arguments manuellement
+        Met l'analyse finale en file. Construit les arguments manuellement
         à partir de l'état du graphe pour garantir la fiabilité.
         """
         conversation_history = []
@@ -134,17 +147,21 @@ class GraphInterviewProcessor:
             "conversation_history": conversation_history
         }
         
-        trigger_interview_analysis.invoke(tool_input)
-        return {}
+        job_id = get_analysis_job_queue().submit(**tool_input)
+        return {"analysis_job_id": job_id}
+
+    async def _afinal_analysis_node(self, state: AgentState):
+        """La mise en file écrit sur disque : on la sort de la boucle d'événements."""
+        return await asyncio.to_thread(self._final_analysis_node, state)
 
-    def _build_graph(self) -> any:
+    def _build_graph(self, checkpointer: Optional[BaseCheckpointSaver] = None) -> any:
         """Construit et compile le graphe d'états."""
         tool_node = ToolNode([trigger_interview_analysis])
         
         graph = StateGraph(AgentState)
-        graph.add_node("agent", self._agent_node)
+        graph.add_node("agent", RunnableLambda(self._agent_node, afunc=self._aagent_node))
         graph.add_node("tools", tool_node)
-        graph.add_node("final_tool_node", self._final_analysis_node) 
+        graph.add_node("final_tool_node", RunnableLambda(self._final_analysis_node, afunc=self._afinal_analysis_node))
         
         graph.set_entry_point("agent")
         
@@ -161,33 +178,150 @@ class GraphInterviewProcessor:
         graph.add_edge("tools", "agent")
         graph.add_edge("final_tool_node", END)
         
-        return graph.compile()
+        return graph.compile(checkpointer=checkpointer)
 
-    def invoke(self, messages: List[Dict[str, Any]]):
-        """Point d'entrée pour lancer une conversation dans le graphe."""
+    def _format_result(self, final_state: Dict[str, Any]) -> Dict[str, Any]:
+        if not final_state or not final_state.get('messages'):
+            logging.error("L'état final est vide ou ne contient pas de messages.")
+            return {"response": "Erreur: Impossible de générer une réponse.", "status": "finished"}
+        last_message = final_state['messages'][-1]
+        status = "finished" if hasattr(last_message, 'tool_calls') and last_message.tool_calls else "interviewing"
+        response_content = last_message.content
+        
+        result = {
+            "response": response_content,
+            "status": status
+        }
+        if final_state.get("analysis_job_id"):
+            result["analysis_job_id"] = final_state["analysis_job_id"]
+        return result
+
+    def invoke(self, state: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        final_state = self.graph.invoke(state, config=config)
+        return self._format_result(final_state)
+
+    async def ainvoke(self, state: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        final_state = await self.graph.ainvoke(state, config=config)
+        return self._format_result(final_state)
+
+    async def astream(self, state: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Produit la réponse de l'agent jeton par jeton (événements `token`), puis
+        un événement `end` portant le même contenu que `ainvoke` (réponse
+        complète, status et éventuel analysis_job_id).
+        """
+        final_state = None
+        async for mode, chunk in self.graph.astream(state, config=config, stream_mode=["messages", "values"]):
+            if mode == "messages":
+                message_chunk, metadata = chunk
+                if metadata.get("langgraph_node") == "agent" and message_chunk.content:
+                    yield {"event": "token", "data": {"content": message_chunk.content}}
+            else:
+                final_state = chunk
+
+        yield {"event": "end", "data": self._format_result(final_state)}
+
+class GraphInterviewProcessor:
+    """
+    Cette classe encapsule la logique d'un entretien en utilisant LangGraph.
+    Elle prépare toutes les données nécessaires à l'initialisation.
+    """
+    def __init__(self, payload: Dict[str, Any], interview_graph: Optional[InterviewGraph] = None):
+        logging.info("Initialisation de GraphInterviewProcessor...")
+        
+        self.user_id = payload["user_id"]
+        self.job_offer_id = payload["job_offer_id"]
+        self.job_offer = payload["job_offer"]
+        self.cv_data = payload.get("cv_document", {}).get('candidat', {})
+
+        if not self.cv_data:
+            raise ValueError("Données du candidat non trouvées dans le payload.")
+
+        # Le prompt ne dépend que de l'utilisateur, du CV et du contenu de l'offre (modifiable
+        # sous le même identifiant) : on le rend une fois. Hachages coûteux sur un gros CV :
+        # le processeur est construit hors de la boucle d'événements.
+        cache_key = (str(self.user_id), str(self.job_offer_id), _content_hash(self.cv_data), _content_hash(self.job_offer))
+        artifacts = _prompt_cache.get(cache_key)
+        if artifacts is None:
+            artifacts = self._build_prompt_artifacts()
+            _prompt_cache.put(cache_key, artifacts)
+        self.system_prompt, self.job_description = artifacts
+
+        self.interview_graph = interview_graph or get_interview_graph()
+        self.graph = self.interview_graph.graph
+        logging.info("GraphInterviewProcessor initialisé avec succès.")
+
+    def _build_prompt_artifacts(self) -> Tuple[str, str]:
+        self.system_prompt_template = _read_prompt_template(PROMPT_TEMPLATE_PATH)
+        self.formatted_cv_str = self._format_cv_for_prompt()
+        self.skills_summary = self._extract_skills_summary()
+        self.reconversion_info = self._extract_reconversion_info()
+        job_description_str = json.dumps(self.job_offer, ensure_ascii=False)
+        return self._render_system_prompt(job_description_str), job_description_str
+
+    def _format_cv_for_prompt(self) -> str:
+        return json.dumps(self.cv_data, indent=2, ensure_ascii=False)
+
+    def _extract_skills_summary(self) -> str:
+        competences = self.cv_data.get('analyse_competences', [])
+        if not competences: return "Aucune analyse de compétences disponible."
+        summary = [f"{comp.get('skill', '')}: {comp.get('level', 'débutant')}" for comp in competences]
+        return "Niveaux de compétences du candidat: " + " | ".join(summary)
+
+    def _extract_reconversion_info(self) -> str:
+        reconversion = self.cv_data.get('reconversion', {})
+        if reconversion.get('is_reconversion'):
+            return f"CANDIDAT EN RECONVERSION: {reconversion.get('analysis', '')}"
+        return "Le candidat n'est pas identifié comme étant en reconversion."
+
+    def _render_system_prompt(self, job_description_str: str) -> str:
+        return self.system_prompt_template.format(
+            user_id=self.user_id,
+            job_offer_id=self.job_offer_id,
+            entreprise=self.job_offer.get('entreprise', 'notre entreprise'),
+            poste=self.job_offer.get('poste', 'ce poste'),
+            mission=self.job_offer.get('mission', 'Non spécifiée'),
+            profil_recherche=self.job_offer.get('profil_recherche', 'Non spécifié'),
+            competences=self.job_offer.get('competences', 'Non spécifiées'),
+            pole=self.job_offer.get('pole', 'Non spécifié'),
+            cv=self.formatted_cv_str,
+            skills_analysis=self.skills_summary,
+            reconversion_analysis=self.reconversion_info,
+            job_description=job_description_str
+        )
+
+    def _build_initial_state(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
         langchain_messages = [HumanMessage(content=m["content"]) if m["role"] == "user" else AIMessage(content=m["content"]) for m in messages]
         
         if not langchain_messages:
             logging.info("Historique de conversation vide. Ajout d'un message de démarrage interne.")
             langchain_messages.append(HumanMessage(content="Bonjour, je suis prêt à commencer l'entretien."))
             
-        initial_state = {
+        return {
             "user_id": self.user_id,
             "job_offer_id": self.job_offer_id,
             "messages": langchain_messages,
-            "job_description": json.dumps(self.job_offer, ensure_ascii=False),
+            "job_description": self.job_description,
+            "system_prompt": self.system_prompt,
         }
-        
-        final_state = self.graph.invoke(initial_state)
-        
-        if not final_state or not final_state.get('messages'):
-            logging.error("L'état final est vide ou ne contient pas de messages.")
-            return {"response": "Erreur: Impossible de générer une réponse.", "status": "finished"}
-        last_message = final_state['messages'][-1]
-        status = "finished" if hasattr(last_message, 'tool_calls') and last_message.tool_calls else "interviewing"
-        response_content = last_message.content
-        
-        return {
-            "response": response_content,
-            "status": status
-        }
\ No newline at end of file
+
+    def invoke(self, messages: List[Dict[str, Any]], config: Optional[Dict[str, Any]] = None):
+        """Point d'entrée pour lancer une conversation dans le graphe."""
+        return self.interview_graph.invoke(self._build_initial_state(messages), config)
+
+    async def ainvoke(self, messages: List[Dict[str, Any]], config: Optional[Dict[str, Any]] = None):
+        """Point d'entrée asynchrone : à utiliser depuis les endpoints `async def`."""
+        return await self.interview_graph.ainvoke(self._build_initial_state(messages), config)
+
+    def astream(self, messages: List[Dict[str, Any]], config: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Variante en streaming de `ainvoke` (voir `InterviewGraph.astream`)."""
+        return self.interview_graph.astream(self._build_initial_state(messages), config)
+
+def get_interview_graph() -> InterviewGraph:
+    """Graphe compilé une seule fois par processus pour les entretiens sans session."""
+    global _interview_graph_instance
+    if _interview_graph_instance is None:
+        with _interview_graph_lock:
+            if _interview_graph_instance is None:
+                _interview_graph_instance = InterviewGraph()
+    return _interview_graph_instance
\ No newline at end of file
@@ -0,0 +1,79 @@
+import uuid
+import asyncio
+import logging
+from typing import Dict, Any, AsyncIterator, Optional
+
+from langchain_core.messages import HumanMessage
+
+from services.graph_service import GraphInterviewProcessor, InterviewGraph
+from src.core.session_checkpointer import build_session_checkpointer
+
+logger = logging.getLogger(__name__)
+
+_session_manager_instance = None
+
+
+class SessionNotFoundError(KeyError):
+    pass
+
+
+class SessionFinishedError(Exception):
+    pass
+
+
+class InterviewSessionManager:
+    """
+    Sessions d'entretien côté serveur. Le CV, l'offre, le prompt système et
+    l'historique sont conservés par le checkpointer LangGraph sous l'identifiant
+    de l'entretien : après le premier tour, le client n'envoie plus que son
+    nouveau message.
+    """
+    def __init__(self):
+        self.checkpointer = build_session_checkpointer()
+        self.interview_graph = InterviewGraph(checkpointer=self.checkpointer)
+
+    @staticmethod
+    def _config(interview_id: str) -> Dict[str, Any]:
+        return {"configurable": {"thread_id": interview_id}}
+
+    async def start(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        # Sérialisation et hachage du CV et de l'offre : hors de la boucle d'événements
+        processor = await asyncio.to_thread(GraphInterviewProcessor, payload, self.interview_graph)
+        interview_id = uuid.uuid4().hex
+        logger.info(f"Nouvelle session d'entretien {interview_id} pour l'utilisateur : {payload['user_id']}")
+        result = await processor.ainvoke(payload.get("messages", []), config=self._config(interview_id))
+        result["interview_id"] = interview_id
+        return result
+
+    async def check_session(self, interview_id: str):
+        snapshot = await self.interview_graph.graph.aget_state(self._config(interview_id))
+        if not snapshot.values:
+            raise SessionNotFoundError(interview_id)
+        if snapshot.values.get("analysis_job_id"):
+            raise SessionFinishedError(interview_id)
+
+    async def send_message(self, interview_id: str, content: str) -> Dict[str, Any]:
+        await self.check_session(interview_id)
+        result = await self.interview_graph.ainvoke(
+            {"messages": [HumanMessage(content=content)]},
+            config=self._config(interview_id)
+        )
+        result["interview_id"] = interview_id
+        return result
+
+    async def stream_message(self, interview_id: str, content: str) -> AsyncIterator[Dict[str, Any]]:
+        """À appeler après `check_session`, pour pouvoir répondre 404/409 avant le flux."""
+        async for event in self.interview_graph.astream(
+            {"messages": [HumanMessage(content=content)]},
+            config=self._config(interview_id)
+        ):
+            if event["event"] == "end":
+                event["data"]["interview_id"] = interview_id
+            yield event
+
+
+def get_session_manager() -> InterviewSessionManager:
+    global _session_manager_instance
+    if _session_manager_instance is None:
+        _session_manager_instance = InterviewSessionManager()
+    return _session_manager_instance
@@ -1,10 +1,19 @@
+import os
 import json
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from crewai import Agent, Task, Crew, Process
+from src.core.metrics import get_metrics
+from src.core.cv_section_splitter import split_cv_sections as split_sections_by_rules
+from src.core.contact_extractor import extract_contact, is_contact_complete
 
 logger = logging.getLogger(__name__)
 
+# Exécute en parallèle les extracteurs indépendants (contact, compétences, expériences, projets, formations)
+CV_PARALLEL_EXTRACTION = os.getenv("CV_PARALLEL_EXTRACTION", "true").lower() == "true"
+# Confiance minimale du découpage par règles ; en dessous, le découpage est confié au LLM (> 1 : toujours le LLM)
+CV_SPLITTER_MIN_CONFIDENCE = float(os.getenv("CV_SPLITTER_MIN_CONFIDENCE", "0.75"))
+
 class CVAgentOrchestrator:
     def __init__(self, llm):
         self.llm = llm
@@ -76,6 +85,22 @@ class CVAgentOrchestrator:
         )
     
     def split_cv_sections(self, cv_content: str) -> Dict[str, str]:
+        """
+        Découpage par lexique d'intitulés et mise en page ; l'appel LLM n'est
+        fait que si la confiance du découpage par règles est insuffisante.
+        """
+        sections, confidence = split_sections_by_rules(cv_content)
+        get_metrics().observe("cv_sections.rule_confidence", confidence)
+        if confidence >= CV_SPLITTER_MIN_CONFIDENCE:
+            get_metrics().increment("cv_sections.rule_based")
+            logger.info(f"Sections découpées par règles (confiance {confidence:.2f})")
+            return sections
+
+        logger.info(f"Confiance du découpage par règles insuffisante ({confidence:.2f}), découpage par LLM")
+        get_metrics().increment("cv_sections.llm_fallback")
+        return self._split_cv_sections_llm(cv_content)
+    
+    def _split_cv_sections_llm(self, cv_content: str) -> Dict[str, str]:
         task = Task(
             description=f"Analyser ce CV et l'organiser en sections: {cv_content}",
             expected_output="""JSON avec sections: contact, experiences, projects, education, skills, other""",
@@ -91,22 +116,44 @@ class CVAgentOrchestrator:
         )
         
         result = crew.kickoff()
+        self._record_token_usage(result)
         return self._parse_sections_result(result)
     
-    def extract_all_sections(self, sections: Dict[str, str]) -> Dict[str, Any]:
+    def extract_all_sections(
+        self,
+        sections: Dict[str, str],
+        parallel: Optional[bool] = None,
+        cv_text: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        En mode parallèle, les cinq extracteurs indépendants sont lancés en même
+        temps (tâches `async_execution`) ; la détection de reconversion et
+        l'assemblage du profil attendent leurs résultats comme en séquentiel.
+        Les coordonnées sont d'abord extraites localement ; l'agent de contact
+        n'est sollicité que si le nom, l'email ou le téléphone manque.
+        """
+        if parallel is None:
+            parallel = CV_PARALLEL_EXTRACTION
+
+        local_contact = extract_contact(sections.get("contact", ""), cv_text)
+        use_contact_agent = not is_contact_complete(local_contact)
+        get_metrics().increment("cv_extraction.contact.agent" if use_contact_agent else "cv_extraction.contact.local")
+
         # Créer les tâches avec les sections en input
-        tasks = self._create_extraction_tasks(sections)
+        tasks = self._create_extraction_tasks(sections, parallel=parallel, use_contact_agent=use_contact_agent)
+        agents = [
+            self.skills_extractor,
+            self.experience_extractor,
+            self.project_extractor,
+            self.education_extractor,
+            self.reconversion_detector,
+            self.profile_builder
+        ]
+        if use_contact_agent:
+            agents.insert(0, self.contact_extractor)
         
         crew = Crew(
-            agents=[
-                self.contact_extractor,
-                self.skills_extractor,
-                self.experience_extractor,
-                self.project_extractor,
-                self.education_extractor,
-                self.reconversion_detector,
-                self.profile_builder
-            ],
+            agents=agents,
             tasks=tasks,
             process=Process.sequential,
             verbose=True,  # Activer pour debug
@@ -120,23 +167,48 @@ class CVAgentOrchestrator:
             "projects": sections.get("projects", ""),
             "education": sections.get("education", ""),
             "skills": sections.get("skills", ""),
-            "other": sections.get("other", "")
+            "other": sections.get("other", ""),
+            "known_contact": json.dumps(local_contact, ensure_ascii=False)
         }
         
-        logger.info(f"Starting crew with inputs: {list(inputs.keys())}")
+        logger.info(f"Starting crew ({'parallel' if parallel else 'sequential'}) with inputs: {list(inputs.keys())}")
         result = crew.kickoff(inputs=inputs)
+        self._record_token_usage(result)
         logger.info(f"Crew completed. Raw result: {result.raw if hasattr(result, 'raw') else str(result)[:200]}...")
         
-        return self._parse_final_result(result)
+        cv_data = self._parse_final_result(result)
+        return self._merge_local_contact(cv_data, local_contact)
+    
+    def _merge_local_contact(self, cv_data: Dict[str, Any], local_contact: Dict[str, str]) -> Dict[str, Any]:
+        """Les champs trouvés localement priment ; l'agent ne complète que les champs manquants."""
+        candidat = cv_data.get("candidat") if isinstance(cv_data, dict) else None
+        if not isinstance(candidat, dict):
+            return cv_data
+        informations = candidat.get("informations_personnelles")
+        if not isinstance(informations, dict):
+            informations = {}
+        for field, value in local_contact.items():
+            if value:
+                informations[field] = value
+            else:
+                informations.setdefault(field, "")
+        candidat["informations_personnelles"] = informations
+        return cv_data
     
-    def _create_extraction_tasks(self, sections: Dict[str, str]) -> List[Task]:
+    def _create_extraction_tasks(
+        self,
+        sections: Dict[str, str],
+        parallel: bool = False,
+        use_contact_agent: bool = True
+    ) -> List[Task]:
         contact_task = Task(
             description=(
                 "Voici la section contact du CV : {contact}\n"
                 "Extraire précisément le nom, email, téléphone et localisation du candidat."
             ),
             expected_output='{"nom": "...", "email": "...", "numero_de_telephone": "...", "localisation": "..."}',
-            agent=self.contact_extractor
+            agent=self.contact_extractor,
+            async_execution=parallel
         )
         
         skills_task = Task(
@@ -148,7 +220,8 @@ class CVAgentOrchestrator:
                 "Extraire toutes les compétences techniques (hard skills) et comportementales (soft skills) mentionnées."
             ),
             expected_output='{"hard_skills": ["compétence1", "compétence2"], "soft_skills": ["compétence1", "compétence2"]}',
-            agent=self.skills_extractor
+            agent=self.skills_extractor,
+            async_execution=parallel
         )
         
         experience_task = Task(
@@ -157,7 +230,8 @@ class CVAgentOrchestrator:
                 "Extraire toutes les expériences professionnelles avec poste, entreprise, dates et responsabilités."
             ),
             expected_output='[{"Poste": "titre", "Entreprise": "nom", "start_date": "date", "end_date": "date", "responsabilités": ["resp1", "resp2"]}]',
-            agent=self.experience_extractor
+            agent=self.experience_extractor,
+            async_execution=parallel
         )
         
         project_task = Task(
@@ -167,7 +241,8 @@ class CVAgentOrchestrator:
                 "Identifier et extraire les projets professionnels et personnels distincts des responsabilités générales."
             ),
             expected_output='{"professional": [{"title": "titre", "technologies": ["tech1"], "outcomes": ["résultat1"]}], "personal": []}',
-            agent=self.project_extractor
+            agent=self.project_extractor,
+            async_execution=parallel
         )
         
         education_task = Task(
@@ -176,9 +251,14 @@ class CVAgentOrchestrator:
                 "Extraire toutes les formations, diplômes et certifications avec institution et dates."
             ),
             expected_output='[{"degree": "diplôme", "institution": "établissement", "start_date": "date", "end_date": "date"}]',
-            agent=self.education_extractor
+            agent=self.education_extractor,
+            async_execution=parallel
         )
         
+        extraction_tasks = [skills_task, experience_task, project_task, education_task]
+        if use_contact_agent:
+            extraction_tasks.insert(0, contact_task)
+
         reconversion_task = Task(
             description=(
                 "En analysant les expériences extraites précédemment, déterminer si le candidat est en reconversion professionnelle. "
@@ -189,11 +269,17 @@ class CVAgentOrchestrator:
             context=[experience_task]
         )
         
+        profile_description = (
+            "Assembler toutes les informations extraites des tâches précédentes en un profil candidat complet. "
+            "Créer un JSON valide avec une clé 'candidat' contenant toutes les sections."
+        )
+        if not use_contact_agent:
+            profile_description += (
+                "\nInformations personnelles déjà extraites du CV, à reprendre telles quelles : {known_contact}"
+            )
+
         profile_task = Task(
-            description=(
-                "Assembler toutes les informations extraites des tâches précédentes en un profil candidat complet. "
-                "Créer un JSON valide avec une clé 'candidat' contenant toutes les sections."
-            ),
+            description=profile_description,
             expected_output=(
                 '{"candidat": {'
                 '"informations_personnelles": {...}, '
@@ -205,10 +291,16 @@ class CVAgentOrchestrator:
                 '}}'
             ),
             agent=self.profile_builder,
-            context=[contact_task, skills_task, experience_task, project_task, education_task, reconversion_task]
+            context=extraction_tasks + [reconversion_task]
         )
         
-        return [contact_task, skills_task, experience_task, project_task, education_task, reconversion_task, profile_task]
+        return extraction_tasks + [reconversion_task, profile_task]
+    
+    def _record_token_usage(self, result):
+        token_usage = getattr(result, "token_usage", None)
+        total_tokens = getattr(token_usage, "total_tokens", 0) if token_usage else 0
+        if total_tokens:
+            get_metrics().increment("cv_extraction.crew.total_tokens", total_tokens)
     
     def _parse_sections_result(self, result) -> Dict[str, str]:
         result_str = result.raw if hasattr(result, 'raw') else str(result)
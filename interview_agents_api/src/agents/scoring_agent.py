@@ -2,7 +2,9 @@ import json
 import re
 import logging
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
+
+from src.core.skill_matcher import SkillMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -19,9 +21,11 @@ class SimpleScoringAgent:
             return {"analyse_competences": []}
 
         skill_analysis = []
+        signals = self._collect_skill_signals(skills_list, candidat_data)
         
         for skill in skills_list:
-            level = self._determine_skill_level(skill, candidat_data)
+            frequency, max_duration, has_pro_experience = signals[skill.lower()]
+            level = self._classify_level(frequency, max_duration, has_pro_experience)
             skill_analysis.append({
                 "skill": skill,
                 "level": level
@@ -29,6 +33,49 @@ class SimpleScoringAgent:
         
         return {"analyse_competences": skill_analysis}
 
+    def _collect_skill_signals(self, skills_list: List[str], candidat_data: Dict[str, Any]) -> Dict[str, Tuple[int, float, bool]]:
+        """
+        Mentions, durée maximale et usage professionnel de toutes les compétences
+        en un seul parcours : le CV est sérialisé et mis en minuscules une fois,
+        puis parcouru par un automate multi-motifs. Mêmes résultats que
+        `_count_skill_mentions`, `_get_max_duration_for_skill` et
+        `_has_professional_experience` appelés compétence par compétence.
+        """
+        experiences_key = "expériences" if "expériences" in candidat_data else "experiences_professionnelles"
+        experiences = candidat_data.get(experiences_key, [])
+        experiences = [exp for exp in experiences if isinstance(exp, dict)] if isinstance(experiences, list) else []
+
+        parts = [json.dumps(exp, ensure_ascii=False).lower() for exp in experiences]
+        projects = candidat_data.get("projets", {})
+        if isinstance(projects, dict):
+            for project_type in ["professional", "personal"]:
+                for project in projects.get(project_type, []):
+                    if isinstance(project, dict):
+                        parts.append(json.dumps(project, ensure_ascii=False).lower())
+        for formation in candidat_data.get("formations", []):
+            if isinstance(formation, dict):
+                parts.append(json.dumps(formation, ensure_ascii=False).lower())
+
+        # Les expériences sont en tête du texte : on garde leurs bornes
+        segments, offset = [], 0
+        for part in parts[:len(experiences)]:
+            segments.append((offset, offset + len(part)))
+            offset += len(part) + 1
+
+        matcher = SkillMatcher([skill.lower() for skill in skills_list])
+        counts, experience_indices = matcher.count_and_locate(" ".join(parts), segments)
+
+        durations: Dict[int, float] = {}
+        signals = {}
+        for pattern, frequency, indices in zip(matcher.patterns, counts, experience_indices):
+            max_duration = 0.0
+            for index in indices:
+                if index not in durations:
+                    durations[index] = self._calculate_experience_duration(experiences[index])
+                max_duration = max(max_duration, durations[index])
+            signals[pattern] = (frequency, max_duration, bool(indices))
+        return signals
+
     def _extract_skills_list(self, skills_data: Dict[str, Any]) -> List[str]:
         """Extrait la liste des compétences"""
         skills_list = []
@@ -47,7 +94,9 @@ class SimpleScoringAgent:
         frequency = self._count_skill_mentions(skill, candidat_data)
         max_duration = self._get_max_duration_for_skill(skill, candidat_data)
         has_pro_experience = self._has_professional_experience(skill, candidat_data)
-        
+        return self._classify_level(frequency, max_duration, has_pro_experience)
+
+    def _classify_level(self, frequency: int, max_duration: float, has_pro_experience: bool) -> str:
         # Règles simples de classification
         if has_pro_experience and max_duration >= 3.0:
             return "expert"
@@ -0,0 +1,47 @@
+import logging
+from typing import Dict, Any, Optional
+
+from langchain_core.messages import SystemMessage, HumanMessage
+
+from src.core.metrics import get_metrics
+from src.schemas.cv_schemas import CVDocument
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_PROMPT = (
+    "Tu es un expert en analyse de CV. Extrais du CV fourni le profil complet du candidat : "
+    "informations personnelles (nom, email, téléphone, localisation), compétences techniques "
+    "(hard skills) et comportementales (soft skills), expériences professionnelles avec poste, "
+    "entreprise, dates et responsabilités, projets professionnels et personnels distincts des "
+    "responsabilités générales, formations et certifications avec institution et dates. "
+    "Détermine enfin si le candidat est en reconversion professionnelle (changement de secteur "
+    "ou de type de poste) et explique pourquoi. N'invente aucune information absente du CV : "
+    "laisse le champ vide."
+)
+
+
+class StructuredCVExtractor:
+    """
+    Moteur d'extraction en un seul appel LLM : le modèle répond directement dans
+    le schéma JSON strict de `CVDocument` (structured output), validé par Pydantic.
+    Remplace le découpage en sections et le crew de sept tâches.
+    """
+    def __init__(self, llm):
+        self.llm = llm
+        self.structured_llm = llm.with_structured_output(CVDocument, method="json_schema", strict=True, include_raw=True)
+
+    def extract(self, cv_text: str) -> Optional[Dict[str, Any]]:
+        result = self.structured_llm.invoke([
+            SystemMessage(content=EXTRACTION_PROMPT),
+            HumanMessage(content=cv_text)
+        ])
+
+        usage = getattr(result.get("raw"), "usage_metadata", None) or {}
+        if usage.get("total_tokens"):
+            get_metrics().increment("cv_extraction.structured.total_tokens", usage["total_tokens"])
+
+        if result.get("parsing_error") or result.get("parsed") is None:
+            logger.error(f"Sortie structurée invalide : {result.get('parsing_error')}")
+            return None
+
+        return result["parsed"].model_dump(by_alias=True)
@@ -2,7 +2,6 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 from langchain_groq import ChatGroq
-from langchain_community.document_loaders import PyPDFLoader
 from langchain_openai import ChatOpenAI
 from typing import Dict, List, Any, Tuple, Optional, Type
 from crewai import LLM
@@ -39,12 +38,9 @@ def read_system_prompt(file_path):
         return file.read()
 
 def load_pdf(pdf_path):
-    loader = PyPDFLoader(pdf_path)
-    pages = loader.load_and_split()
-    cv_text = ""
-    for page in pages:
-        cv_text += page.page_content + "\n\n"
-    return cv_text    
+    from src.core.pdf_extractor import extract_pdf_text
+    with open(pdf_path, "rb") as f:
+        return extract_pdf_text(f.read())
 
 #########################################################################################################        
 # modéles 
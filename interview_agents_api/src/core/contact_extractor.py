@@ -0,0 +1,100 @@
+import re
+from typing import Dict, List, Optional
+
+from src.core.cv_section_splitter import EMAIL_PATTERN, PHONE_PATTERN, HEADING_PATTERNS, normalize_text
+
+CONTACT_FIELDS = ("nom", "email", "numero_de_telephone", "localisation")
+# Champs sans lesquels l'extracteur de contact LLM reste nécessaire
+REQUIRED_CONTACT_FIELDS = ("nom", "email", "numero_de_telephone")
+
+NAME_SCAN_LINES = 8
+NAME_TOKEN_PATTERN = re.compile(r"^[A-ZÀ-ÖØ-Þ][A-Za-zÀ-ÖØ-öø-ÿ'’-]*\.?$")
+# Mots qui signalent un intitulé de poste ou une accroche plutôt qu'un nom
+TITLE_WORDS = {
+    "developpeur", "developpeuse", "developer", "ingenieur", "ingenieure", "engineer", "data", "scientist",
+    "analyste", "analyst", "chef", "manager", "consultant", "consultante", "stagiaire", "stage", "alternance",
+    "alternant", "alternante", "etudiant", "etudiante", "student", "responsable", "directeur", "directrice",
+    "assistant", "assistante", "technicien", "technicienne", "architecte", "architect", "designer", "freelance",
+    "full", "stack", "fullstack", "backend", "frontend", "devops", "lead", "senior", "junior", "curriculum",
+    "vitae", "cv", "resume", "profil", "contact", "recherche", "python", "java", "web", "logiciel", "software",
+}
+LOCATION_LABEL_PATTERN = re.compile(r"^(?:adresse|localisation|location|ville|address|lieu)\s*:\s*(.+)$", re.IGNORECASE)
+POSTCODE_CITY_PATTERN = re.compile(r"\b\d{5}\s+[A-ZÀ-Þ][A-Za-zÀ-ÿ' -]+")
+CITY_COUNTRY_PATTERN = re.compile(r"^([A-ZÀ-Þ][A-Za-zÀ-ÿ' -]+,\s*(?:France|Belgique|Suisse|Canada|Maroc|Tunisie|Algérie|Sénégal|Luxembourg))\b")
+FIELD_SEPARATOR_PATTERN = re.compile(r"\s*[|•·▪●–—]\s*")
+
+
+def _candidate_lines(text: str) -> List[str]:
+    lines = []
+    for line in text.splitlines():
+        lines.extend(part.strip() for part in FIELD_SEPARATOR_PATTERN.split(line) if part.strip())
+    return lines
+
+
+def _is_heading(line: str) -> bool:
+    normalized = normalize_text(line.split(":", 1)[0])
+    for _, pattern in HEADING_PATTERNS:
+        match = pattern.match(normalized)
+        if match and not match.group(1).strip():
+            return True
+    return False
+
+
+def _extract_name(lines: List[str], email: str) -> str:
+    email_local = normalize_text(email.split("@")[0].replace(".", " ").replace("_", " ")) if email else ""
+    candidates = []
+    for position, line in enumerate(lines[:NAME_SCAN_LINES]):
+        tokens = line.split()
+        if not 2 <= len(tokens) <= 4 or any(c.isdigit() for c in line) or "@" in line or _is_heading(line):
+            continue
+        if not all(NAME_TOKEN_PATTERN.match(token) for token in tokens):
+            continue
+        normalized_tokens = normalize_text(line).split()
+        if any(token in TITLE_WORDS for token in normalized_tokens):
+            continue
+        # Un nom qui se retrouve dans l'adresse email est presque certain
+        score = sum(1 for token in normalized_tokens if len(token) > 1 and token in email_local)
+        candidates.append((score, -position, line))
+    if not candidates:
+        return ""
+    return max(candidates)[2]
+
+
+def _extract_location(lines: List[str]) -> str:
+    for line in lines:
+        labelled = LOCATION_LABEL_PATTERN.match(line)
+        if labelled:
+            return labelled.group(1).strip()
+    for line in lines:
+        for pattern in (POSTCODE_CITY_PATTERN, CITY_COUNTRY_PATTERN):
+            match = pattern.search(line)
+            if match:
+                return match.group(0).strip(" ,")
+    return ""
+
+
+def extract_contact(contact_section: str, cv_text: Optional[str] = None) -> Dict[str, str]:
+    """
+    Extraction déterministe des coordonnées : email et téléphone par expressions
+    régulières, nom parmi les premières lignes du CV, localisation sur un libellé
+    explicite ou un code postal. Les champs introuvables restent vides.
+    """
+    header = contact_section or ""
+    if cv_text:
+        header = "\n".join(cv_text.strip().splitlines()[:NAME_SCAN_LINES]) + f"\n{header}"
+    lines = _candidate_lines(header)
+
+    email_match = EMAIL_PATTERN.search(header)
+    phone_match = PHONE_PATTERN.search(header)
+    email = email_match.group(0).strip(".") if email_match else ""
+
+    return {
+        "nom": _extract_name(lines, email),
+        "email": email,
+        "numero_de_telephone": phone_match.group(0).strip() if phone_match else "",
+        "localisation": _extract_location(lines),
+    }
+
+
+def is_contact_complete(contact: Dict[str, str]) -> bool:
+    return all(contact.get(field) for field in REQUIRED_CONTACT_FIELDS)
@@ -0,0 +1,201 @@
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+SECTION_KEYS = ("contact", "experiences", "projects", "education", "skills", "other")
+
+# Intitulés de sections (français / anglais), comparés sans accents ni casse.
+# Les intitulés les plus longs sont testés en premier.
+HEADING_LEXICON: Dict[str, List[str]] = {
+    "contact": [
+        "contact", "contacts", "coordonnees", "informations personnelles", "infos personnelles",
+        "etat civil", "personal information", "personal details", "contact information", "contact details",
+    ],
+    "experiences": [
+        "experiences professionnelles", "experience professionnelle", "experiences", "experience",
+        "parcours professionnel", "historique professionnel", "emplois", "stages", "stage",
+        "alternance", "work experience", "professional experience", "employment history", "employment",
+        "work history", "internships", "internship", "career",
+    ],
+    "projects": [
+        "projets personnels", "projets professionnels", "projets academiques", "projets", "projet",
+        "realisations", "principales realisations", "projects", "personal projects", "academic projects",
+        "side projects", "portfolio",
+    ],
+    "education": [
+        "formations", "formation", "formation academique", "parcours academique", "parcours scolaire",
+        "diplomes", "diplomes et formations", "cursus", "etudes", "certifications", "certificats",
+        "education", "academic background", "qualifications", "certificates",
+    ],
+    "skills": [
+        "competences techniques", "competences cles", "competences", "savoir-faire", "savoir faire",
+        "savoir-etre", "outils", "technologies", "stack technique", "environnement technique",
+        "langages", "informatique", "hard skills", "soft skills", "skills", "technical skills",
+        "key skills", "tools",
+    ],
+    "other": [
+        "langues", "centres d'interet", "centres d interet", "loisirs", "interets", "hobbies",
+        "interests", "languages", "profil", "a propos", "a propos de moi", "resume", "summary",
+        "about me", "about", "objectif", "objectif professionnel", "references", "benevolat",
+        "volunteering", "activites", "vie associative", "activites extra-professionnelles",
+        "publications", "distinctions", "awards",
+    ],
+}
+
+MAX_HEADING_WORDS = 6
+MAX_HEADING_CHARS = 60
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_PATTERN = re.compile(r"(?:(?:\+|00)\d{1,3}[\s.-]?\(?0?\)?|\b0)\d(?:[\s.-]?\d{2}){4}\b|\+\d{1,3}(?:[\s.-]?\d{2,4}){2,5}\b")
+PAGE_NUMBER_PATTERN = re.compile(r"^(?:page\s*)?\d{1,2}\s*(?:/|sur|of)\s*\d{1,2}$|^page\s*\d{1,2}$", re.IGNORECASE)
+BULLET_PATTERN = re.compile(r"^[\s•▪●◦■□➢➤►\-–—*·]+(?=\S)")
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = text.replace("’", "'")
+    text = re.sub(r"[^a-z0-9' -]+", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _build_heading_patterns() -> List[Tuple[str, re.Pattern]]:
+    entries = [(section, keyword) for section, keywords in HEADING_LEXICON.items() for keyword in keywords]
+    entries.sort(key=lambda entry: len(entry[1]), reverse=True)
+    return [(section, re.compile(rf"^{re.escape(keyword)}\b(.*)$")) for section, keyword in entries]
+
+
+HEADING_PATTERNS = _build_heading_patterns()
+
+
+class RuleBasedSectionSplitter:
+    """
+    Découpage déterministe d'un CV en sections (contact, experiences, projects,
+    education, skills, other) à partir d'un lexique d'intitulés et des indices
+    de mise en page du texte extrait du PDF : lignes courtes, majuscules, deux
+    points finaux, lignes isolées par des lignes vides. Renvoie aussi un score
+    de confiance qui permet de se rabattre sur le découpage par LLM.
+    """
+
+    def split(self, cv_text: str) -> Tuple[Dict[str, str], float]:
+        lines = self._clean_lines(cv_text)
+        sections: Dict[str, List[str]] = {key: [] for key in SECTION_KEYS}
+        preamble: List[str] = []
+        current: Optional[str] = None
+        found = set()
+
+        for index, line in enumerate(lines):
+            heading = self._match_heading(lines, index)
+            if heading is not None:
+                section, inline = heading
+                if inline:
+                    # Intitulé en ligne ("Technologies : ...") : simple étiquette au sein
+                    # de la section courante, on ne change de section qu'en tête de CV.
+                    # Il ne compte pas comme intitulé trouvé pour la confiance. La ligne
+                    # est gardée entière : l'étiquette distingue langues, outils, etc.
+                    if current is None:
+                        current = section
+                    sections[current].append(line)
+                else:
+                    found.add(section)
+                    current = section
+                continue
+            if line:
+                (sections[current] if current else preamble).append(line)
+
+        # Le bloc précédant le premier intitulé est l'en-tête du CV (nom, coordonnées, accroche)
+        sections["contact"] = preamble + sections["contact"]
+        self._collect_contact_lines(sections)
+
+        result = {key: "\n".join(value).strip() for key, value in sections.items()}
+        return result, self._confidence(result, found, preamble, lines)
+
+    def _clean_lines(self, cv_text: str) -> List[str]:
+        pages = [page for page in re.split(r"\n\s*\n\s*\n|\f", cv_text) if page.strip()]
+        raw_lines = [line.rstrip() for line in cv_text.splitlines()]
+
+        # En-têtes et pieds de page répétés sur chaque page (nom, numéro de page...)
+        repeated = set()
+        if len(pages) > 1:
+            counts = Counter(line.strip() for page in pages for line in set(page.splitlines()) if line.strip())
+            repeated = {line for line, count in counts.items() if count >= len(pages) and len(line) < MAX_HEADING_CHARS}
+
+        cleaned, seen_repeated = [], set()
+        for line in raw_lines:
+            stripped = line.strip()
+            if PAGE_NUMBER_PATTERN.match(stripped):
+                continue
+            if stripped in repeated:
+                # On conserve la première occurrence (souvent le nom du candidat)
+                if stripped in seen_repeated:
+                    continue
+                seen_repeated.add(stripped)
+            cleaned.append(stripped)
+        return cleaned
+
+    def _match_heading(self, lines: List[str], index: int) -> Optional[Tuple[str, str]]:
+        line = BULLET_PATTERN.sub("", lines[index]).strip()
+        if not line or EMAIL_PATTERN.search(line):
+            return None
+
+        # "Compétences : Python, SQL" -> intitulé suivi du contenu sur la même ligne
+        inline = None
+        if ":" in line:
+            label, inline = line.split(":", 1)
+            line = label.strip()
+            inline = inline.strip()
+        if len(line) > MAX_HEADING_CHARS:
+            return None
+
+        normalized = normalize_text(line)
+        if not normalized or len(normalized.split()) > MAX_HEADING_WORDS:
+            return None
+
+        for section, pattern in HEADING_PATTERNS:
+            match = pattern.match(normalized)
+            if match is None:
+                continue
+            extra = match.group(1).strip()
+            if not extra or inline is not None or self._looks_like_heading(lines, index, line):
+                return section, inline or ""
+            return None
+        return None
+
+    def _looks_like_heading(self, lines: List[str], index: int, line: str) -> bool:
+        letters = [c for c in line if c.isalpha()]
+        if letters and sum(c.isupper() for c in letters) / len(letters) > 0.8:
+            return True
+        previous_blank = index == 0 or not lines[index - 1]
+        next_blank = index + 1 >= len(lines) or not lines[index + 1]
+        return previous_blank and next_blank
+
+    def _collect_contact_lines(self, sections: Dict[str, List[str]]):
+        contact_text = "\n".join(sections["contact"])
+        if EMAIL_PATTERN.search(contact_text) and PHONE_PATTERN.search(contact_text):
+            return
+        # Coordonnées placées dans une colonne latérale ou en pied de page
+        for key in ("other", "skills", "education", "experiences", "projects"):
+            for line in sections[key]:
+                if (EMAIL_PATTERN.search(line) or PHONE_PATTERN.search(line)) and line not in sections["contact"]:
+                    sections["contact"].append(line)
+
+    def _confidence(self, sections: Dict[str, str], found: set, preamble: List[str], lines: List[str]) -> float:
+        score = 0.0
+        for key in ("experiences", "education", "skills"):
+            if key in found and sections[key]:
+                score += 0.25
+        if EMAIL_PATTERN.search(sections["contact"]) or PHONE_PATTERN.search(sections["contact"]):
+            score += 0.15
+        # Un en-tête trop long signifie des intitulés non reconnus
+        total_chars = sum(len(line) for line in lines) or 1
+        if sum(len(line) for line in preamble) / total_chars <= 0.4:
+            score += 0.10
+        return round(score, 2)
+
+
+_splitter = RuleBasedSectionSplitter()
+
+
+def split_cv_sections(cv_text: str) -> Tuple[Dict[str, str], float]:
+    return _splitter.split(cv_text)
@@ -1,56 +1,315 @@
+import os
+import copy
+import json
+import time
+import hashlib
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
 import torch
+import numpy as np
 from transformers import pipeline
-from sentence_transformers import SentenceTransformer, util
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Hashable, Callable, Tuple
+
+from src.core.inference_scheduler import MicroBatchScheduler, INFERENCE_BATCHING, INFERENCE_MAX_BATCH_SIZE
+from src.core.intent_classifier import EmbeddingIntentClassifier, INTENT_ENGINE, INTENT_LABELS
+from src.core import onnx_backend
+from src.core.onnx_backend import ANALYZER_BACKEND, ANALYZER_BACKENDS
+from src.core.embedding_service import EmbeddingService, EMBEDDING_MODEL, load_sentence_encoder
+from src.core.offer_embedding_store import OfferEmbeddingStore
+
+SENTIMENT_MODEL = "astrosbd/french_emotion_camembert"
+INTENT_MODEL = "joeddav/xlm-roberta-large-xnli"
+
+# Sentiment, similarité et intention exécutés en parallèle dans run_full_analysis
+ANALYZER_CONCURRENT_STAGES = os.getenv("ANALYZER_CONCURRENT_STAGES", "false").lower() == "true"
+ANALYZER_STAGE_THREADS = int(os.getenv("ANALYZER_STAGE_THREADS", str(max(1, (os.cpu_count() or 1) // 3))))
+
+# "chunked" : réponses découpées et encodées en un lot, scores agrégés ; "joined" : un seul texte concaténé
+SIMILARITY_ENGINE = os.getenv("SIMILARITY_ENGINE", "chunked")
+SIMILARITY_POOLING = os.getenv("SIMILARITY_POOLING", "mean")
+# Taille des segments en sous-mots ; 0 : limite du modèle (max_seq_length moins [CLS] et [SEP])
+SIMILARITY_CHUNK_TOKENS = int(os.getenv("SIMILARITY_CHUNK_TOKENS", "0"))
+
+
+def message_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def chunk_tokens(text: str, tokenizer, size: int) -> List[Tuple[str, int]]:
+    """
+    Segments (texte, nombre de sous-mots) d'au plus `size` sous-mots, découpés
+    sur les ids du tokenizer. Les coupes tombent en début de mot quand c'est
+    possible, pour qu'un segment se re-tokenise à l'identique.
+    """
+    encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+    offsets, word_ids = encoding["offset_mapping"], encoding.word_ids()
+    chunks, start = [], 0
+    while start < len(offsets):
+        end = min(start + size, len(offsets))
+        if end < len(offsets):
+            cut = end
+            while cut > start + 1 and word_ids[cut] == word_ids[cut - 1]:
+                cut -= 1
+            if word_ids[cut] != word_ids[cut - 1]:
+                end = cut
+        chunks.append((text[offsets[start][0]:offsets[end - 1][1]], end - start))
+        start = end
+    return chunks
+
+
+def similarity_key(answers: List[str], job_requirements: str) -> str:
+    """Clé de la similarité réponses / poste : elle porte sur l'ensemble des réponses."""
+    return hashlib.sha1(json.dumps([answers, job_requirements], ensure_ascii=False).encode("utf-8")).hexdigest()
+
 
 class MultiModelInterviewAnalyzer:
-    def __init__(self):
-        self.sentiment_analyzer = pipeline(
-            "text-classification",
-            model="astrosbd/french_emotion_camembert",
-            return_all_scores=True,
-            device=0 if torch.cuda.is_available() else -1,
-        )
-        self.similarity_model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.intent_classifier = pipeline(
-            "zero-shot-classification",
-            model="joeddav/xlm-roberta-large-xnli"
-        )
+    def __init__(
+        self,
+        batching: bool = INFERENCE_BATCHING,
+        intent_engine: str = INTENT_ENGINE,
+        backend: str = ANALYZER_BACKEND,
+        concurrent_stages: bool = ANALYZER_CONCURRENT_STAGES,
+        embedding_service: Optional[EmbeddingService] = None,
+        offer_embeddings: Optional[OfferEmbeddingStore] = None,
+        similarity_engine: str = SIMILARITY_ENGINE,
+        similarity_pooling: str = SIMILARITY_POOLING
+    ):
+        if similarity_engine not in ("chunked", "joined"):
+            raise ValueError(f"Moteur de similarité inconnu : {similarity_engine}")
+        if similarity_pooling not in ("mean", "max"):
+            raise ValueError(f"Agrégation de similarité inconnue : {similarity_pooling}")
+        self.similarity_engine = similarity_engine
+        self.similarity_pooling = similarity_pooling
+        if backend not in ANALYZER_BACKENDS:
+            raise ValueError(f"Backend d'inférence inconnu : {backend}")
+        self.backend = backend
+        if backend == "onnx":
+            # Artefacts int8 construits par scripts/build_onnx_models.py
+            self.sentiment_analyzer = onnx_backend.load_pipeline("text-classification", SENTIMENT_MODEL, return_all_scores=True)
+        else:
+            self.sentiment_analyzer = pipeline(
+                "text-classification",
+                model=SENTIMENT_MODEL,
+                return_all_scores=True,
+                device=0 if torch.cuda.is_available() else -1,
+            )
+        # Encodeur MiniLM partagé avec le RAG et le rapprochement (voir src/models.py)
+        self.embedding_service = embedding_service or EmbeddingService(load_sentence_encoder(backend))
+        self.similarity_model = self.embedding_service.model
+        # Copie dédiée au découpage : le tokenizer rapide du modèle change d'état
+        # (troncature, padding) à chaque encode et ne supporte pas les appels concurrents
+        self.chunk_tokenizer = copy.deepcopy(self.similarity_model.tokenizer)
+        self._chunk_lock = threading.Lock()
+        max_tokens = self.similarity_model.max_seq_length - 2
+        self.chunk_size = min(SIMILARITY_CHUNK_TOKENS, max_tokens) if SIMILARITY_CHUNK_TOKENS > 0 else max_tokens
+        # Embeddings persistants des offres : seules les réponses sont encodées à chaque analyse
+        self.offer_embeddings = offer_embeddings
+
+        # Étapes en parallèle : les threads intra-op de torch sont répartis entre les trois modèles
+        self.stage_executor = None
+        thread_initializer = None
+        if concurrent_stages:
+            torch.set_num_threads(ANALYZER_STAGE_THREADS)
+            thread_initializer = partial(torch.set_num_threads, ANALYZER_STAGE_THREADS)
+            self.stage_executor = ThreadPoolExecutor(
+                max_workers=3, thread_name_prefix="analysis-stage", initializer=thread_initializer
+            )
+
+        # Les analyses concurrentes partagent des lots dynamiques par modèle
+        self.batching = batching
+        self.sentiment_scheduler = MicroBatchScheduler("sentiment", self._sentiment_batch, thread_initializer=thread_initializer)
+        self.embedding_scheduler = MicroBatchScheduler("embedding", self._embedding_batch, thread_initializer=thread_initializer)
+        self.intent_scheduler = MicroBatchScheduler("intent", self._intent_batch, thread_initializer=thread_initializer)
+
+        # Le modèle NLI (~560M paramètres) n'est chargé que s'il est le moteur retenu
+        if intent_engine not in ("nli", "embedding"):
+            raise ValueError(f"Moteur d'intention inconnu : {intent_engine}")
+        self.intent_engine = intent_engine
+        self.intent_classifier = None
+        self.embedding_intent_classifier = None
+        if intent_engine == "nli" and backend == "onnx":
+            self.intent_classifier = onnx_backend.load_pipeline("zero-shot-classification", INTENT_MODEL)
+        elif intent_engine == "nli":
+            self.intent_classifier = pipeline(
+                "zero-shot-classification",
+                model=INTENT_MODEL
+            )
+        else:
+            self.embedding_intent_classifier = EmbeddingIntentClassifier(self.encode_texts)
+
+    def encode_texts(self, texts: List[str]) -> np.ndarray:
+        """Embeddings MiniLM normalisés d'un lot de textes : cache partagé, puis micro-batching si actif."""
+        encoder = self.embedding_scheduler.submit if self.batching else None
+        return self.embedding_service.encode(texts, encoder=encoder)
+
+    def _sentiment_batch(self, texts: List[str], _key: Optional[Hashable] = None) -> List[Any]:
+        return self.sentiment_analyzer(texts, batch_size=INFERENCE_MAX_BATCH_SIZE)
+
+    def _embedding_batch(self, texts: List[str], _key: Optional[Hashable] = None) -> List[Any]:
+        return list(self.embedding_service.encode_uncached(texts))
+
+    def _intent_batch(self, texts: List[str], candidate_labels: Optional[Hashable] = None) -> List[Any]:
+        results = self.intent_classifier(texts, list(candidate_labels), multi_label=False, batch_size=INFERENCE_MAX_BATCH_SIZE)
+        # Une seule séquence : le pipeline renvoie un dict et non une liste
+        return [results] if isinstance(results, dict) else results
+
+    def _sentiments(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        if not texts:
+            return []
+        if self.batching:
+            return self.sentiment_scheduler.submit(texts)
+        return self.sentiment_analyzer(texts)
 
     def analyze_sentiment(self, messages: List[Dict[str, str]]) -> List[List[Dict[str, Any]]]:
         user_messages = [msg['content'] for msg in messages if msg['role'] == 'user']
-        if not user_messages:
-            return []
-        return self.sentiment_analyzer(user_messages)
+        return self._sentiments(user_messages)
+
+    def offer_embedding(self, job_requirements: str, job_offer_id: Optional[str] = None) -> np.ndarray:
+        """Embedding de la description du poste, lu dans le store des offres quand l'offre est identifiée."""
+        if self.offer_embeddings is None or not job_offer_id:
+            return self.encode_texts([job_requirements])[0]
+        return self.offer_embeddings.get_or_compute(
+            str(job_offer_id), job_requirements, lambda text: self.encode_texts([text])[0]
+        )
 
-    def compute_semantic_similarity(self, messages: List[Dict[str, str]], job_requirements: str) -> float:
-        user_answers = " ".join([msg['content'] for msg in messages if msg['role'] == 'user'])
-        embedding_answers = self.similarity_model.encode(user_answers, convert_to_tensor=True)
-        embedding_requirements = self.similarity_model.encode(job_requirements, convert_to_tensor=True)
-        cosine_score = util.cos_sim(embedding_answers, embedding_requirements)
-        return cosine_score.item()
+    def semantic_similarity(self, messages: List[Dict[str, str]], job_requirements: str, job_offer_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Similarité des réponses avec le poste : `score` global et `answer_scores`
+        par réponse (moteur "chunked" uniquement). Chaque réponse est découpée
+        sur les ids du tokenizer en segments d'au plus `chunk_size` sous-mots
+        (aucune troncature par le modèle), tous encodés en un lot ; le score
+        d'une réponse est la moyenne de ses segments pondérée par leur nombre
+        de sous-mots, le score global la moyenne pondérée ou le maximum des réponses.
+        """
+        answers = [msg['content'] for msg in messages if msg['role'] == 'user']
+        embedding_requirements = self.offer_embedding(job_requirements, job_offer_id)
+        if self.similarity_engine == "joined":
+            embedding_answers = self.encode_texts([" ".join(answers)])[0]
+            # Vecteurs normalisés : le produit scalaire est le cosinus
+            return {"score": float(np.dot(embedding_answers, embedding_requirements)), "answer_scores": []}
 
-    def classify_candidate_intent(self, messages: List[Dict[str, str]]) -> List[Dict[str, Any]]:
-        user_answers = [msg['content'] for msg in messages if msg['role'] == 'user']
-        if not user_answers:
+        chunks, owners, weights = [], [], []
+        with self._chunk_lock:
+            segments = [chunk_tokens(answer, self.chunk_tokenizer, self.chunk_size) for answer in answers]
+        for index, answer_segments in enumerate(segments):
+            for chunk, length in answer_segments:
+                chunks.append(chunk)
+                owners.append(index)
+                weights.append(length)
+        if not chunks:
+            return {"score": 0.0, "answer_scores": [0.0] * len(answers)}
+
+        chunk_scores = self.encode_texts(chunks) @ embedding_requirements
+        owners = np.asarray(owners)
+        weights = np.asarray(weights, dtype=np.float32)
+        answer_scores = [
+            float(np.average(chunk_scores[owners == index], weights=weights[owners == index])) if np.any(owners == index) else 0.0
+            for index in range(len(answers))
+        ]
+        if self.similarity_pooling == "max":
+            score = max(answer_scores[index] for index in set(owners.tolist()))
+        else:
+            score = float(np.average(chunk_scores, weights=weights))
+        return {"score": score, "answer_scores": answer_scores}
+
+    def compute_semantic_similarity(self, messages: List[Dict[str, str]], job_requirements: str, job_offer_id: Optional[str] = None) -> float:
+        return self.semantic_similarity(messages, job_requirements, job_offer_id)["score"]
+
+    def _intents(self, texts: List[str]) -> List[Dict[str, Any]]:
+        if not texts:
             return []
+        if self.embedding_intent_classifier is not None:
+            return self.embedding_intent_classifier(texts)
         
-        candidate_labels = [
-            "parle de son expérience technique",
-            "exprime sa motivation",
-            "pose une question",
-            "exprime de l'incertitude ou du stress"
-        ]
-        return self.intent_classifier(user_answers, candidate_labels, multi_label=False)
+        candidate_labels = INTENT_LABELS
+        if self.batching:
+            return self.intent_scheduler.submit(texts, key=tuple(candidate_labels))
+        results = self.intent_classifier(texts, candidate_labels, multi_label=False)
+        return [results] if isinstance(results, dict) else results
+
+    def classify_candidate_intent(self, messages: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        user_answers = [msg['content'] for msg in messages if msg['role'] == 'user']
+        return self._intents(user_answers)
+
+    def analyze_answers(self, answers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Sentiment et intention de réponses isolées, indexés par `message_key`."""
+        distinct = list(dict.fromkeys(answers))
+        sentiments = self._sentiments(distinct)
+        intents = self._intents(distinct)
+        return {
+            message_key(answer): {"sentiment": sentiment, "intent": intent}
+            for answer, sentiment, intent in zip(distinct, sentiments, intents)
+        }
+
+    def _run_stages(self, stages: Dict[str, Callable[[], Any]]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Exécute les étapes (en parallèle si activé) ; renvoie résultats et durées en secondes par étape."""
+        timings: Dict[str, float] = {}
+
+        def timed(name: str, stage: Callable[[], Any]) -> Any:
+            start = time.perf_counter()
+            result = stage()
+            timings[name] = round(time.perf_counter() - start, 4)
+            return result
+
+        if self.stage_executor is not None and len(stages) > 1:
+            futures = {name: self.stage_executor.submit(timed, name, stage) for name, stage in stages.items()}
+            results = {name: future.result() for name, future in futures.items()}
+        else:
+            results = {name: timed(name, stage) for name, stage in stages.items()}
+        return results, timings
+
+    def run_full_analysis(
+        self,
+        conversation_history: List[Dict[str, str]],
+        job_requirements: str,
+        precomputed: Optional[Dict[str, Dict[str, Any]]] = None,
+        job_offer_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Sans `precomputed`, analyse toute la conversation. Avec les résultats
+        par message et les similarités déjà calculés au fil de l'entretien
+        (`{"messages": ..., "similarity": ...}`, voir TurnAnalysisService), se
+        contente de les assembler et ne calcule que ce qui manque.
+        """
+        if precomputed is None:
+            results, stage_timings = self._run_stages({
+                "sentiment": lambda: self.analyze_sentiment(conversation_history),
+                "similarity": lambda: self.semantic_similarity(conversation_history, job_requirements, job_offer_id),
+                "intent": lambda: self.classify_candidate_intent(conversation_history),
+            })
+            sentiment_results = results["sentiment"]
+            similarity = results["similarity"]
+            intent_results = results["intent"]
+        else:
+            answers = [msg['content'] for msg in conversation_history if msg['role'] == 'user']
+            per_message = precomputed.setdefault("messages", {})
+            missing = [answer for answer in dict.fromkeys(answers) if message_key(answer) not in per_message]
+            similarities = precomputed.setdefault("similarity", {})
+            key = similarity_key(answers, job_requirements)
+
+            stages = {}
+            if missing:
+                stages["sentiment"] = lambda: self._sentiments(missing)
+                stages["intent"] = lambda: self._intents(missing)
+            if key not in similarities:
+                stages["similarity"] = lambda: self.semantic_similarity(conversation_history, job_requirements, job_offer_id)
+            results, stage_timings = self._run_stages(stages)
 
-    def run_full_analysis(self, conversation_history: List[Dict[str, str]], job_requirements: str) -> Dict[str, Any]:
-        sentiment_results = self.analyze_sentiment(conversation_history)
-        similarity_score = self.compute_semantic_similarity(conversation_history, job_requirements)
-        intent_results = self.classify_candidate_intent(conversation_history)
+            for answer, sentiment, intent in zip(missing, results.get("sentiment", []), results.get("intent", [])):
+                per_message[message_key(answer)] = {"sentiment": sentiment, "intent": intent}
+            if "similarity" in results:
+                similarities[key] = results["similarity"]
+            sentiment_results = [per_message[message_key(answer)]["sentiment"] for answer in answers]
+            intent_results = [per_message[message_key(answer)]["intent"] for answer in answers]
+            similarity = similarities[key]
         
         return {
-            "overall_similarity_score": round(similarity_score, 2),
+            "overall_similarity_score": round(similarity["score"], 2),
+            "answer_similarity_scores": [round(score, 2) for score in similarity["answer_scores"]],
             "sentiment_analysis": sentiment_results,
             "intent_analysis": intent_results,
-            "raw_transcript": conversation_history 
+            "raw_transcript": conversation_history,
+            "stage_timings": stage_timings
         }
\ No newline at end of file
@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.core.metrics import get_metrics
+from src.core import onnx_backend
+from src.core.onnx_backend import ANALYZER_BACKEND, ONNX_QUANTIZATION_ARCH
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
+
+def embedding_signature(backend: str = ANALYZER_BACKEND, arch: str = ONNX_QUANTIZATION_ARCH) -> str:
+    """Identifie l'espace des vecteurs produits : modèle, backend et, en ONNX, cible de quantification."""
+    if backend == "onnx":
+        return f"{EMBEDDING_MODEL}:onnx-int8-{arch}"
+    return f"{EMBEDDING_MODEL}:{backend}"
+
+
+def read_embedding_signature(path: str) -> Optional[str]:
+    """Signature enregistrée à côté d'un index persistant, None si absente ou illisible."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("embedding")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def write_embedding_signature(path: str, signature: str):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"embedding": signature}, f)
+    os.replace(tmp_path, path)
+
+
+def load_sentence_encoder(backend: str = ANALYZER_BACKEND):
+    if backend == "onnx":
+        return onnx_backend.load_sentence_encoder(EMBEDDING_MODEL)
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
+class EmbeddingService:
+    """
+    Encodeur de phrases MiniLM unique du processus, partagé par l'analyse
+    d'entretien, le rapprochement profils / offres et le RAG. Les vecteurs
+    (float32, normalisés) sont mis en cache LRU par hash du texte ; les textes
+    absents du cache sont encodés en un seul lot. `signature` identifie le
+    modèle et le backend : les index persistés avec une autre signature sont
+    reconstruits plutôt que mélangés à ces vecteurs.
+    """
+    def __init__(
+        self,
+        model,
+        cache_size: int = EMBEDDING_CACHE_SIZE,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        signature: Optional[str] = None
+    ):
+        self.model = model
+        self.signature = signature or embedding_signature()
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def encode_uncached(self, texts: List[str]) -> np.ndarray:
+        """Inférence directe, sans passer par le cache."""
+        start = time.perf_counter()
+        vectors = self.model.encode(
+            texts, batch_size=self.batch_size, normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32, copy=False)
+        metrics = get_metrics()
+        metrics.observe("embedding.encode_seconds", time.perf_counter() - start)
+        metrics.observe("embedding.batch_size", len(texts))
+        return vectors
+
+    def encode(
+        self,
+        texts: List[str],
+        encoder: Optional[Callable[[List[str]], np.ndarray]] = None,
+        use_cache: bool = True
+    ) -> np.ndarray:
+        """
+        Embeddings normalisés de `texts`, dans l'ordre (tableau (n, dim)).
+        `encoder` remplace l'inférence directe pour les textes absents du cache
+        (ex. micro-batching de l'analyseur).
+        """
+        encoder = encoder or self.encode_uncached
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        if not use_cache or self.cache_size <= 0:
+            return np.asarray(encoder(list(texts)), dtype=np.float32)
+
+        keys = [self._key(text) for text in texts]
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    vectors[i] = vector
+
+        missing = {}
+        for i, key in enumerate(keys):
+            if vectors[i] is None:
+                missing.setdefault(key, []).append(i)
+        metrics = get_metrics()
+        metrics.increment("embedding.cache_hits", len(texts) - sum(len(p) for p in missing.values()))
+        metrics.increment("embedding.cache_misses", len(missing))
+
+        if missing:
+            missing_texts = [texts[positions[0]] for positions in missing.values()]
+            encoded = np.asarray(encoder(missing_texts), dtype=np.float32)
+            with self._lock:
+                for (key, positions), vector in zip(missing.items(), encoded):
+                    vector.setflags(write=False)
+                    self._cache[key] = vector
+                    for i in positions:
+                        vectors[i] = vector
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return np.stack(vectors)
+
+
+class LangChainEmbeddings(Embeddings):
+    """Adaptateur LangChain (vector store FAISS du RAG) sur l'EmbeddingService partagé."""
+    def __init__(self, service: EmbeddingService):
+        self.service = service
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        # Documents indexés une seule fois : inutile d'occuper le cache
+        return self.service.encode(texts, use_cache=False).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.service.encode([text])[0].tolist()
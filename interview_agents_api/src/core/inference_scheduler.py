@@ -0,0 +1,120 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Hashable, List, Optional, Sequence
+
+from src.core.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Désactivé par défaut tant que le gain n'est pas mesuré sur les vrais modèles
+# (benchmarks/bench_inference_scheduler.py) : à faible charge, le lot attend INFERENCE_MAX_WAIT_MS
+INFERENCE_BATCHING = os.getenv("INFERENCE_BATCHING", "false").lower() == "true"
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "32"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "10"))
+
+
+class _Request:
+    __slots__ = ("items", "key", "future", "submitted_at")
+
+    def __init__(self, items: Sequence[Any], key: Optional[Hashable]):
+        self.items = list(items)
+        self.key = key
+        self.future: Future = Future()
+        self.submitted_at = time.perf_counter()
+
+
+class MicroBatchScheduler:
+    """
+    Regroupe les appels concurrents à un même modèle en lots dynamiques. Un lot
+    part dès qu'il atteint `max_batch_size` éléments ou que le plus ancien
+    appel a attendu `max_wait_ms`. Les éléments sont triés par longueur avant
+    l'inférence (moins de padding) et chaque appelant reçoit ses résultats dans
+    son ordre d'origine. Seuls les appels de même clé (ex. mêmes labels de
+    zero-shot) sont regroupés ; une requête n'est jamais découpée entre deux lots.
+    """
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[List[Any], Optional[Hashable]], List[Any]],
+        max_batch_size: int = INFERENCE_MAX_BATCH_SIZE,
+        max_wait_ms: float = INFERENCE_MAX_WAIT_MS,
+        length_fn: Callable[[Any], int] = len,
+        thread_initializer: Optional[Callable[[], None]] = None
+    ):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.length_fn = length_fn
+        self.thread_initializer = thread_initializer
+        self._pending: Deque[_Request] = deque()
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, items: Sequence[Any], key: Optional[Hashable] = None) -> List[Any]:
+        """Bloque jusqu'au résultat ; à appeler depuis un thread de travail."""
+        if not items:
+            return []
+        request = _Request(items, key)
+        with self._condition:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._loop, name=f"inference-{self.name}", daemon=True)
+                self._worker.start()
+            self._pending.append(request)
+            self._condition.notify()
+        return request.future.result()
+
+    def _collect(self) -> List[_Request]:
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            first = self._pending.popleft()
+            batch, size = [first], len(first.items)
+            deadline = first.submitted_at + self.max_wait
+            while size < self.max_batch_size:
+                for request in list(self._pending):
+                    if request.key == first.key and size + len(request.items) <= self.max_batch_size:
+                        self._pending.remove(request)
+                        batch.append(request)
+                        size += len(request.items)
+                remaining = deadline - time.perf_counter()
+                if size >= self.max_batch_size or remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return batch
+
+    def _loop(self):
+        if self.thread_initializer is not None:
+            self.thread_initializer()
+        while True:
+            batch = self._collect()
+            self._run(batch)
+
+    def _run(self, batch: List[_Request]):
+        positions = [(r, i) for r, request in enumerate(batch) for i in range(len(request.items))]
+        positions.sort(key=lambda p: self.length_fn(batch[p[0]].items[p[1]]), reverse=True)
+
+        started = time.perf_counter()
+        metrics = get_metrics()
+        metrics.observe(f"inference.{self.name}.batch_size", len(positions))
+        metrics.observe(f"inference.{self.name}.queue_wait_seconds", started - batch[0].submitted_at)
+        try:
+            outputs = self.batch_fn([batch[r].items[i] for r, i in positions], batch[0].key)
+            if len(outputs) != len(positions):
+                raise RuntimeError(f"{self.name}: {len(outputs)} résultats pour {len(positions)} entrées")
+        except Exception as e:
+            logger.error(f"Échec de l'inférence groupée {self.name} ({len(positions)} entrées): {e}")
+            for request in batch:
+                request.future.set_exception(e)
+            return
+        metrics.observe(f"inference.{self.name}.seconds", time.perf_counter() - started)
+
+        results: List[List[Any]] = [[None] * len(request.items) for request in batch]
+        for (r, i), output in zip(positions, outputs):
+            results[r][i] = output
+        for request, request_results in zip(batch, results):
+            request.future.set_result(request_results)
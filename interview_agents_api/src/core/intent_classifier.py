@@ -0,0 +1,118 @@
+import os
+import json
+import logging
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# "nli" : zero-shot xlm-roberta-large-xnli ; "embedding" : prototypes MiniLM + produit matriciel,
+# expérimental tant que sa précision n'a pas été comparée au NLI (benchmarks/compare_intent_engines.py)
+INTENT_ENGINE = os.getenv("INTENT_ENGINE", "nli")
+INTENT_PROTOTYPES_PATH = os.getenv("INTENT_PROTOTYPES_PATH")
+INTENT_TEMPERATURE = float(os.getenv("INTENT_TEMPERATURE", "20"))
+
+INTENT_LABELS = [
+    "parle de son expérience technique",
+    "exprime sa motivation",
+    "pose une question",
+    "exprime de l'incertitude ou du stress"
+]
+
+# Exemples de réponses par intention ; le label lui-même sert aussi de prototype
+DEFAULT_PROTOTYPES: Dict[str, List[str]] = {
+    "parle de son expérience technique": [
+        "J'ai développé une application web en Python avec Django et PostgreSQL.",
+        "Dans mon précédent poste, j'ai mis en place des pipelines de données avec Spark.",
+        "J'ai conteneurisé nos services avec Docker et automatisé les déploiements.",
+        "Sur ce projet, j'étais responsable de l'architecture et des tests.",
+    ],
+    "exprime sa motivation": [
+        "Ce poste m'intéresse beaucoup car il correspond à mon projet professionnel.",
+        "Je suis très motivé à l'idée de rejoindre votre entreprise.",
+        "J'ai envie de relever ce défi et de continuer à apprendre.",
+        "Les valeurs de votre entreprise me correspondent vraiment.",
+    ],
+    "pose une question": [
+        "Quelles sont les prochaines étapes du processus de recrutement ?",
+        "Pouvez-vous m'en dire plus sur l'équipe ?",
+        "Comment se passe le télétravail chez vous ?",
+        "Est-ce que le poste implique des déplacements ?",
+    ],
+    "exprime de l'incertitude ou du stress": [
+        "Je ne suis pas sûr de bien comprendre la question.",
+        "Je suis un peu stressé, excusez-moi.",
+        "Je ne sais pas trop, je n'ai jamais fait ça.",
+        "Euh, je crois, enfin je ne suis pas certain.",
+    ],
+}
+
+
+def load_prototypes(path: Optional[str] = INTENT_PROTOTYPES_PATH) -> Dict[str, List[str]]:
+    """Prototypes par défaut, ou fichier JSON {label: [exemples]} fourni par INTENT_PROTOTYPES_PATH."""
+    if not path:
+        return DEFAULT_PROTOTYPES
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class EmbeddingIntentClassifier:
+    """
+    Classification d'intention par similarité d'embeddings : chaque label est
+    représenté par la moyenne normalisée des embeddings de ses prototypes,
+    calculée une seule fois. Les réponses sont encodées en un lot et comparées
+    aux labels par un produit matriciel ; les scores (softmax des cosinus)
+    suivent le format du pipeline zero-shot (`sequence`, `labels`, `scores`).
+
+    Expérimental : la précision par rapport au zero-shot NLI n'a pas encore
+    été mesurée sur des réponses réelles.
+    """
+    def __init__(
+        self,
+        encode: Callable[[List[str]], np.ndarray],
+        labels: Sequence[str] = INTENT_LABELS,
+        prototypes: Optional[Dict[str, List[str]]] = None,
+        temperature: float = INTENT_TEMPERATURE
+    ):
+        self.encode = encode
+        self.labels = list(labels)
+        self.temperature = temperature
+        prototypes = prototypes if prototypes is not None else load_prototypes()
+
+        texts, owners = [], []
+        for index, label in enumerate(self.labels):
+            for text in [label] + list(prototypes.get(label, [])):
+                texts.append(text)
+                owners.append(index)
+        embeddings = self._normalize(self.encode(texts))
+        owners = np.asarray(owners)
+        centroids = np.stack([embeddings[owners == index].mean(axis=0) for index in range(len(self.labels))])
+        self.label_embeddings = self._normalize(centroids)
+        logger.warning(
+            "Moteur d'intention 'embedding' expérimental : précision non validée face au NLI "
+            "(benchmarks/compare_intent_engines.py)"
+        )
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+    def __call__(self, texts: List[str]) -> List[Dict[str, object]]:
+        if not texts:
+            return []
+        similarities = self._normalize(self.encode(texts)) @ self.label_embeddings.T
+        logits = similarities * self.temperature
+        probabilities = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+        results = []
+        for text, row in zip(texts, probabilities):
+            order = np.argsort(-row)
+            results.append({
+                "sequence": text,
+                "labels": [self.labels[i] for i in order],
+                "scores": [float(row[i]) for i in order],
+            })
+        return results
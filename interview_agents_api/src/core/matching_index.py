@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import fcntl
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.embedding_service import read_embedding_signature, write_embedding_signature
+
+logger = logging.getLogger(__name__)
+
+MATCHING_INDEX_DIR = os.getenv("MATCHING_INDEX_DIR", "/tmp/matching_index")
+# Écriture sur disque au plus toutes les N secondes (les ajouts restent immédiatement interrogeables)
+MATCHING_INDEX_SAVE_INTERVAL_SECONDS = float(os.getenv("MATCHING_INDEX_SAVE_INTERVAL_SECONDS", "30"))
+
+
+def _int_id(key: str) -> int:
+    """Identifiant FAISS (int64 positif) stable dérivé de la clé métier."""
+    return int.from_bytes(hashlib.sha1(key.encode("utf-8")).digest()[:8], "big") & 0x7FFFFFFFFFFFFFFF
+
+
+class VectorIndex:
+    """
+    Index FAISS persistant d'embeddings normalisés (produit scalaire = cosinus),
+    indexés par une clé métier (identifiant de profil, d'offre...). Les mises à
+    jour sont incrémentales : ajouter une clé existante remplace son vecteur.
+    La sauvegarde prend un verrou fcntl et rejoue les modifications locales sur
+    le contenu du disque, pour que les workers partageant le dossier ne perdent
+    pas les vecteurs ajoutés par les autres. Un index écrit avec une autre
+    `signature` d'embeddings (modèle, backend) est ignoré et reconstruit.
+    """
+    def __init__(self, name: str, dim: int, index_dir: str = MATCHING_INDEX_DIR, signature: Optional[str] = None):
+        import faiss
+
+        self._faiss = faiss
+        self.name = name
+        self.dim = dim
+        self.signature = signature
+        self.index_path = os.path.join(index_dir, f"{name}.faiss")
+        self.meta_path = os.path.join(index_dir, f"{name}.json")
+        self.lock_path = os.path.join(index_dir, f"{name}.lock")
+        self.signature_path = os.path.join(index_dir, f"{name}.embedding.json")
+        self._lock = threading.RLock()
+        # Modifications depuis la dernière sauvegarde, rejouées sur le contenu du disque
+        self._upserted: Dict[int, Tuple[np.ndarray, Dict[str, Any]]] = {}
+        self._removed: set = set()
+        self._last_save = time.monotonic()
+
+        os.makedirs(index_dir, exist_ok=True)
+        with self._file_lock():
+            stored = self._read_disk()
+        if stored is not None:
+            self.index, self._metadata = stored
+            logger.info(f"Index {self.name} chargé : {self.index.ntotal} vecteurs")
+        else:
+            self.index, self._metadata = self._empty_index(), {}
+
+    @contextmanager
+    def _file_lock(self):
+        """Verrou exclusif entre processus sur les fichiers de l'index."""
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _empty_index(self):
+        return self._faiss.IndexIDMap2(self._faiss.IndexFlatIP(self.dim))
+
+    def _read_disk(self):
+        if not (os.path.exists(self.index_path) and os.path.exists(self.meta_path)):
+            return None
+        try:
+            index = self._faiss.read_index(self.index_path)
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                metadata = {int(k): v for k, v in json.load(f).items()}
+            if index.d != self.dim:
+                logger.warning(f"Dimension de l'index {self.name} différente ({index.d}), reconstruction")
+                return None
+            if self.signature is not None:
+                stored_signature = read_embedding_signature(self.signature_path)
+                if stored_signature != self.signature:
+                    logger.warning(f"Index {self.name} construit avec d'autres embeddings ({stored_signature}), reconstruction")
+                    return None
+            return index, metadata
+        except Exception as e:
+            logger.error(f"Index {self.name} illisible, reconstruction : {e}")
+            return None
+
+    def __len__(self) -> int:
+        return self.index.ntotal
+
+    def upsert(self, key: str, vector: np.ndarray, metadata: Optional[Dict[str, Any]] = None):
+        vector_id = _int_id(key)
+        vectors = np.ascontiguousarray(vector, dtype=np.float32).reshape(1, self.dim)
+        ids = np.array([vector_id], dtype=np.int64)
+        with self._lock:
+            if vector_id in self._metadata:
+                self.index.remove_ids(ids)
+            self.index.add_with_ids(vectors, ids)
+            self._metadata[vector_id] = {"key": key, **(metadata or {})}
+            self._upserted[vector_id] = (vectors[0], self._metadata[vector_id])
+            self._removed.discard(vector_id)
+        self._maybe_save()
+
+    def remove(self, key: str) -> bool:
+        vector_id = _int_id(key)
+        with self._lock:
+            if vector_id not in self._metadata:
+                return False
+            self.index.remove_ids(np.array([vector_id], dtype=np.int64))
+            del self._metadata[vector_id]
+            self._upserted.pop(vector_id, None)
+            self._removed.add(vector_id)
+        self._maybe_save()
+        return True
+
+    def get_vector(self, key: str) -> Optional[np.ndarray]:
+        vector_id = _int_id(key)
+        with self._lock:
+            if vector_id not in self._metadata:
+                return None
+            return self.index.reconstruct(vector_id)
+
+    def search(self, vector: np.ndarray, k: int, exclude_key: Optional[str] = None) -> List[Tuple[Dict[str, Any], float]]:
+        query = np.ascontiguousarray(vector, dtype=np.float32).reshape(1, self.dim)
+        with self._lock:
+            if self.index.ntotal == 0:
+                return []
+            scores, ids = self.index.search(query, min(k + 1, self.index.ntotal))
+            results = []
+            for vector_id, score in zip(ids[0], scores[0]):
+                metadata = self._metadata.get(int(vector_id))
+                if vector_id < 0 or metadata is None or metadata["key"] == exclude_key:
+                    continue
+                results.append((dict(metadata), float(score)))
+        return results[:k]
+
+    def _maybe_save(self):
+        if time.monotonic() - self._last_save >= MATCHING_INDEX_SAVE_INTERVAL_SECONDS:
+            self.save()
+
+    def save(self):
+        """Rejoue les modifications locales sur l'index du disque, sous verrou, puis le réécrit."""
+        with self._lock:
+            self._last_save = time.monotonic()
+            if not self._upserted and not self._removed:
+                return
+            tmp_index = f"{self.index_path}.{os.getpid()}.tmp"
+            tmp_meta = f"{self.meta_path}.{os.getpid()}.tmp"
+            try:
+                with self._file_lock():
+                    stored = self._read_disk()
+                    index, metadata = stored if stored is not None else (self._empty_index(), {})
+                    stale = [vector_id for vector_id in list(self._removed) + list(self._upserted) if vector_id in metadata]
+                    if stale:
+                        index.remove_ids(np.array(stale, dtype=np.int64))
+                        for vector_id in stale:
+                            del metadata[vector_id]
+                    if self._upserted:
+                        ids = np.array(list(self._upserted), dtype=np.int64)
+                        index.add_with_ids(np.stack([vector for vector, _ in self._upserted.values()]), ids)
+                        for vector_id, (_, entry) in self._upserted.items():
+                            metadata[vector_id] = entry
+                    self._faiss.write_index(index, tmp_index)
+                    with open(tmp_meta, "w", encoding="utf-8") as f:
+                        json.dump({str(k): v for k, v in metadata.items()}, f, ensure_ascii=False)
+                    os.replace(tmp_index, self.index_path)
+                    os.replace(tmp_meta, self.meta_path)
+                    if self.signature is not None:
+                        write_embedding_signature(self.signature_path, self.signature)
+            except OSError as e:
+                logger.error(f"Sauvegarde de l'index {self.name} impossible : {e}")
+                return
+
+            self.index, self._metadata = index, metadata
+            self._upserted = {}
+            self._removed = set()
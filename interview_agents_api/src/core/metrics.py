@@ -0,0 +1,45 @@
+import threading
+from typing import Dict, Any
+
+
+class MetricsRegistry:
+    """
+    Compteurs et mesures en mémoire du processus, exposés sur GET /metrics.
+    `increment` pour les compteurs, `observe` pour les valeurs (nombre, somme,
+    min, max, dernière valeur).
+    """
+    def __init__(self):
+        self._counters: Dict[str, float] = {}
+        self._observations: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            stats = self._observations.get(name)
+            if stats is None:
+                self._observations[name] = {"count": 1, "sum": value, "min": value, "max": value, "last": value}
+                return
+            stats["count"] += 1
+            stats["sum"] += value
+            stats["min"] = min(stats["min"], value)
+            stats["max"] = max(stats["max"], value)
+            stats["last"] = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            observations = {
+                name: {**stats, "mean": stats["sum"] / stats["count"]}
+                for name, stats in self._observations.items()
+            }
+            return {"counters": dict(self._counters), "observations": observations}
+
+
+_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    return _metrics
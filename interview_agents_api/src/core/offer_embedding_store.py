@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import fcntl
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from src.core.metrics import get_metrics
+from src.core.embedding_service import read_embedding_signature, write_embedding_signature
+
+logger = logging.getLogger(__name__)
+
+OFFER_EMBEDDING_DIR = os.getenv("OFFER_EMBEDDING_DIR", "/tmp/offer_embeddings")
+OFFER_EMBEDDING_SAVE_INTERVAL_SECONDS = float(os.getenv("OFFER_EMBEDDING_SAVE_INTERVAL_SECONDS", "30"))
+# Textes distincts conservés par offre (ex. JSON de l'offre et description fournie par le LLM)
+OFFER_EMBEDDING_MAX_VERSIONS = int(os.getenv("OFFER_EMBEDDING_MAX_VERSIONS", "4"))
+
+# Vecteur en mémoire (nouveau) ou ligne de la matrice sur disque
+_Entry = Union[np.ndarray, int]
+
+
+def content_hash(text: str) -> str:
+    """Empreinte du texte ; un JSON est normalisé (ordre des clés, espaces, échappements) avant hachage."""
+    try:
+        text = json.dumps(json.loads(text), ensure_ascii=False, sort_keys=True)
+    except (ValueError, TypeError):
+        pass
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class OfferEmbeddingStore:
+    """
+    Embeddings des descriptions d'offres, indexés par (`job_offer_id`,
+    empreinte du contenu) : une offre modifiée est ré-encodée, une offre
+    inchangée ne l'est jamais deux fois, et plusieurs textes d'une même offre
+    coexistent sans s'évincer (au plus `max_versions`, les plus anciens
+    supprimés d'abord). Sur disque, une matrice float32
+    (`offer_embeddings.npy`, lue en mémoire mappée au démarrage) et un index
+    JSON {job_offer_id: {hash: ligne}}. Les nouveaux vecteurs restent en
+    mémoire jusqu'à la prochaine sauvegarde ; celle-ci prend un verrou fcntl
+    et fusionne avec le contenu du disque, pour que les workers partageant le
+    dossier ne perdent pas les offres encodées par les autres. Un store écrit
+    avec une autre `signature` d'embeddings (modèle, backend) est ignoré.
+    """
+    def __init__(
+        self,
+        dim: int,
+        store_dir: str = OFFER_EMBEDDING_DIR,
+        save_interval: float = OFFER_EMBEDDING_SAVE_INTERVAL_SECONDS,
+        max_versions: int = OFFER_EMBEDDING_MAX_VERSIONS,
+        signature: Optional[str] = None
+    ):
+        self.dim = dim
+        self.signature = signature
+        self.vectors_path = os.path.join(store_dir, "offer_embeddings.npy")
+        self.index_path = os.path.join(store_dir, "offer_embeddings.json")
+        self.lock_path = os.path.join(store_dir, "offer_embeddings.lock")
+        self.signature_path = os.path.join(store_dir, "offer_embeddings.embedding.json")
+        self.save_interval = save_interval
+        self.max_versions = max(1, max_versions)
+        self._lock = threading.RLock()
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: Dict[str, "OrderedDict[str, _Entry]"] = {}
+        # Modifications depuis la dernière sauvegarde, rejouées sur le contenu du disque
+        self._added: Dict[str, "OrderedDict[str, np.ndarray]"] = {}
+        self._removed: set = set()
+        self._last_save = time.monotonic()
+
+        os.makedirs(store_dir, exist_ok=True)
+        with self._file_lock():
+            stored = self._read_disk()
+        if stored is not None:
+            self._vectors, self._entries = stored
+            logger.info(f"Embeddings d'offres chargés : {len(self._entries)} offres")
+
+    @contextmanager
+    def _file_lock(self):
+        """Verrou exclusif entre processus sur le dossier du store."""
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_disk(self) -> Optional[Tuple[np.ndarray, Dict[str, "OrderedDict[str, _Entry]"]]]:
+        if not (os.path.exists(self.vectors_path) and os.path.exists(self.index_path)):
+            return None
+        try:
+            vectors = np.load(self.vectors_path, mmap_mode="r")
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                entries = {
+                    job_offer_id: OrderedDict((offer_hash, int(row)) for offer_hash, row in versions.items())
+                    for job_offer_id, versions in json.load(f).items()
+                }
+            if self.signature is not None:
+                stored_signature = read_embedding_signature(self.signature_path)
+                if stored_signature != self.signature:
+                    logger.warning(f"Store d'embeddings d'offres construit avec d'autres embeddings ({stored_signature}), ignoré")
+                    return None
+            rows = [row for versions in entries.values() for row in versions.values()]
+            if vectors.ndim != 2 or vectors.shape[1] != self.dim or any(row >= len(vectors) for row in rows):
+                logger.warning(f"Store d'embeddings d'offres incohérent ({vectors.shape}), ignoré")
+                return None
+            return vectors, entries
+        except Exception as e:
+            logger.error(f"Store d'embeddings d'offres illisible, ignoré : {e}")
+            return None
+
+    def _trim(self, versions: "OrderedDict[str, _Entry]"):
+        while len(versions) > self.max_versions:
+            versions.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, job_offer_id: str, offer_hash: str) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._entries.get(job_offer_id, {}).get(offer_hash)
+            if entry is None:
+                return None
+            return np.array(self._vectors[entry]) if isinstance(entry, int) else entry
+
+    def put(self, job_offer_id: str, offer_hash: str, vector: np.ndarray):
+        vector = np.ascontiguousarray(vector, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            versions = self._entries.setdefault(job_offer_id, OrderedDict())
+            versions[offer_hash] = vector
+            versions.move_to_end(offer_hash)
+            self._trim(versions)
+            self._added.setdefault(job_offer_id, OrderedDict())[offer_hash] = vector
+        self._maybe_save()
+
+    def remove(self, job_offer_id: str) -> bool:
+        with self._lock:
+            known = self._entries.pop(job_offer_id, None) is not None
+            self._added.pop(job_offer_id, None)
+            self._removed.add(job_offer_id)
+        self._maybe_save()
+        return known
+
+    def get_or_compute(self, job_offer_id: str, text: str, encode: Callable[[str], np.ndarray]) -> np.ndarray:
+        """Vecteur de l'offre ; `encode` n'est appelé que si ce texte de l'offre est inconnu."""
+        offer_hash = content_hash(text)
+        vector = self.get(job_offer_id, offer_hash)
+        if vector is not None:
+            get_metrics().increment("offer_embeddings.hits")
+            return vector
+        get_metrics().increment("offer_embeddings.misses")
+        vector = encode(text)
+        self.put(job_offer_id, offer_hash, vector)
+        return vector
+
+    def _maybe_save(self):
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def save(self):
+        """Fusionne les modifications locales avec le contenu du disque, sous verrou, puis réécrit le store."""
+        with self._lock:
+            self._last_save = time.monotonic()
+            if not self._added and not self._removed:
+                return
+            tmp_vectors = f"{self.vectors_path}.{os.getpid()}.tmp.npy"
+            tmp_index = f"{self.index_path}.{os.getpid()}.tmp"
+            try:
+                with self._file_lock():
+                    stored = self._read_disk()
+                    merged: Dict[str, "OrderedDict[str, np.ndarray]"] = {}
+                    if stored is not None:
+                        vectors, entries = stored
+                        for job_offer_id, versions in entries.items():
+                            if job_offer_id not in self._removed:
+                                merged[job_offer_id] = OrderedDict(
+                                    (offer_hash, vectors[row]) for offer_hash, row in versions.items()
+                                )
+                    for job_offer_id, versions in self._added.items():
+                        target = merged.setdefault(job_offer_id, OrderedDict())
+                        for offer_hash, vector in versions.items():
+                            target[offer_hash] = vector
+                            target.move_to_end(offer_hash)
+                        self._trim(target)
+
+                    index: Dict[str, Dict[str, int]] = {}
+                    rows = []
+                    for job_offer_id, versions in merged.items():
+                        index[job_offer_id] = {}
+                        for offer_hash, vector in versions.items():
+                            index[job_offer_id][offer_hash] = len(rows)
+                            rows.append(vector)
+                    matrix = np.stack(rows).astype(np.float32) if rows else np.zeros((0, self.dim), dtype=np.float32)
+                    np.save(tmp_vectors, matrix)
+                    with open(tmp_index, "w", encoding="utf-8") as f:
+                        json.dump(index, f)
+                    os.replace(tmp_vectors, self.vectors_path)
+                    os.replace(tmp_index, self.index_path)
+                    if self.signature is not None:
+                        write_embedding_signature(self.signature_path, self.signature)
+            except OSError as e:
+                logger.error(f"Sauvegarde des embeddings d'offres impossible : {e}")
+                return
+
+            self._vectors = np.load(self.vectors_path, mmap_mode="r")
+            self._entries = {
+                job_offer_id: OrderedDict(versions.items()) for job_offer_id, versions in index.items()
+            }
+            self._added = {}
+            self._removed = set()
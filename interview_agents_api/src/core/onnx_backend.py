@@ -0,0 +1,105 @@
+import os
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# "torch" : modèles PyTorch pleine précision ; "onnx" : ONNX Runtime quantifié int8
+ANALYZER_BACKEND = os.getenv("ANALYZER_BACKEND", "torch")
+ANALYZER_BACKENDS = ("torch", "onnx")
+# Artefacts conservés à côté de l'application (dans l'image), pas dans /tmp
+ONNX_MODELS_DIR = os.getenv(
+    "ONNX_MODELS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "onnx_models")
+)
+# Jeu d'instructions ciblé par la quantification dynamique (arm64, avx2, avx512, avx512_vnni)
+ONNX_QUANTIZATION_ARCH = os.getenv("ONNX_QUANTIZATION_ARCH", "avx2")
+QUANTIZATION_ARCHS = ("arm64", "avx2", "avx512", "avx512_vnni")
+
+QUANTIZED_PIPELINE_FILE = "model_quantized.onnx"
+
+
+def artifact_dir(model_id: str, arch: str = ONNX_QUANTIZATION_ARCH, models_dir: str = ONNX_MODELS_DIR) -> str:
+    return os.path.join(models_dir, f"{model_id.replace('/', '__')}-{arch}")
+
+
+def _sentence_encoder_file(arch: str) -> str:
+    return os.path.join("onnx", f"model_qint8_{arch}.onnx")
+
+
+def _check_arch(arch: str):
+    if arch not in QUANTIZATION_ARCHS:
+        raise ValueError(f"Architecture de quantification inconnue : {arch}")
+
+
+def _require_artifact(path: str, model_id: str):
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"Modèle ONNX absent pour {model_id} ({path}) : "
+            f"lancer scripts/build_onnx_models.py avant ANALYZER_BACKEND=onnx"
+        )
+
+
+def build_pipeline_model(model_id: str, arch: str = ONNX_QUANTIZATION_ARCH, models_dir: str = ONNX_MODELS_DIR, force: bool = False) -> str:
+    """
+    Exporte un modèle de classification de séquences (sentiment, zero-shot NLI)
+    en ONNX puis le quantifie dynamiquement en int8. Renvoie le dossier de
+    l'artefact ; un artefact déjà construit est réutilisé sauf `force`.
+    """
+    from transformers import AutoTokenizer
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    _check_arch(arch)
+    output_dir = artifact_dir(model_id, arch, models_dir)
+    if not force and os.path.exists(os.path.join(output_dir, QUANTIZED_PIPELINE_FILE)):
+        logger.info(f"Artefact ONNX déjà présent pour {model_id} : {output_dir}")
+        return output_dir
+
+    logger.info(f"Export ONNX de {model_id} vers {output_dir}")
+    model = ORTModelForSequenceClassification.from_pretrained(model_id, export=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(model_id).save_pretrained(output_dir)
+
+    quantizer = ORTQuantizer.from_pretrained(output_dir)
+    quantization_config = getattr(AutoQuantizationConfig, arch)(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=output_dir, quantization_config=quantization_config)
+    return output_dir
+
+
+def build_sentence_encoder(model_id: str, arch: str = ONNX_QUANTIZATION_ARCH, models_dir: str = ONNX_MODELS_DIR, force: bool = False) -> str:
+    """Même chose pour un SentenceTransformer, via l'export ONNX de sentence-transformers (pooling conservé)."""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    _check_arch(arch)
+    output_dir = artifact_dir(model_id, arch, models_dir)
+    if not force and os.path.exists(os.path.join(output_dir, _sentence_encoder_file(arch))):
+        logger.info(f"Artefact ONNX déjà présent pour {model_id} : {output_dir}")
+        return output_dir
+
+    logger.info(f"Export ONNX de {model_id} vers {output_dir}")
+    model = SentenceTransformer(model_id, backend="onnx", device="cpu")
+    model.save(output_dir)
+    export_dynamic_quantized_onnx_model(model, arch, output_dir)
+    return output_dir
+
+
+def load_pipeline(task: str, model_id: str, arch: str = ONNX_QUANTIZATION_ARCH, models_dir: str = ONNX_MODELS_DIR, **pipeline_kwargs: Any):
+    """Pipeline transformers servi par ONNX Runtime : mêmes appels et mêmes sorties que la version PyTorch."""
+    from transformers import AutoTokenizer, pipeline
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+
+    model_dir = artifact_dir(model_id, arch, models_dir)
+    _require_artifact(os.path.join(model_dir, QUANTIZED_PIPELINE_FILE), model_id)
+    model = ORTModelForSequenceClassification.from_pretrained(model_dir, file_name=QUANTIZED_PIPELINE_FILE)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    return pipeline(task, model=model, tokenizer=tokenizer, **pipeline_kwargs)
+
+
+def load_sentence_encoder(model_id: str, arch: str = ONNX_QUANTIZATION_ARCH, models_dir: str = ONNX_MODELS_DIR):
+    from sentence_transformers import SentenceTransformer
+
+    model_dir = artifact_dir(model_id, arch, models_dir)
+    file_name = _sentence_encoder_file(arch)
+    _require_artifact(os.path.join(model_dir, file_name), model_id)
+    return SentenceTransformer(model_dir, backend="onnx", device="cpu", model_kwargs={"file_name": file_name})
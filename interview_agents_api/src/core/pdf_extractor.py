@@ -0,0 +1,187 @@
+import io
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from typing import Iterator, List
+
+from src.core.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(10 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "20"))
+PDF_EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("PDF_EXTRACTION_TIMEOUT_SECONDS", "30"))
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", "2"))
+
+_pdf_extractor_instance = None
+_pdf_extractor_lock = threading.Lock()
+
+
+class PDFExtractionError(ValueError):
+    pass
+
+
+class PDFLimitExceededError(PDFExtractionError):
+    pass
+
+
+class PDFExtractionTimeoutError(PDFExtractionError):
+    pass
+
+
+def iter_pdf_pages(contents: bytes, max_pages: int = PDF_MAX_PAGES) -> Iterator[str]:
+    """Texte des pages, lu à la demande directement depuis les octets du PDF."""
+    from pypdf import PdfReader
+
+    try:
+        reader = PdfReader(io.BytesIO(contents))
+        page_count = len(reader.pages)
+    except Exception as e:
+        raise PDFExtractionError(f"PDF illisible : {e}") from e
+    if page_count > max_pages:
+        raise PDFLimitExceededError(f"PDF trop long : {page_count} pages (maximum {max_pages})")
+
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def _extract_text(contents: bytes, max_pages: int) -> str:
+    return "\n\n".join(iter_pdf_pages(contents, max_pages))
+
+
+def _worker_main(conn):
+    """Boucle d'un processus d'extraction : un PDF à la fois, résultat ou erreur renvoyé par le pipe."""
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        contents, max_pages = job
+        try:
+            conn.send(("ok", _extract_text(contents, max_pages)))
+        except PDFExtractionError as e:
+            conn.send(("error", e))
+        except Exception as e:
+            conn.send(("error", PDFExtractionError(f"PDF illisible : {e}")))
+
+
+class _WorkerTimeout(Exception):
+    pass
+
+
+class _WorkerProcess:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def run(self, contents: bytes, max_pages: int, timeout: float):
+        """Lève `_WorkerTimeout` au délai, EOFError / OSError si le processus est mort."""
+        self.conn.send((contents, max_pages))
+        if not self.conn.poll(timeout):
+            raise _WorkerTimeout()
+        return self.conn.recv()
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+
+class PDFTextExtractor:
+    """
+    Extraction du texte des PDF dans des processus dédiés : un document
+    pathologique est interrompu au bout du délai sans bloquer le threadpool
+    partagé de l'application. Chaque processus traite un seul PDF à la fois ;
+    au dépassement, seul le processus du document fautif est tué, les autres
+    extractions continuent. Le délai est compté à partir du début de
+    l'extraction, pas de l'attente d'un processus libre.
+    """
+    def __init__(
+        self,
+        max_bytes: int = PDF_MAX_BYTES,
+        max_pages: int = PDF_MAX_PAGES,
+        timeout: float = PDF_EXTRACTION_TIMEOUT_SECONDS,
+        num_workers: int = PDF_EXTRACTION_WORKERS
+    ):
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.num_workers = max(1, num_workers)
+        # "spawn" : pas de fork d'un processus qui porte déjà des threads et des modèles
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(self.num_workers)
+        self._idle: List[_WorkerProcess] = []
+        self._idle_lock = threading.Lock()
+
+    def _acquire_worker(self) -> _WorkerProcess:
+        with self._idle_lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.is_alive():
+                    return worker
+                worker.kill()
+        return _WorkerProcess(self._context)
+
+    def _release_worker(self, worker: _WorkerProcess):
+        with self._idle_lock:
+            self._idle.append(worker)
+
+    def extract_text(self, contents: bytes) -> str:
+        if len(contents) > self.max_bytes:
+            raise PDFLimitExceededError(f"PDF trop volumineux : {len(contents)} octets (maximum {self.max_bytes})")
+
+        metrics = get_metrics()
+        queued_at = time.perf_counter()
+        with self._slots:
+            start = time.perf_counter()
+            metrics.observe("pdf_extraction.queue_seconds", start - queued_at)
+            # Un processus mort en cours de route (OOM, arrêt externe) : on retente une fois
+            for attempt in range(2):
+                worker = self._acquire_worker()
+                try:
+                    status, payload = worker.run(contents, self.max_pages, self.timeout)
+                except _WorkerTimeout:
+                    worker.kill()
+                    metrics.increment("pdf_extraction.timeouts")
+                    logger.error(f"Extraction PDF interrompue après {self.timeout}s, processus arrêté")
+                    raise PDFExtractionTimeoutError(f"Extraction du PDF trop longue (> {self.timeout:.0f}s)")
+                except (EOFError, OSError) as e:
+                    worker.kill()
+                    metrics.increment("pdf_extraction.worker_crashes")
+                    if attempt == 0:
+                        logger.warning(f"Processus d'extraction PDF arrêté brutalement, nouvel essai : {e}")
+                        continue
+                    logger.error(f"Processus d'extraction PDF arrêté brutalement : {e}")
+                    raise PDFExtractionError("Extraction du PDF impossible") from e
+                self._release_worker(worker)
+                if status == "error":
+                    raise payload
+                metrics.observe("pdf_extraction.seconds", time.perf_counter() - start)
+                return payload
+
+    def shutdown(self):
+        with self._idle_lock:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.kill()
+
+
+def get_pdf_extractor() -> PDFTextExtractor:
+    global _pdf_extractor_instance
+    with _pdf_extractor_lock:
+        if _pdf_extractor_instance is None:
+            _pdf_extractor_instance = PDFTextExtractor()
+        return _pdf_extractor_instance
+
+
+def extract_pdf_text(contents: bytes) -> str:
+    return get_pdf_extractor().extract_text(contents)
@@ -5,23 +5,27 @@ from langchain_community.document_loaders import DirectoryLoader, TextLoader
 from langchain_community.vectorstores import FAISS
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from src.core.embedding_service import read_embedding_signature, write_embedding_signature
+
 logger = logging.getLogger(__name__)
 
 _embeddings_model = None
 _rag_handler_instance = None
 
 VECTOR_STORE_PATH = "/tmp/vector_store" 
+# Modèle et backend d'embeddings ayant servi à construire le vector store
+VECTOR_STORE_SIGNATURE_PATH = os.path.join(VECTOR_STORE_PATH, "embedding.json")
 
 def get_embeddings_model():
+    """Adaptateur LangChain sur l'encodeur MiniLM partagé du processus (même modèle que l'analyseur)."""
     global _embeddings_model
     if _embeddings_model is None:
-        from langchain_huggingface import HuggingFaceEmbeddings
-        logger.info("Initialisation du modèle d'embeddings...")
-        _embeddings_model = HuggingFaceEmbeddings(
-            model_name='sentence-transformers/all-MiniLM-L6-v2',
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
-        )
+        from src.models import get_embedding_service
+        from src.core.embedding_service import LangChainEmbeddings
+        embedding_service = get_embedding_service()
+        if embedding_service is None:
+            return None
+        _embeddings_model = LangChainEmbeddings(embedding_service)
         logger.info("✅ Modèle d'embeddings initialisé avec succès")
     return _embeddings_model
 
@@ -86,12 +90,20 @@ class RAGHandler:
         vector_store = FAISS.from_documents(texts, self.embeddings)
         
         vector_store.save_local(VECTOR_STORE_PATH)
+        write_embedding_signature(VECTOR_STORE_SIGNATURE_PATH, self.embeddings.service.signature)
         logger.info(f"✅ Vector store créé et sauvegardé dans : {VECTOR_STORE_PATH}")
         
         return vector_store
 
     def _load_or_create_vector_store(self, knowledge_base_path: str) -> Optional[FAISS]:
         index_path = os.path.join(VECTOR_STORE_PATH, "index.faiss")
+        stored_signature = read_embedding_signature(VECTOR_STORE_SIGNATURE_PATH)
+        if os.path.exists(index_path) and stored_signature != self.embeddings.service.signature:
+            logger.warning(
+                f"Vector store construit avec d'autres embeddings ({stored_signature}, "
+                f"attendu {self.embeddings.service.signature}) : reconstruction"
+            )
+            return self._create_vector_store(knowledge_base_path)
         if os.path.exists(index_path):
             logger.info(f"Chargement du vector store existant depuis : {VECTOR_STORE_PATH}")
             return FAISS.load_local(
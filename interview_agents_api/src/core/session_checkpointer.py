@@ -0,0 +1,333 @@
+import os
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from langgraph.checkpoint.base import BaseCheckpointSaver, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+
+logger = logging.getLogger(__name__)
+
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "3600"))
+SESSION_MEMORY_BUDGET_MB = float(os.getenv("SESSION_MEMORY_BUDGET_MB", "256"))
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "/tmp/sessions/interview_sessions.sqlite")
+# Sessions expulsées de la mémoire dont on retient qu'elles sont servies par SQLite
+SESSION_COLD_THREADS_MAX = int(os.getenv("SESSION_COLD_THREADS_MAX", "10000"))
+# Fréquence de la purge des sessions expirées dans SQLite
+SESSION_PURGE_INTERVAL_SECONDS = float(os.getenv("SESSION_PURGE_INTERVAL_SECONDS", "300"))
+
+
+def _thread_id(config: Dict[str, Any]) -> str:
+    return str(config["configurable"]["thread_id"])
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    InMemorySaver borné : les sessions sont tenues dans un LRU, celles inactives
+    depuis plus de `ttl_seconds` sont expulsées, puis les moins récemment
+    utilisées tant que la taille sérialisée estimée dépasse `max_bytes`.
+    """
+    def __init__(
+        self,
+        ttl_seconds: int = SESSION_TTL_SECONDS,
+        max_bytes: int = int(SESSION_MEMORY_BUDGET_MB * 1024 * 1024),
+        on_evict: Optional[Callable[[str], None]] = None
+    ):
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        # thread_id -> [dernier accès, octets estimés]
+        self._sessions: "OrderedDict[str, list]" = OrderedDict()
+        # thread_id -> canal -> (éléments déjà mesurés, octets) pour les canaux de type liste
+        self._channel_sizes: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self._total_bytes = 0
+        self._lru_lock = threading.RLock()
+
+    def has_thread(self, thread_id: str) -> bool:
+        with self._lru_lock:
+            return thread_id in self._sessions
+
+    def memory_usage(self) -> Dict[str, Any]:
+        with self._lru_lock:
+            return {"sessions": len(self._sessions), "estimated_bytes": self._total_bytes}
+
+    def _touch(self, thread_id: str, added_bytes: int = 0):
+        with self._lru_lock:
+            entry = self._sessions.pop(thread_id, None) or [0.0, 0]
+            entry[0] = time.monotonic()
+            entry[1] += added_bytes
+            self._sessions[thread_id] = entry
+            self._total_bytes += added_bytes
+
+    def _evict(self):
+        evicted = []
+        with self._lru_lock:
+            deadline = time.monotonic() - self.ttl_seconds
+            while self._sessions:
+                thread_id, (last_access, _) = next(iter(self._sessions.items()))
+                over_budget = self._total_bytes > self.max_bytes and len(self._sessions) > 1
+                if last_access >= deadline and not over_budget:
+                    break
+                _, size = self._sessions.pop(thread_id)
+                self._total_bytes -= size
+                self._channel_sizes.pop(thread_id, None)
+                evicted.append(thread_id)
+
+        for thread_id in evicted:
+            super().delete_thread(thread_id)
+            if self.on_evict:
+                self.on_evict(thread_id)
+        if evicted:
+            logger.info(f"{len(evicted)} session(s) expulsée(s) de la mémoire")
+
+    def _estimate_bytes(self, thread_id: str, checkpoint: Dict[str, Any], new_versions: Dict[str, Any]) -> int:
+        """
+        Octets ajoutés par ce checkpoint (chaque version d'un canal est conservée
+        en entier). Pour les canaux de type liste (messages), seuls les nouveaux
+        éléments sont sérialisés : la taille de la liste est tenue à jour.
+        """
+        channel_values = checkpoint.get("channel_values", {})
+        with self._lru_lock:
+            sizes = self._channel_sizes.setdefault(thread_id, {})
+        size = 0
+        for channel in new_versions:
+            if channel not in channel_values:
+                continue
+            value = channel_values[channel]
+            if not isinstance(value, list):
+                size += len(self.serde.dumps_typed(value)[1])
+                continue
+            counted, channel_bytes = sizes.get(channel, (0, 0))
+            if counted > len(value):
+                counted, channel_bytes = 0, 0
+            if counted < len(value):
+                channel_bytes += len(self.serde.dumps_typed(value[counted:])[1])
+            sizes[channel] = (len(value), channel_bytes)
+            size += channel_bytes
+        return size
+
+    def get_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
+        # Une session inactive au-delà du TTL n'est jamais servie depuis la mémoire
+        self._evict()
+        checkpoint_tuple = super().get_tuple(config)
+        if checkpoint_tuple is not None:
+            self._touch(_thread_id(config))
+        return checkpoint_tuple
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        result = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = _thread_id(config)
+        self._touch(thread_id, self._estimate_bytes(thread_id, checkpoint, new_versions))
+        self._evict()
+        return result
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lru_lock:
+            entry = self._sessions.pop(thread_id, None)
+            if entry:
+                self._total_bytes -= entry[1]
+            self._channel_sizes.pop(thread_id, None)
+        super().delete_thread(thread_id)
+
+
+class SessionExpiry:
+    """
+    Expiration des sessions persistées dans SQLite. La dernière activité de
+    chaque session est tenue dans une table `session_activity` de la même
+    base ; les sessions inactives depuis plus de `ttl_seconds` (checkpoints et
+    writes) sont supprimées au démarrage puis toutes les `purge_interval`
+    secondes, et ne sont plus servies entre deux purges.
+    """
+    def __init__(self, saver, ttl_seconds: int = SESSION_TTL_SECONDS, purge_interval: float = SESSION_PURGE_INTERVAL_SECONDS):
+        self.saver = saver
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+        with self.saver.cursor() as cur:
+            cur.execute("CREATE TABLE IF NOT EXISTS session_activity (thread_id TEXT PRIMARY KEY, last_access REAL NOT NULL)")
+            cur.execute("CREATE INDEX IF NOT EXISTS session_activity_last_access ON session_activity (last_access)")
+            # Sessions enregistrées avant la table : leur délai court à partir du démarrage
+            cur.execute(
+                "INSERT OR IGNORE INTO session_activity SELECT DISTINCT thread_id, ? FROM checkpoints",
+                (time.time(),)
+            )
+
+    def touch(self, thread_id: str):
+        with self.saver.cursor() as cur:
+            cur.execute("INSERT OR REPLACE INTO session_activity VALUES (?, ?)", (thread_id, time.time()))
+
+    def is_expired(self, thread_id: str) -> bool:
+        with self.saver.cursor(transaction=False) as cur:
+            cur.execute("SELECT last_access FROM session_activity WHERE thread_id = ?", (thread_id,))
+            row = cur.fetchone()
+        return row is not None and row[0] < time.time() - self.ttl_seconds
+
+    def expired_threads(self) -> List[str]:
+        with self.saver.cursor(transaction=False) as cur:
+            cur.execute("SELECT thread_id FROM session_activity WHERE last_access < ?", (time.time() - self.ttl_seconds,))
+            return [row[0] for row in cur.fetchall()]
+
+    def forget(self, thread_id: str):
+        with self.saver.cursor() as cur:
+            cur.execute("DELETE FROM session_activity WHERE thread_id = ?", (thread_id,))
+
+    def purge_due(self) -> bool:
+        if time.monotonic() - self._last_purge < self.purge_interval:
+            return False
+        self._last_purge = time.monotonic()
+        return True
+
+
+class TieredCheckpointSaver(BaseCheckpointSaver):
+    """
+    Checkpointer à deux niveaux pour les sessions d'entretien : une mémoire LRU
+    bornée pour les sessions actives et, en écriture systématique, un stockage
+    persistant (SQLite). Une session expulsée de la mémoire, ou inconnue après
+    un redémarrage, est ensuite servie uniquement par le stockage persistant,
+    qui seul détient son historique complet. Ces sessions "froides" sont
+    retenues dans un LRU borné : une session oubliée est de nouveau détectée
+    au prochain `get_tuple` (absente de la mémoire, présente en SQLite). Avec
+    `expiry`, le TTL s'applique aussi au stockage persistant.
+    """
+    def __init__(
+        self,
+        memory: BoundedMemorySaver,
+        persistent: Optional[BaseCheckpointSaver] = None,
+        max_cold_threads: int = SESSION_COLD_THREADS_MAX,
+        expiry: Optional[SessionExpiry] = None
+    ):
+        super().__init__(serde=memory.serde)
+        self.memory = memory
+        self.persistent = persistent
+        self.expiry = expiry if persistent is not None else None
+        self.max_cold_threads = max(1, max_cold_threads)
+        self._cold_threads: "OrderedDict[str, None]" = OrderedDict()
+        self._cold_lock = threading.Lock()
+        if persistent is not None:
+            memory.on_evict = self._mark_cold
+        self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """Supprime (mémoire et SQLite) les sessions inactives depuis plus que le TTL."""
+        if self.expiry is None:
+            return 0
+        expired = self.expiry.expired_threads()
+        for thread_id in expired:
+            self.delete_thread(thread_id)
+        if expired:
+            logger.info(f"{len(expired)} session(s) expirée(s) supprimée(s) du stockage persistant")
+        return len(expired)
+
+    def _mark_cold(self, thread_id: str):
+        with self._cold_lock:
+            self._cold_threads[thread_id] = None
+            self._cold_threads.move_to_end(thread_id)
+            while len(self._cold_threads) > self.max_cold_threads:
+                self._cold_threads.popitem(last=False)
+
+    def _is_cold(self, thread_id: str) -> bool:
+        if self.persistent is None:
+            return False
+        with self._cold_lock:
+            if thread_id not in self._cold_threads:
+                return False
+            self._cold_threads.move_to_end(thread_id)
+            return True
+
+    def get_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
+        thread_id = _thread_id(config)
+        if not self._is_cold(thread_id):
+            checkpoint_tuple = self.memory.get_tuple(config)
+            if checkpoint_tuple is not None or self.persistent is None:
+                return checkpoint_tuple
+
+        if self.expiry is not None and self.expiry.is_expired(thread_id):
+            self.delete_thread(thread_id)
+            return None
+        checkpoint_tuple = self.persistent.get_tuple(config)
+        if checkpoint_tuple is not None and not self.memory.has_thread(thread_id):
+            self._mark_cold(thread_id)
+        return checkpoint_tuple
+
+    def list(self, config: Optional[Dict[str, Any]], **kwargs) -> Iterator[CheckpointTuple]:
+        saver = self.persistent if self.persistent is not None else self.memory
+        return saver.list(config, **kwargs)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        result = None
+        if self.persistent is not None:
+            result = self.persistent.put(config, checkpoint, metadata, new_versions)
+        if self.expiry is not None:
+            self.expiry.touch(_thread_id(config))
+            if self.expiry.purge_due():
+                self.purge_expired()
+        if not self._is_cold(_thread_id(config)):
+            result = self.memory.put(config, checkpoint, metadata, new_versions)
+        return result
+
+    def put_writes(self, config, writes, task_id, *args, **kwargs) -> None:
+        if self.persistent is not None:
+            self.persistent.put_writes(config, writes, task_id, *args, **kwargs)
+        if not self._is_cold(_thread_id(config)):
+            self.memory.put_writes(config, writes, task_id, *args, **kwargs)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.memory.delete_thread(thread_id)
+        if self.persistent is not None:
+            self.persistent.delete_thread(thread_id)
+        if self.expiry is not None:
+            self.expiry.forget(thread_id)
+        with self._cold_lock:
+            self._cold_threads.pop(thread_id, None)
+
+    def get_next_version(self, current, channel):
+        return self.memory.get_next_version(current, channel)
+
+    # Le stockage SQLite est synchrone : les variantes async passent par un thread.
+
+    async def aget_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: Optional[Dict[str, Any]], **kwargs) -> AsyncIterator[CheckpointTuple]:
+        for checkpoint_tuple in await asyncio.to_thread(lambda: list(self.list(config, **kwargs))):
+            yield checkpoint_tuple
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, *args, **kwargs) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, *args, **kwargs)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+def _build_persistent_saver() -> Optional[BaseCheckpointSaver]:
+    if not SESSION_DB_PATH:
+        return None
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        logger.warning("langgraph-checkpoint-sqlite non installé : sessions conservées en mémoire uniquement")
+        return None
+
+    os.makedirs(os.path.dirname(SESSION_DB_PATH) or ".", exist_ok=True)
+    connection = sqlite3.connect(SESSION_DB_PATH, check_same_thread=False)
+    saver = SqliteSaver(connection)
+    saver.setup()
+    return saver
+
+
+def build_session_checkpointer() -> TieredCheckpointSaver:
+    persistent = _build_persistent_saver()
+    logger.info(
+        f"✅ Checkpointer de sessions : mémoire {SESSION_MEMORY_BUDGET_MB} Mo / TTL {SESSION_TTL_SECONDS}s"
+        f", persistance : {SESSION_DB_PATH if persistent is not None else 'aucune'}"
+    )
+    expiry = SessionExpiry(persistent) if persistent is not None else None
+    return TieredCheckpointSaver(BoundedMemorySaver(), persistent, expiry=expiry)
@@ -0,0 +1,76 @@
+from bisect import bisect_right
+from collections import deque
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+
+class SkillMatcher:
+    """
+    Automate d'Aho-Corasick sur un ensemble de compétences (en minuscules) :
+    un seul parcours du texte renvoie toutes les occurrences de toutes les
+    compétences, y compris imbriquées ("java" dans "javascript").
+    """
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns: List[str] = list(dict.fromkeys(p for p in patterns if p))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[int]] = [[]]
+        for index, pattern in enumerate(self.patterns):
+            self._add(pattern, index)
+        self._build_failure_links()
+
+    def _add(self, pattern: str, index: int):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = next_node
+        self._outputs[node].append(index)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                # Les sorties du suffixe le plus long sont héritées une fois pour toutes
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Produit (indice du motif, position de début) pour chaque occurrence, par position de fin croissante."""
+        goto, fail, outputs, patterns = self._goto, self._fail, self._outputs, self.patterns
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in outputs[node]:
+                yield index, position - len(patterns[index]) + 1
+
+    def count_and_locate(self, text: str, segments: Sequence[Tuple[int, int]]) -> Tuple[List[int], List[List[int]]]:
+        """
+        Pour chaque motif : nombre d'occurrences sans chevauchement (même résultat
+        que `str.count`) et indices des segments [début, fin) qui le contiennent.
+        Les segments sont disjoints et triés.
+        """
+        segment_starts = [segment_start for segment_start, _ in segments]
+        counts = [0] * len(self.patterns)
+        last_end = [0] * len(self.patterns)
+        found_in: List[set] = [set() for _ in self.patterns]
+        for index, start in self.finditer(text):
+            end = start + len(self.patterns[index])
+            if start >= last_end[index]:
+                counts[index] += 1
+                last_end[index] = end
+            segment_index = bisect_right(segment_starts, start) - 1
+            if segment_index >= 0 and end <= segments[segment_index][1]:
+                found_in[index].add(segment_index)
+        return counts, [sorted(s) for s in found_in]
@@ -1,37 +1,221 @@
-import logging
-from typing import Dict, Any, Optional
-
-logger = logging.getLogger(__name__)
-
-def load_all_models() -> Dict[str, Any]:
-    models = {
-        "status": False,
-        "deep_learning_analyzer": None,
-        "rag_handler": None,
-        "llm": None
-    }
-    
-    try:
-        from src.core.deep_learning_analyzer import MultiModelInterviewAnalyzer
-        models["deep_learning_analyzer"] = MultiModelInterviewAnalyzer()
-        logger.info("✅ Deep Learning Analyzer chargé")
-    except Exception as e:
-        logger.error(f"❌ Erreur chargement Deep Learning Analyzer: {e}")
-    
-    try:
-        from src.core.rag_handler import get_rag_handler
-        models["rag_handler"] = get_rag_handler()
-        logger.info("✅ RAG Handler chargé")
-    except Exception as e:
-        logger.error(f"❌ Erreur chargement RAG Handler: {e}")
-    
-    try:
-        from src.config import crew_openai
-        models["llm"] = crew_openai()
-        logger.info("✅ LLM chargé")
-    except Exception as e:
-        logger.error(f"❌ Erreur chargement LLM: {e}")
-    
-    models["status"] = all(v is not None for k, v in models.items() if k != "status")
-    
-    return models
\ No newline at end of file
+import logging
+import os
+import resource
+import threading
+import time
+from typing import Dict, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+# Délai avant de retenter un chargement en échec, doublé à chaque nouvel échec
+MODEL_LOAD_RETRY_SECONDS = float(os.getenv("MODEL_LOAD_RETRY_SECONDS", "60"))
+MODEL_LOAD_RETRY_MAX_SECONDS = float(os.getenv("MODEL_LOAD_RETRY_MAX_SECONDS", "900"))
+
+
+def _current_rss_mb() -> float:
+    """Mémoire résidente actuelle du processus, en Mo."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # Hors Linux : on se rabat sur le pic de RSS (en Ko sous Linux)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _load_embedding_service():
+    from src.core.embedding_service import EmbeddingService, load_sentence_encoder
+    return EmbeddingService(load_sentence_encoder())
+
+
+def _load_offer_embedding_store():
+    from src.core.offer_embedding_store import OfferEmbeddingStore
+    embedding_service = _registry.get("embedding_service")
+    if embedding_service is None:
+        raise RuntimeError("Service d'embeddings indisponible")
+    return OfferEmbeddingStore(
+        embedding_service.get_sentence_embedding_dimension(), signature=embedding_service.signature
+    )
+
+
+def _load_deep_learning_analyzer():
+    from src.core.deep_learning_analyzer import MultiModelInterviewAnalyzer
+    return MultiModelInterviewAnalyzer(
+        embedding_service=_registry.get("embedding_service"),
+        offer_embeddings=_registry.get("offer_embedding_store")
+    )
+
+
+def _load_rag_handler():
+    from src.core.rag_handler import get_rag_handler
+    return get_rag_handler()
+
+
+def _load_llm():
+    from src.config import crew_openai
+    return crew_openai()
+
+
+def _load_analysis_service():
+    from src.services.analysis_service import AnalysisService
+    models = load_all_models()
+    if models.get("deep_learning_analyzer") is None:
+        raise RuntimeError("Deep Learning Analyzer indisponible")
+    return AnalysisService(models=models)
+
+
+def _load_matching_service():
+    from src.services.matching_service import MatchingService
+    embedding_service = _registry.get("embedding_service")
+    if embedding_service is None:
+        raise RuntimeError("Service d'embeddings indisponible")
+    # Même encodeur MiniLM que l'analyse de similarité : pas de seconde copie en mémoire
+    return MatchingService(embedding_service)
+
+
+def _load_turn_analysis_service():
+    from src.services.turn_analysis_service import TurnAnalysisService
+    analyzer = _registry.get("deep_learning_analyzer")
+    if analyzer is None:
+        raise RuntimeError("Deep Learning Analyzer indisponible")
+    return TurnAnalysisService(analyzer)
+
+
+class ModelRegistry:
+    """
+    Registre des modèles partagé par tout le processus.
+    Chaque modèle est chargé une seule fois (chargement protégé par un verrou
+    par modèle) puis réutilisé par les requêtes et les analyses concurrentes.
+    Un chargement en échec est mémorisé (état "failed" dans `report()`) : les
+    appels suivants renvoient None sans recharger jusqu'à la fin d'un délai
+    qui double à chaque échec consécutif.
+    """
+    def __init__(
+        self,
+        loaders: Dict[str, Callable[[], Any]],
+        retry_seconds: float = MODEL_LOAD_RETRY_SECONDS,
+        max_retry_seconds: float = MODEL_LOAD_RETRY_MAX_SECONDS
+    ):
+        self._loaders = loaders
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self._instances: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._failures: Dict[str, Dict[str, float]] = {}
+        self._locks = {name: threading.Lock() for name in loaders}
+
+    def _in_backoff(self, name: str) -> bool:
+        failure = self._failures.get(name)
+        return failure is not None and time.monotonic() < failure["retry_at"]
+
+    def get(self, name: str) -> Optional[Any]:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        if self._in_backoff(name):
+            return None
+
+        with self._locks[name]:
+            instance = self._instances.get(name)
+            if instance is not None:
+                return instance
+            if self._in_backoff(name):
+                return None
+
+            rss_before = _current_rss_mb()
+            start = time.perf_counter()
+            try:
+                instance = self._loaders[name]()
+            except Exception as e:
+                failures = int(self._failures.get(name, {}).get("count", 0)) + 1
+                delay = min(self.max_retry_seconds, self.retry_seconds * 2 ** (failures - 1))
+                self._failures[name] = {"count": failures, "retry_at": time.monotonic() + delay}
+                self._stats[name] = {
+                    "loaded": False,
+                    "state": "failed",
+                    "error": str(e),
+                    "failures": failures,
+                }
+                logger.error(f"❌ Erreur chargement {name} (échec n°{failures}, nouvel essai dans {delay:.0f}s): {e}")
+                return None
+
+            load_seconds = time.perf_counter() - start
+            rss_delta = _current_rss_mb() - rss_before
+            self._instances[name] = instance
+            self._failures.pop(name, None)
+            self._stats[name] = {
+                "loaded": True,
+                "state": "loaded",
+                "load_seconds": round(load_seconds, 2),
+                "rss_delta_mb": round(rss_delta, 1),
+            }
+            logger.info(f"✅ {name} chargé en {load_seconds:.2f}s (RSS +{rss_delta:.1f} Mo)")
+            return instance
+
+    def get_if_loaded(self, name: str) -> Optional[Any]:
+        """Instance déjà chargée, sans déclencher de chargement."""
+        return self._instances.get(name)
+
+    def report(self) -> Dict[str, Any]:
+        """Temps de chargement et mémoire résidente ajoutée par modèle, échecs et prochain essai."""
+        models = {name: dict(stats) for name, stats in self._stats.items()}
+        now = time.monotonic()
+        for name, failure in list(self._failures.items()):
+            if name in models:
+                models[name]["retry_in_seconds"] = round(max(0.0, failure["retry_at"] - now), 1)
+        return {
+            "process_rss_mb": round(_current_rss_mb(), 1),
+            "models": models,
+        }
+
+
+_registry = ModelRegistry({
+    "embedding_service": _load_embedding_service,
+    "offer_embedding_store": _load_offer_embedding_store,
+    "deep_learning_analyzer": _load_deep_learning_analyzer,
+    "rag_handler": _load_rag_handler,
+    "llm": _load_llm,
+    "analysis_service": _load_analysis_service,
+    "matching_service": _load_matching_service,
+    "turn_analysis_service": _load_turn_analysis_service,
+})
+
+
+def get_model_registry() -> ModelRegistry:
+    return _registry
+
+
+def get_embedding_service():
+    """Encodeur MiniLM unique du processus (analyse, rapprochement, RAG)."""
+    return _registry.get("embedding_service")
+
+
+def get_analysis_service():
+    """AnalysisService partagé, construit sur les modèles du registre."""
+    return _registry.get("analysis_service")
+
+
+def get_matching_service():
+    """Index de rapprochement profils / offres, construit sur l'encodeur du registre."""
+    return _registry.get("matching_service")
+
+
+def get_turn_analysis_service():
+    """Analyse incrémentale des tours d'entretien ; None si désactivée (INCREMENTAL_ANALYSIS=false)."""
+    from src.services.turn_analysis_service import INCREMENTAL_ANALYSIS
+    if not INCREMENTAL_ANALYSIS:
+        return None
+    return _registry.get("turn_analysis_service")
+
+
+def load_all_models() -> Dict[str, Any]:
+    models = {
+        "status": False,
+        "deep_learning_analyzer": _registry.get("deep_learning_analyzer"),
+        "rag_handler": _registry.get("rag_handler"),
+        "llm": _registry.get("llm")
+    }
+
+    models["status"] = all(v is not None for k, v in models.items() if k != "status")
+
+    return models
@@ -0,0 +1,81 @@
+from typing import List
+from pydantic import BaseModel, ConfigDict, Field
+
+# Schémas utilisés en structured output strict (OpenAI) : tous les champs sont
+# requis, sans valeur par défaut, et aucun champ supplémentaire n'est accepté.
+# Une information absente du CV est rendue vide ("", [] ou false) par le modèle.
+
+
+class InformationsPersonnelles(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    nom: str = Field(description="Nom complet du candidat")
+    email: str
+    numero_de_telephone: str
+    localisation: str = Field(description="Ville et/ou pays")
+
+
+class Competences(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    hard_skills: List[str] = Field(description="Compétences techniques")
+    soft_skills: List[str] = Field(description="Compétences comportementales")
+
+
+class Experience(BaseModel):
+    model_config = ConfigDict(populate_by_name=True, extra="forbid")
+
+    poste: str = Field(alias="Poste")
+    entreprise: str = Field(alias="Entreprise")
+    start_date: str
+    end_date: str = Field(description="Date de fin, ou 'en cours'")
+    responsabilites: List[str] = Field(alias="responsabilités")
+
+
+class Projet(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    title: str
+    technologies: List[str]
+    outcomes: List[str]
+
+
+class Projets(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    professional: List[Projet]
+    personal: List[Projet]
+
+
+class Formation(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    degree: str
+    institution: str
+    start_date: str
+    end_date: str
+
+
+class Reconversion(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    is_reconversion: bool
+    analysis: str = Field(description="Explication des changements de secteur ou de type de poste")
+
+
+class Candidat(BaseModel):
+    model_config = ConfigDict(populate_by_name=True, extra="forbid")
+
+    informations_personnelles: InformationsPersonnelles
+    competences: Competences = Field(alias="compétences")
+    experiences: List[Experience] = Field(alias="expériences")
+    projets: Projets
+    formations: List[Formation]
+    reconversion: Reconversion
+
+
+class CVDocument(BaseModel):
+    """Document `candidat` tel que produit par le pipeline d'extraction de CV."""
+    model_config = ConfigDict(extra="forbid")
+
+    candidat: Candidat
@@ -1,8 +1,12 @@
 import json
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Callable, Optional, Tuple
 from crewai import Agent, Task, Crew, Process
 
+from src.models import get_turn_analysis_service
+from src.core.metrics import get_metrics
+from src.core.deep_learning_analyzer import message_key
+
 logger = logging.getLogger(__name__)
 
 class AnalysisService:
@@ -27,20 +31,71 @@ class AnalysisService:
             llm=self.llm
         )
 
-    def run_analysis(self, conversation_history: List[Dict[str, Any]], job_description: str) -> Dict[str, Any]:
+    def run_analysis(
+        self,
+        conversation_history: List[Dict[str, Any]],
+        job_description: str,
+        on_progress: Optional[Callable[[str], None]] = None,
+        session_key: Optional[str] = None,
+        job_offer_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         if not self.analyzer:
             return {"error": "Analyzer non disponible"}
 
-        structured_analysis = self.analyzer.run_full_analysis(conversation_history, job_description)
+        if on_progress:
+            on_progress("deep_learning_analysis")
+        structured_analysis, stage_timings = self._run_structured_analysis(
+            conversation_history, job_description, session_key, job_offer_id
+        )
         
         rag_feedback = []
         if self.rag_handler:
+            if on_progress:
+                on_progress("rag_feedback")
             rag_feedback = self._get_contextual_feedback(structured_analysis)
         
+        if on_progress:
+            on_progress("report_generation")
         report = self._generate_final_report(structured_analysis, rag_feedback)
+        # Diagnostics conservés dans le résultat de l'analyse, hors du prompt du rapport
+        report["diagnostics"] = {"stage_timings": stage_timings}
         
         return report
 
+    def _run_structured_analysis(
+        self,
+        conversation_history: List[Dict[str, Any]],
+        job_description: str,
+        session_key: Optional[str],
+        job_offer_id: Optional[str]
+    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Réutilise les analyses faites tour par tour pendant l'entretien, si
+        disponibles. Renvoie l'analyse et les durées par étape, à part.
+        """
+        turn_analysis = get_turn_analysis_service() if session_key else None
+        precomputed = turn_analysis.collect(session_key) if turn_analysis else None
+        if precomputed is not None:
+            answers = [msg['content'] for msg in conversation_history if msg['role'] == 'user']
+            missing = sum(message_key(answer) not in precomputed["messages"] for answer in answers)
+            metrics = get_metrics()
+            metrics.increment("incremental_analysis.final_messages_reused", len(answers) - missing)
+            metrics.increment("incremental_analysis.final_messages_computed", missing)
+
+        structured_analysis = self.analyzer.run_full_analysis(
+            conversation_history, job_description, precomputed=precomputed, job_offer_id=job_offer_id
+        )
+        if turn_analysis:
+            turn_analysis.discard(session_key)
+
+        # Durées par modèle : exposées sur /metrics et dans les diagnostics, pas envoyées au rédacteur du rapport
+        stage_timings = structured_analysis.pop("stage_timings", {})
+        metrics = get_metrics()
+        for stage, seconds in stage_timings.items():
+            metrics.observe(f"analysis.stage.{stage}.seconds", seconds)
+        logger.info(f"Durées des étapes d'analyse : {stage_timings}")
+        return structured_analysis, stage_timings
+
     def _get_contextual_feedback(self, structured_analysis: Dict[str, Any]) -> List[str]:
         rag_feedback = []
         
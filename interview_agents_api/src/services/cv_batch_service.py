@@ -0,0 +1,144 @@
+import io
+import os
+import uuid
+import asyncio
+import logging
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Callable, AsyncIterator
+
+from src.core.metrics import get_metrics
+from src.core.pdf_extractor import PDF_MAX_BYTES, PDFExtractionError
+from src.services.cv_service import CVParsingService
+
+logger = logging.getLogger(__name__)
+
+CV_BATCH_WORKERS = int(os.getenv("CV_BATCH_WORKERS", "4"))
+CV_BATCH_MAX_FILES = int(os.getenv("CV_BATCH_MAX_FILES", "500"))
+CV_BATCH_INSERT_SIZE = int(os.getenv("CV_BATCH_INSERT_SIZE", "50"))
+CV_BATCH_MAX_ZIP_BYTES = int(os.getenv("CV_BATCH_MAX_ZIP_BYTES", str(200 * 1024 * 1024)))
+
+# (nom du fichier, lecture différée des octets du PDF)
+BatchItem = Tuple[str, Callable[[], bytes]]
+
+
+class CVBatchError(ValueError):
+    pass
+
+
+class _ProfileBuffer:
+    """Accumule les profils d'un lot et les écrit par paquets avec `insert_many`."""
+    def __init__(self, cv_service: CVParsingService, batch_id: str, flush_size: int = CV_BATCH_INSERT_SIZE):
+        self.cv_service = cv_service
+        self.batch_id = batch_id
+        self.flush_size = max(1, flush_size)
+        self._profiles: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, profile: Dict[str, Any]):
+        profile["batch_id"] = self.batch_id
+        with self._lock:
+            self._profiles.append(profile)
+            if len(self._profiles) < self.flush_size:
+                return
+            profiles, self._profiles = self._profiles, []
+        self.cv_service.save_profiles(profiles)
+
+    def flush(self):
+        with self._lock:
+            profiles, self._profiles = self._profiles, []
+        self.cv_service.save_profiles(profiles)
+
+
+class CVBatchIngestionService:
+    """
+    Import de CV en lot (PDF multiples ou archive zip). Les analyses passent par
+    un pool de workers borné, la limite globale d'appels LLM du CVParsingService
+    s'appliquant en plus ; chaque résultat est renvoyé dès qu'il est prêt et les
+    profils sont enregistrés par paquets.
+    """
+    def __init__(self, cv_service: CVParsingService, num_workers: int = CV_BATCH_WORKERS):
+        self.cv_service = cv_service
+        self.executor = ThreadPoolExecutor(max_workers=max(1, num_workers), thread_name_prefix="cv-batch")
+
+    def collect_items(self, uploads: List[Tuple[str, bytes]]) -> List[BatchItem]:
+        """Déplie les archives zip et contrôle le nombre et la taille des fichiers."""
+        items: List[BatchItem] = []
+        for filename, contents in uploads:
+            if (filename or "").lower().endswith(".zip") or zipfile.is_zipfile(io.BytesIO(contents)):
+                items.extend(self._zip_items(filename, contents))
+            else:
+                items.append((filename, lambda contents=contents: contents))
+            if len(items) > CV_BATCH_MAX_FILES:
+                raise CVBatchError(f"Trop de fichiers dans le lot (maximum {CV_BATCH_MAX_FILES})")
+        if not items:
+            raise CVBatchError("Aucun fichier PDF dans le lot")
+        return items
+
+    def _zip_items(self, archive_name: str, contents: bytes) -> List[BatchItem]:
+        try:
+            archive = zipfile.ZipFile(io.BytesIO(contents))
+        except zipfile.BadZipFile as e:
+            raise CVBatchError(f"Archive zip invalide : {archive_name}") from e
+
+        read_lock = threading.Lock()
+
+        def reader(info: zipfile.ZipInfo) -> Callable[[], bytes]:
+            def read() -> bytes:
+                # Taille déclarée contrôlée avant décompression (archives piégées)
+                if info.file_size > PDF_MAX_BYTES:
+                    raise PDFExtractionError(f"PDF trop volumineux : {info.file_size} octets (maximum {PDF_MAX_BYTES})")
+                with read_lock:
+                    return archive.read(info)
+            return read
+
+        items = []
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/") or not name.lower().endswith(".pdf"):
+                continue
+            items.append((name, reader(info)))
+        return items
+
+    def _process(self, filename: str, read: Callable[[], bytes], engine: Optional[str], buffer: _ProfileBuffer) -> Dict[str, Any]:
+        try:
+            cv_data = self.cv_service.parse_cv(read(), engine=engine, profile_sink=buffer.add)
+        except PDFExtractionError as e:
+            return {"filename": filename, "status": "error", "error": str(e)}
+        except Exception as e:
+            logger.error(f"Erreur lors de l'import du CV {filename}: {e}", exc_info=True)
+            return {"filename": filename, "status": "error", "error": "Erreur interne lors de l'analyse du CV."}
+
+        if not cv_data:
+            return {"filename": filename, "status": "error", "error": "Échec de l'extraction des données du CV."}
+        return {"filename": filename, "status": "completed", "candidat": cv_data["candidat"]}
+
+    async def run(self, items: List[BatchItem], engine: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Produit un résultat par fichier, dans l'ordre d'achèvement, puis un bilan du lot."""
+        batch_id = uuid.uuid4().hex
+        buffer = _ProfileBuffer(self.cv_service, batch_id)
+        loop = asyncio.get_running_loop()
+        logger.info(f"Import en lot {batch_id} : {len(items)} CV")
+
+        futures = [
+            loop.run_in_executor(self.executor, self._process, filename, read, engine, buffer)
+            for filename, read in items
+        ]
+        succeeded = 0
+        try:
+            for next_result in asyncio.as_completed(futures):
+                result = await next_result
+                result["batch_id"] = batch_id
+                succeeded += result["status"] == "completed"
+                yield result
+        except BaseException:
+            # Client déconnecté : les analyses lancées se terminent, leurs profils sont écrits à la fin
+            remaining = asyncio.gather(*futures, return_exceptions=True)
+            remaining.add_done_callback(lambda _: loop.run_in_executor(None, buffer.flush))
+            raise
+        await loop.run_in_executor(None, buffer.flush)
+
+        get_metrics().increment("cv_batch.files", len(items))
+        get_metrics().increment("cv_batch.failures", len(items) - succeeded)
+        yield {"batch_id": batch_id, "status": "done", "total": len(items), "succeeded": succeeded, "failed": len(items) - succeeded}
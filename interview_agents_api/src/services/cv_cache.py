@@ -0,0 +1,123 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, Callable
+
+from src.core.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter à chaque changement du pipeline d'extraction (prompts, schéma, scoring)
+# pour ne plus servir les documents produits par l'ancienne version
+CV_PIPELINE_VERSION = os.getenv("CV_PIPELINE_VERSION", "1")
+CV_CACHE_DIR = os.getenv("CV_CACHE_DIR", "/tmp/cv_cache")
+
+
+class ParsedCVCache:
+    """
+    Cache adressé par contenu des CV analysés : la clé combine le SHA-256 des
+    octets du PDF, le moteur d'extraction et la version du pipeline. Les
+    documents sont relus dans la collection Mongo des CV (champ `cv_cache_key`,
+    renseigné à l'enregistrement du profil) ou, sans Mongo, dans un répertoire
+    local. Les analyses simultanées d'un même fichier sont regroupées en une seule.
+    """
+    def __init__(self, collection=None, cache_dir: str = CV_CACHE_DIR):
+        self.collection = collection
+        self.cache_dir = cache_dir
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        if self.collection is not None:
+            try:
+                self.collection.create_index("cv_cache_key")
+            except Exception as e:
+                logger.warning(f"Index cv_cache_key non créé : {e}")
+        else:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(contents: bytes, engine: str) -> str:
+        return f"{hashlib.sha256(contents).hexdigest()}:{engine}:v{CV_PIPELINE_VERSION}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        document = self._load(key)
+        get_metrics().increment("cv_cache.hits" if document else "cv_cache.misses")
+        return document
+
+    def put(self, key: str, cv_data: Dict[str, Any]):
+        """Écrit dans le stockage local ; avec Mongo, le profil enregistré sert d'entrée de cache."""
+        if self.collection is not None:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"candidat": cv_data["candidat"]}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def has_profile(self, key: str, user_id: Optional[str]) -> bool:
+        if self.collection is None or not user_id:
+            return True
+        try:
+            return self.collection.count_documents({"cv_cache_key": key, "user_id": user_id}, limit=1) > 0
+        except Exception as e:
+            logger.error(f"Erreur lecture cache CV: {e}")
+            return True
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Renvoie l'entrée en cache ou l'analyse du fichier. Un seul appelant
+        calcule ; les uploads simultanés du même fichier attendent son résultat.
+        """
+        cached = self.get(key)
+        if cached:
+            return cached
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            get_metrics().increment("cv_cache.coalesced")
+            return future.result()
+
+        try:
+            result = compute()
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.collection is not None:
+            try:
+                document = self.collection.find_one(
+                    {"cv_cache_key": key, "candidat": {"$exists": True}},
+                    {"_id": 0, "candidat": 1},
+                    sort=[("created_at", -1)]
+                )
+                return document
+            except Exception as e:
+                logger.error(f"Erreur lecture cache CV: {e}")
+                return None
+
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Entrée de cache CV illisible {key}: {e}")
+            return None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key.replace(':', '_')}.json")
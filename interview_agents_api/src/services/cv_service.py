@@ -1,20 +1,37 @@
 import json
 import logging
 import os
+import time
+import threading
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Callable
 from pymongo import MongoClient
-from src.config import load_pdf
+from src.core.pdf_extractor import extract_pdf_text
+from src.core.metrics import get_metrics
+from src.models import get_matching_service, get_model_registry
 from src.agents.cv_agents import CVAgentOrchestrator
+from src.agents.structured_cv_extractor import StructuredCVExtractor
 from src.agents.scoring_agent import SimpleScoringAgent
+from src.services.cv_cache import ParsedCVCache
 
 logger = logging.getLogger(__name__)
 
+# Moteur d'extraction par défaut : "crew" (découpage + sept tâches) ou "structured" (un appel JSON schema)
+CV_EXTRACTION_ENGINES = ("crew", "structured")
+CV_EXTRACTION_ENGINE = os.getenv("CV_EXTRACTION_ENGINE", "crew")
+# Nombre maximal d'extractions LLM simultanées dans le processus (uploads unitaires et imports en lot)
+CV_LLM_MAX_CONCURRENCY = int(os.getenv("CV_LLM_MAX_CONCURRENCY", "8"))
+
 class CVParsingService:
     def __init__(self, models: Dict[str, Any]):
         self.models = models
         self.orchestrator = CVAgentOrchestrator(models.get("llm"))
+        # Construit au premier CV du moteur "structured" : jamais au démarrage si le LLM est indisponible
+        self._structured_extractor: Optional[StructuredCVExtractor] = None
+        self._structured_extractor_lock = threading.Lock()
         self.scoring_agent = SimpleScoringAgent()
+        # Index de rapprochement chargé une fois au démarrage, pas à chaque CV analysé
+        get_matching_service()
         
         # Initialisation MongoDB
         try:
@@ -25,19 +42,65 @@ class CVParsingService:
             self.client = None
             self.candidate_collection = None
 
-    def parse_cv(self, pdf_path: str, user_id: str = None) -> Dict[str, Any]:
-        cv_text = load_pdf(pdf_path)
+        self.cache = ParsedCVCache(self.candidate_collection)
+        self._llm_slots = threading.BoundedSemaphore(max(1, CV_LLM_MAX_CONCURRENCY))
+
+    def parse_cv(
+        self,
+        contents: bytes,
+        user_id: str = None,
+        engine: Optional[str] = None,
+        profile_sink: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyse un CV à partir des octets du PDF uploadé. Lève `PDFExtractionError`
+        (ou une sous-classe) si le PDF est illisible, trop gros ou trop long à lire.
+        `profile_sink` reçoit les profils à enregistrer au lieu d'un `insert_one`
+        par CV (écritures groupées des imports en lot).
+        """
+        engine = engine or CV_EXTRACTION_ENGINE
+        if engine not in CV_EXTRACTION_ENGINES:
+            raise ValueError(f"Moteur d'extraction inconnu : {engine}")
+
+        cache_key = self.cache.key(contents, engine)
+        computed = []
+
+        def compute() -> Dict[str, Any]:
+            computed.append(True)
+            return self._parse_uncached(contents, user_id, engine, cache_key, profile_sink)
+
+        cv_data = self.cache.get_or_compute(cache_key, compute)
+        # Même fichier déjà analysé (cache ou upload simultané) : on rattache le profil à cet
+        # utilisateur ; un import en lot enregistre toujours son propre profil (tagué par lot)
+        if cv_data and not computed and (profile_sink is not None or not self.cache.has_profile(cache_key, user_id)):
+            self._save_profile(cv_data, user_id, cache_key, profile_sink)
+            self._index_candidate(cv_data, user_id, cache_key)
+        return cv_data
+
+    def _parse_uncached(
+        self,
+        contents: bytes,
+        user_id: Optional[str],
+        engine: str,
+        cache_key: str,
+        profile_sink: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        cv_text = extract_pdf_text(contents)
         if not cv_text or not cv_text.strip():
             return self._create_fallback_data()    
         
         logger.info(f"CV text loaded: {len(cv_text)} characters")
-        sections = self.orchestrator.split_cv_sections(cv_text)
-        logger.info(f"Sections extracted: {list(sections.keys())}")
-        cv_data = self.orchestrator.extract_all_sections(sections)
-        logger.info(f"CV data extracted: {cv_data is not None}")
+        metrics = get_metrics()
+        metrics.increment(f"cv_extraction.{engine}.requests")
+        with self._llm_slots:
+            start = time.perf_counter()
+            cv_data = self._extract_cv_data(cv_text, engine)
+        metrics.observe(f"cv_extraction.{engine}.seconds", time.perf_counter() - start)
+        logger.info(f"CV data extracted ({engine}): {cv_data is not None}")
         
         if not cv_data or not cv_data.get("candidat") or not self._is_valid_extraction(cv_data):
             logger.warning("Agent extraction failed or incomplete, using fallback extraction")
+            metrics.increment(f"cv_extraction.{engine}.failures")
             return self._create_fallback_data()
         
         logger.info("Calculating skill levels...")
@@ -50,31 +113,92 @@ class CVParsingService:
         else:
             logger.warning("No skill levels calculated, adding empty analysis")
             cv_data["candidat"]["analyse_competences"] = []
-        self._save_profile(cv_data, user_id)
+        self._save_profile(cv_data, user_id, cache_key, profile_sink)
+        self.cache.put(cache_key, cv_data)
+        self._index_candidate(cv_data, user_id, cache_key)
         
         return cv_data
 
-    def _save_profile(self, cv_data: Dict[str, Any], user_id: str = None):
+    def _get_structured_extractor(self) -> Optional[StructuredCVExtractor]:
+        if self._structured_extractor is None:
+            llm = self.models.get("llm")
+            if llm is None:
+                logger.error("LLM indisponible : extraction structurée impossible")
+                return None
+            with self._structured_extractor_lock:
+                if self._structured_extractor is None:
+                    self._structured_extractor = StructuredCVExtractor(llm)
+        return self._structured_extractor
+
+    def _extract_cv_data(self, cv_text: str, engine: str) -> Optional[Dict[str, Any]]:
+        if engine == "structured":
+            extractor = self._get_structured_extractor()
+            return extractor.extract(cv_text) if extractor is not None else None
+
+        sections = self.orchestrator.split_cv_sections(cv_text)
+        logger.info(f"Sections extracted: {list(sections.keys())}")
+        return self.orchestrator.extract_all_sections(sections, cv_text=cv_text)
+
+    def _index_candidate(self, cv_data: Dict[str, Any], user_id: Optional[str], cache_key: str):
+        """Ajoute le profil à l'index de rapprochement (clé : user_id, sinon empreinte du CV)."""
+        matching_service = get_model_registry().get_if_loaded("matching_service")
+        if matching_service is None:
+            return
+        try:
+            matching_service.index_candidate(user_id or cache_key, cv_data["candidat"], {"user_id": user_id, "cv_cache_key": cache_key})
+        except Exception as e:
+            logger.error(f"Erreur indexation du profil pour le rapprochement: {e}")
+
+    def _create_fallback_data(self) -> Dict[str, Any]:
+        """Aucune donnée exploitable : l'endpoint répond par une erreur d'extraction."""
+        return {}
+
+    def _build_profile(self, cv_data: Dict[str, Any], user_id: str = None, cache_key: str = None) -> Dict[str, Any]:
+        # Garder la structure complète avec la clé 'candidat'
+        profile_data = cv_data.copy()
+        profile_data["created_at"] = datetime.utcnow()
+        profile_data["updated_at"] = datetime.utcnow()
+        
+        if user_id:
+            profile_data["user_id"] = user_id
+        if cache_key:
+            profile_data["cv_cache_key"] = cache_key
+        return profile_data
+
+    def _save_profile(
+        self,
+        cv_data: Dict[str, Any],
+        user_id: str = None,
+        cache_key: str = None,
+        profile_sink: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
         """
         Sauvegarde le CV avec la structure complète incluant la clé 'candidat'
         """
         if self.candidate_collection is None or not isinstance(cv_data, dict):
             return
         
+        profile_data = self._build_profile(cv_data, user_id, cache_key)
+        if profile_sink is not None:
+            profile_sink(profile_data)
+            return
+
         try:
-            # Garder la structure complète avec la clé 'candidat'
-            profile_data = cv_data.copy()
-            profile_data["created_at"] = datetime.utcnow()
-            profile_data["updated_at"] = datetime.utcnow()
-            
-            if user_id:
-                profile_data["user_id"] = user_id
-            
             self.candidate_collection.insert_one(profile_data)
             logger.info("CV stocké dans MongoDB avec succès")
         except Exception as e:
             logger.error(f"Erreur stockage CV: {e}")
 
+    def save_profiles(self, profiles: List[Dict[str, Any]]):
+        """Enregistrement groupé des profils (un seul aller-retour Mongo)."""
+        if self.candidate_collection is None or not profiles:
+            return
+        try:
+            self.candidate_collection.insert_many(profiles, ordered=False)
+            logger.info(f"{len(profiles)} CV stockés dans MongoDB")
+        except Exception as e:
+            logger.error(f"Erreur stockage groupé des CV: {e}")
+
     def _get_levels_summary(self, competences: List[Dict[str, Any]]) -> str:
         levels_count = {}
         for comp in competences:
@@ -0,0 +1,92 @@
+import logging
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from src.core.matching_index import VectorIndex
+from src.core.embedding_service import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+
+def candidate_text(candidat: Dict[str, Any]) -> str:
+    """Texte représentatif d'un profil : compétences, postes et responsabilités, formations."""
+    parts = []
+    competences = candidat.get("compétences") or {}
+    if isinstance(competences, dict):
+        skills = list(competences.get("hard_skills") or []) + list(competences.get("soft_skills") or [])
+        if skills:
+            parts.append("Compétences : " + ", ".join(str(s) for s in skills))
+    for experience in candidat.get("expériences") or []:
+        if isinstance(experience, dict):
+            responsabilites = experience.get("responsabilités") or []
+            if not isinstance(responsabilites, list):
+                responsabilites = [str(responsabilites)]
+            parts.append(f"{experience.get('Poste', '')} : " + " ; ".join(str(r) for r in responsabilites))
+    for formation in candidat.get("formations") or []:
+        if isinstance(formation, dict):
+            parts.append(f"Formation : {formation.get('degree', '')}")
+    return "\n".join(part for part in parts if part.strip())
+
+
+def offer_text(job_offer: Dict[str, Any]) -> str:
+    fields = ("poste", "mission", "profil_recherche", "competences", "pole")
+    return "\n".join(f"{field} : {job_offer[field]}" for field in fields if job_offer.get(field))
+
+
+class MatchingService:
+    """
+    Rapprochement profils / offres par similarité d'embeddings (all-MiniLM-L6-v2).
+    Chaque profil analysé et chaque offre publiée est encodé une seule fois et
+    ajouté à un index FAISS persistant ; les requêtes relisent le vecteur stocké
+    et interrogent l'index de l'autre type.
+    """
+    def __init__(self, encoder: EmbeddingService):
+        self.encoder = encoder
+        dim = encoder.get_sentence_embedding_dimension()
+        self.candidates = VectorIndex("candidates", dim, signature=encoder.signature)
+        self.offers = VectorIndex("offers", dim, signature=encoder.signature)
+
+    def _encode(self, text: str) -> np.ndarray:
+        return self.encoder.encode([text])[0]
+
+    def index_candidate(self, candidate_id: str, candidat: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> bool:
+        text = candidate_text(candidat)
+        if not text:
+            return False
+        nom = (candidat.get("informations_personnelles") or {}).get("nom", "")
+        self.candidates.upsert(candidate_id, self._encode(text), {"nom": nom, **(metadata or {})})
+        return True
+
+    def index_offer(self, job_offer_id: str, job_offer: Dict[str, Any]) -> bool:
+        text = offer_text(job_offer)
+        if not text:
+            return False
+        self.offers.upsert(job_offer_id, self._encode(text), {"poste": job_offer.get("poste", ""), "entreprise": job_offer.get("entreprise", "")})
+        return True
+
+    def remove_offer(self, job_offer_id: str) -> bool:
+        return self.offers.remove(job_offer_id)
+
+    def best_offers_for_candidate(self, candidate_id: str, k: int = 10) -> Optional[List[Dict[str, Any]]]:
+        vector = self.candidates.get_vector(candidate_id)
+        if vector is None:
+            return None
+        return self._format(self.offers.search(vector, k), "job_offer_id")
+
+    def best_candidates_for_offer(self, job_offer_id: str, k: int = 10) -> Optional[List[Dict[str, Any]]]:
+        vector = self.offers.get_vector(job_offer_id)
+        if vector is None:
+            return None
+        return self._format(self.candidates.search(vector, k), "candidate_id")
+
+    def _format(self, results, id_field: str) -> List[Dict[str, Any]]:
+        formatted = []
+        for metadata, score in results:
+            key = metadata.pop("key")
+            formatted.append({id_field: key, "score": round(score, 4), **metadata})
+        return formatted
+
+    def save(self):
+        self.candidates.save()
+        self.offers.save()
@@ -0,0 +1,233 @@
+import os
+import re
+import heapq
+import logging
+import unicodedata
+from typing import Dict, Any, List, Optional, Union, Tuple
+
+import numpy as np
+
+from src.core.cv_section_splitter import normalize_text
+from src.core.skill_matcher import SkillMatcher
+from src.agents.scoring_agent import SimpleScoringAgent
+
+logger = logging.getLogger(__name__)
+
+RANKING_BATCH_SIZE = int(os.getenv("RANKING_BATCH_SIZE", "1000"))
+
+# Niveau de compétence -> poids dans le score (0 = compétence absente du profil)
+LEVEL_VALUES = {"debutant": 0.25, "intermediaire": 0.5, "avance": 0.75, "expert": 1.0}
+SKILL_SEPARATOR_PATTERN = re.compile(r"[,;\n•/|]+|\s+et\s+|\s+and\s+")
+# Caractères qui font partie d'un nom de compétence ("c++", "c#", "node.js", "objective-c")
+SKILL_TOKEN_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789+#.-")
+
+
+def normalize_skill(text: str) -> str:
+    """
+    Normalisation dédiée aux compétences : minuscules sans accents, mais `+`,
+    `#`, `.` et `-` conservés pour distinguer "c++", "c#" et "c". Les points
+    de ponctuation (fin de phrase) sont retirés.
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = re.sub(r"[^a-z0-9+#.\- ]+", " ", text)
+    text = re.sub(r"\.+(?=\s|$)|(?:^|(?<=\s))-+|-+(?=\s|$)", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def parse_offer_skills(competences: Union[str, List[str], None]) -> List[str]:
+    """Compétences d'une offre, données en liste ou en texte libre séparé par des virgules ou des lignes."""
+    if not competences:
+        return []
+    items = competences if isinstance(competences, list) else SKILL_SEPARATOR_PATTERN.split(competences)
+    skills = []
+    for item in items:
+        if isinstance(item, str):
+            skill = item.strip(" -*.:\t")
+            if skill and skill.lower() not in (s.lower() for s in skills):
+                skills.append(skill)
+    return skills
+
+
+class _OfferSkillIndex:
+    """
+    Compétences normalisées de l'offre. Les noms de compétences des candidats se
+    répètent fortement d'un profil à l'autre : la correspondance nom -> colonnes
+    de l'offre est calculée une fois par nom distinct puis mise en cache.
+    """
+    def __init__(self, offer_skills: List[str]):
+        self.offer_skills = offer_skills
+        self.matcher = SkillMatcher([normalize_skill(skill) for skill in offer_skills])
+        # Plusieurs intitulés d'offre peuvent se normaliser à l'identique
+        self.columns: List[List[int]] = [[] for _ in self.matcher.patterns]
+        pattern_index = {pattern: i for i, pattern in enumerate(self.matcher.patterns)}
+        for column, skill in enumerate(offer_skills):
+            normalized = normalize_skill(skill)
+            if normalized in pattern_index:
+                self.columns[pattern_index[normalized]].append(column)
+        self._name_columns: Dict[str, Tuple[int, ...]] = {}
+        self._level_values: Dict[str, float] = {}
+
+    def columns_for(self, skill_name: str) -> Tuple[int, ...]:
+        columns = self._name_columns.get(skill_name)
+        if columns is None:
+            text = normalize_skill(skill_name)
+            found = set()
+            for pattern_index, start in self.matcher.finditer(text):
+                end = start + len(self.matcher.patterns[pattern_index])
+                # Jetons entiers uniquement : "java" ne couvre pas "javascript", ni "c" "c++" ou "objective-c"
+                if start > 0 and text[start - 1] in SKILL_TOKEN_CHARS or end < len(text) and text[end] in SKILL_TOKEN_CHARS:
+                    continue
+                found.update(self.columns[pattern_index])
+            columns = self._name_columns[skill_name] = tuple(sorted(found))
+        return columns
+
+    def level_value(self, level: Any) -> float:
+        value = self._level_values.get(level)
+        if value is None:
+            value = self._level_values[level] = LEVEL_VALUES.get(normalize_text(str(level or "")), 0.25)
+        return value
+
+    def fill_row(self, row: np.ndarray, analyse_competences: List[Dict[str, Any]]):
+        for item in analyse_competences:
+            if not isinstance(item, dict) or not isinstance(item.get("skill"), str):
+                continue
+            columns = self.columns_for(item["skill"])
+            if not columns:
+                continue
+            value = self.level_value(item.get("level"))
+            for column in columns:
+                if value > row[column]:
+                    row[column] = value
+
+
+class CandidateRankingService:
+    """
+    Classement de tous les profils stockés pour les compétences d'une offre.
+    Les profils sont lus par curseur Mongo et traités par lots : chaque lot
+    devient une matrice candidats × compétences de l'offre (niveau de 0 à 1),
+    les scores sont calculés en une opération matricielle et seuls les K
+    meilleurs profils sont conservés (tas), sans charger la collection. Un
+    même candidat importé plusieurs fois (même `user_id`, sinon même
+    `cv_cache_key`) n'apparaît qu'une fois, avec son meilleur score.
+    """
+    def __init__(self, collection, batch_size: int = RANKING_BATCH_SIZE):
+        self.collection = collection
+        self.batch_size = max(1, batch_size)
+        self.scoring_agent = SimpleScoringAgent()
+
+    def rank(
+        self,
+        competences: Union[str, List[str]],
+        top_k: int = 20,
+        weights: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
+        offer_skills = parse_offer_skills(competences)
+        if not offer_skills:
+            raise ValueError("Aucune compétence exploitable dans l'offre")
+        if weights is not None and len(weights) != len(offer_skills):
+            raise ValueError("Le nombre de poids doit correspondre au nombre de compétences de l'offre")
+
+        index = _OfferSkillIndex(offer_skills)
+        weight_vector = np.asarray(weights if weights is not None else [1.0] * len(offer_skills), dtype=np.float32)
+        weight_vector = weight_vector / max(float(weight_vector.sum()), 1e-9)
+
+        cursor = self.collection.find(
+            {"candidat": {"$exists": True}},
+            {"candidat.analyse_competences": 1, "candidat.informations_personnelles.nom": 1, "user_id": 1, "cv_cache_key": 1}
+        ).batch_size(self.batch_size)
+
+        heap: List[Tuple[float, float, int, Dict[str, Any], np.ndarray]] = []
+        in_heap: Dict[Any, Tuple] = {}
+        scanned, sequence = 0, 0
+        batch: List[Dict[str, Any]] = []
+        for document in cursor:
+            batch.append(document)
+            if len(batch) >= self.batch_size:
+                sequence = self._score_batch(batch, index, weight_vector, top_k, heap, in_heap, sequence)
+                scanned += len(batch)
+                batch = []
+        if batch:
+            sequence = self._score_batch(batch, index, weight_vector, top_k, heap, in_heap, sequence)
+            scanned += len(batch)
+
+        ranked = sorted(heap, key=lambda entry: (entry[0], entry[1]), reverse=True)
+        return {
+            "offer_skills": offer_skills,
+            "scanned": scanned,
+            "candidates": [self._format_entry(entry, offer_skills) for entry in ranked],
+        }
+
+    @staticmethod
+    def _candidate_key(document: Dict[str, Any]) -> Any:
+        """Identité du candidat : un CV importé plusieurs fois crée plusieurs profils."""
+        return document.get("user_id") or document.get("cv_cache_key") or document.get("_id")
+
+    def _score_batch(self, batch, index: _OfferSkillIndex, weight_vector: np.ndarray, top_k: int, heap, in_heap, sequence: int) -> int:
+        levels = np.zeros((len(batch), len(index.offer_skills)), dtype=np.float32)
+        legacy_ids = [
+            document.get("_id") for document in batch
+            if (document.get("candidat") or {}).get("analyse_competences") is None
+        ]
+        legacy_scores = self._score_legacy_profiles(legacy_ids) if legacy_ids else {}
+        for row, document in enumerate(batch):
+            analyse = (document.get("candidat") or {}).get("analyse_competences")
+            if analyse is None:
+                analyse = legacy_scores.get(document.get("_id"), [])
+            index.fill_row(levels[row], analyse)
+
+        scores = levels @ weight_vector
+        coverages = (levels > 0).astype(np.float32) @ weight_vector
+
+        # Seuls les K meilleurs candidats distincts du lot (score puis couverture)
+        # peuvent entrer dans le classement global
+        seen = set()
+        for row in np.lexsort((-coverages, -scores)):
+            key = self._candidate_key(batch[row])
+            if key in seen:
+                continue
+            seen.add(key)
+            if len(seen) > top_k:
+                break
+            entry = (float(scores[row]), float(coverages[row]), sequence, batch[row], levels[row].copy())
+            sequence += 1
+            previous = in_heap.get(key)
+            if previous is not None:
+                if entry[:2] <= previous[:2]:
+                    continue
+                heap.remove(previous)
+                heapq.heapify(heap)
+                heapq.heappush(heap, entry)
+            elif len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                evicted = heapq.heapreplace(heap, entry)
+                del in_heap[self._candidate_key(evicted[3])]
+            else:
+                continue
+            in_heap[key] = entry
+        return sequence
+
+    def _score_legacy_profiles(self, profile_ids: List[Any]) -> Dict[Any, List[Dict[str, Any]]]:
+        """
+        Profils enregistrés avant le calcul des niveaux : niveaux recalculés
+        depuis le profil complet, lu en une seule requête pour tout le lot.
+        """
+        return {
+            document["_id"]: self.scoring_agent.calculate_scores(document.get("candidat") or {}).get("analyse_competences", [])
+            for document in self.collection.find({"_id": {"$in": profile_ids}}, {"candidat": 1})
+        }
+
+    def _format_entry(self, entry, offer_skills: List[str]) -> Dict[str, Any]:
+        score, coverage, _, document, row = entry
+        level_names = {value: name for name, value in LEVEL_VALUES.items()}
+        candidat = document.get("candidat") or {}
+        return {
+            "profile_id": str(document.get("_id")),
+            "user_id": document.get("user_id"),
+            "nom": (candidat.get("informations_personnelles") or {}).get("nom", ""),
+            "score": round(score, 4),
+            "coverage": round(coverage, 4),
+            "matched_skills": {skill: level_names[float(value)] for skill, value in zip(offer_skills, row) if value > 0},
+            "missing_skills": [skill for skill, value in zip(offer_skills, row) if value == 0],
+        }
@@ -0,0 +1,120 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Optional
+
+from src.core.metrics import get_metrics
+from src.core.deep_learning_analyzer import message_key, similarity_key
+
+logger = logging.getLogger(__name__)
+
+INCREMENTAL_ANALYSIS = os.getenv("INCREMENTAL_ANALYSIS", "true").lower() == "true"
+INCREMENTAL_ANALYSIS_WORKERS = int(os.getenv("INCREMENTAL_ANALYSIS_WORKERS", "2"))
+INCREMENTAL_ANALYSIS_MAX_SESSIONS = int(os.getenv("INCREMENTAL_ANALYSIS_MAX_SESSIONS", "512"))
+# Attente maximale des analyses de tour encore en cours au moment du rapport final
+INCREMENTAL_ANALYSIS_WAIT_SECONDS = float(os.getenv("INCREMENTAL_ANALYSIS_WAIT_SECONDS", "30"))
+
+
+def session_key(user_id: str, job_offer_id: str) -> str:
+    return f"{user_id}:{job_offer_id}"
+
+
+class _SessionTurns:
+    def __init__(self):
+        self.messages: Dict[str, Dict[str, Any]] = {}
+        self.similarity: Dict[str, Dict[str, Any]] = {}
+        self.pending: Dict[str, Future] = {}
+
+
+class TurnAnalysisService:
+    """
+    Analyse incrémentale des entretiens : chaque nouvelle réponse du candidat
+    est analysée en arrière-plan (sentiment, intention, similarité des réponses
+    cumulées avec le poste) dès son arrivée, pendant que le recruteur répond.
+    Les résultats sont conservés par session (LRU) et indexés par le contenu
+    des messages ; l'analyse finale n'a plus qu'à les assembler.
+    """
+    def __init__(self, analyzer, max_workers: int = INCREMENTAL_ANALYSIS_WORKERS, max_sessions: int = INCREMENTAL_ANALYSIS_MAX_SESSIONS):
+        self.analyzer = analyzer
+        self.max_sessions = max_sessions
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="turn-analysis")
+        self._sessions: "OrderedDict[str, _SessionTurns]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _session(self, key: str) -> _SessionTurns:
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = _SessionTurns()
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return session
+
+    def submit(self, key: str, messages: List[Dict[str, Any]], job_requirements: str, job_offer_id: Optional[str] = None) -> Optional[Future]:
+        """Lance l'analyse des réponses encore inconnues de la session ; ne bloque pas."""
+        answers = [msg['content'] for msg in messages if msg.get('role') == 'user' and msg.get('content')]
+        if not answers:
+            return None
+        session = self._session(key)
+        with self._lock:
+            new_answers = [
+                answer for answer in dict.fromkeys(answers)
+                if message_key(answer) not in session.messages and message_key(answer) not in session.pending
+            ]
+            task_key = similarity_key(answers, job_requirements)
+            if not new_answers and task_key in session.similarity:
+                return None
+            future = self._executor.submit(self._analyze_turn, session, new_answers, answers, job_requirements, job_offer_id)
+            for answer in new_answers:
+                session.pending[message_key(answer)] = future
+            session.pending[task_key] = future
+        get_metrics().increment("incremental_analysis.turns_submitted")
+        return future
+
+    def _analyze_turn(
+        self,
+        session: _SessionTurns,
+        new_answers: List[str],
+        answers: List[str],
+        job_requirements: str,
+        job_offer_id: Optional[str]
+    ):
+        keys = [message_key(answer) for answer in new_answers] + [similarity_key(answers, job_requirements)]
+        try:
+            results = self.analyzer.analyze_answers(new_answers) if new_answers else {}
+            history = [{"role": "user", "content": answer} for answer in answers]
+            similarity = self.analyzer.semantic_similarity(history, job_requirements, job_offer_id)
+            with self._lock:
+                session.messages.update(results)
+                session.similarity[keys[-1]] = similarity
+        except Exception as e:
+            logger.error(f"Échec de l'analyse incrémentale d'un tour: {e}", exc_info=True)
+        finally:
+            with self._lock:
+                for key in keys:
+                    session.pending.pop(key, None)
+
+    def collect(self, key: str, timeout: float = INCREMENTAL_ANALYSIS_WAIT_SECONDS) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Attend les analyses de tour encore en cours puis renvoie les résultats
+        de la session au format `precomputed` de `run_full_analysis`, ou None
+        si aucun tour n'a été analysé dans ce processus.
+        """
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                get_metrics().increment("incremental_analysis.sessions_missed")
+                return None
+            pending = set(session.pending.values())
+        if pending:
+            wait(pending, timeout=timeout)
+        with self._lock:
+            get_metrics().increment("incremental_analysis.sessions_collected")
+            return {"messages": dict(session.messages), "similarity": dict(session.similarity)}
+
+    def discard(self, key: str):
+        with self._lock:
+            self._sessions.pop(key, None)
@@ -1,17 +1,19 @@
 import logging
 from langchain_core.tools import tool
-from src.services.analysis_service import AnalysisService 
 import json
 import os
 from datetime import datetime
 from pydantic.v1 import BaseModel, Field
-from typing import List, Dict, Any
-from src.models import load_all_models
+from typing import List, Dict, Any, Callable, Optional
+from src.models import get_analysis_service
+from src.services.turn_analysis_service import session_key
 from pymongo import MongoClient
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_feedback_collection = None
+
 class InterviewAnalysisArgs(BaseModel):
     """Arguments for the trigger_interview_analysis tool."""
     user_id: str = Field(..., description="The unique identifier for the user, provided in the system prompt.")
@@ -19,6 +21,54 @@ class InterviewAnalysisArgs(BaseModel):
     job_description: str = Field(..., description="The full JSON string of the job offer description.")
     conversation_history: List[Dict[str, Any]] = Field(..., description="The complete conversation history between the user and the agent.")
 
+def _get_feedback_collection():
+    global _feedback_collection
+    if _feedback_collection is None:
+        mongo_client = MongoClient(os.getenv("MONGO_URI"))
+        db = mongo_client[os.getenv("MONGO_DB_NAME")]
+        _feedback_collection = db[os.getenv("MONGO_FEEDBACK")]
+    return _feedback_collection
+
+def run_interview_analysis(
+    user_id: str,
+    job_offer_id: str,
+    job_description: str,
+    conversation_history: List[Dict[str, Any]],
+    on_progress: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
+    """
+    Exécute l'analyse complète de l'entretien et la sauvegarde dans MongoDB.
+    Appelé par la file d'analyse ; lève une exception en cas d'échec.
+    """
+    if '@' in user_id or ' ' in job_offer_id:
+        logger.error(f"Appel de l'outil avec des données invalides. User ID: {user_id}, Job Offer ID: {job_offer_id}")
+        raise ValueError("Paramètres invalides : l'analyse n'a pas pu être lancée.")
+
+    analysis_service = get_analysis_service()
+    if analysis_service is None:
+        raise RuntimeError("AnalysisService indisponible : modèles non chargés.")
+
+    feedback_data = analysis_service.run_analysis(
+        conversation_history=conversation_history,
+        job_description=job_description,
+        on_progress=on_progress,
+        session_key=session_key(user_id, job_offer_id),
+        job_offer_id=job_offer_id
+    )
+
+    if on_progress:
+        on_progress("saving")
+    mongo_document = {
+        "user_id": user_id,
+        "job_offer_id": job_offer_id,
+        "feedback_data": feedback_data,
+        "updated_at": datetime.utcnow()
+    }
+    result = _get_feedback_collection().insert_one(mongo_document)
+    logger.info(f"Analyse pour l'utilisateur {user_id} terminée et sauvegardée dans MongoDB avec l'ID: {result.inserted_id}")
+
+    return feedback_data
+
 @tool("trigger_interview_analysis", args_schema=InterviewAnalysisArgs)
 def trigger_interview_analysis(user_id: str, job_offer_id: str, job_description: str, conversation_history: List[Dict[str, Any]]):
     """
@@ -27,29 +77,14 @@ def trigger_interview_analysis(user_id: str, job_offer_id: str, job_description:
     """
     try:
         logger.info(f"Outil 'trigger_interview_analysis' appelé pour user_id: {user_id} et job_offer_id: {job_offer_id}")
-        if '@' in user_id or ' ' in job_offer_id:
-             logger.error(f"Appel de l'outil avec des données invalides. User ID: {user_id}, Job Offer ID: {job_offer_id}")
-             return "Erreur: Appel de l'outil avec des paramètres invalides. L'analyse n'a pas pu être lancée."
-        mongo_client = MongoClient(os.getenv("MONGO_URI"))
-        db = mongo_client[os.getenv("MONGO_DB_NAME")]
-        collection = db[os.getenv("MONGO_FEEDBACK")]
-        
-        models = load_all_models()
-        analysis_service = AnalysisService(models=models)
-        feedback_data = analysis_service.run_analysis(
-            conversation_history=conversation_history,
-            job_description=job_description
+        from services.analysis_job_service import get_analysis_job_queue
+        job_id = get_analysis_job_queue().submit(
+            user_id=user_id,
+            job_offer_id=job_offer_id,
+            job_description=job_description,
+            conversation_history=conversation_history
         )
-        mongo_document = {
-            "user_id": user_id,
-            "job_offer_id": job_offer_id,
-            "feedback_data": feedback_data,
-            "updated_at": datetime.utcnow()
-        }
-        result = collection.insert_one(mongo_document)
-        logger.info(f"Analyse pour l'utilisateur {user_id} terminée et sauvegardée dans MongoDB avec l'ID: {result.inserted_id}")
-        
-        return "L'analyse a été déclenchée et terminée avec succès."
+        return f"L'analyse a été mise en file (job {job_id})."
 
     except Exception as e:
         logger.error(f"Erreur dans l'outil d'analyse : {e}", exc_info=True)